@@ -0,0 +1,56 @@
+"""
+Benchmark for computing the end of COUNT rrules
+
+Compares the arithmetic fast path used by tasking.utils.get_rrule_end with
+expanding the whole rule (rrule_obj[-1]).
+
+Usage:
+    python benchmarks/rrule_end.py
+"""
+import os
+import sys
+import timeit
+
+from django.conf import settings
+
+from dateutil.rrule import rrulestr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+settings.configure()
+
+# pylint: disable=wrong-import-position
+from tasking.rrules import get_rrule_last_occurrence  # noqa
+
+RULES = [
+    "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=50",
+    "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;INTERVAL=2;COUNT=5000",
+    "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR;COUNT=5000",
+    "DTSTART:20180501T070000Z RRULE:FREQ=WEEKLY;BYDAY=MO,WE;INTERVAL=2;COUNT=2000",
+    "DTSTART:20180501T070000Z RRULE:FREQ=MONTHLY;COUNT=500",
+    "DTSTART:20180501T070000Z RRULE:FREQ=YEARLY;COUNT=100",
+    # not supported by the fast path
+    "DTSTART:20180501T070000Z RRULE:FREQ=MONTHLY;BYDAY=1MO;COUNT=500",
+]
+
+
+def main(number=20):
+    """
+    Run the benchmark
+    """
+    print(f"{'rule':<80} {'expand (ms)':>12} {'fast (ms)':>10} {'speedup':>8}")
+    for rule in RULES:
+        rrule_obj = rrulestr(rule)
+        assert get_rrule_last_occurrence(rrule_obj) == rrule_obj[-1]
+        expand = timeit.timeit(lambda: rrule_obj[-1], number=number) / number
+        fast = (
+            timeit.timeit(lambda: get_rrule_last_occurrence(rrule_obj), number=number)
+            / number
+        )
+        print(
+            f"{rule[25:]:<80} {expand * 1000:>12.3f} {fast * 1000:>10.3f} "
+            f"{expand / fast:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
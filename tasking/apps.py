@@ -26,3 +26,19 @@ class TaskingConfig(AppConfig):
         for name in dir(defaults):
             if name.isupper() and not hasattr(settings, name):
                 setattr(settings, name, getattr(defaults, name))
+
+        # keep the cache of allowed content types in step with the database
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models.signals import post_delete, post_migrate, post_save
+        from tasking.utils import clear_allowed_contenttypes
+
+        for signal in [post_save, post_delete]:
+            signal.connect(
+                clear_allowed_contenttypes,
+                sender=ContentType,
+                dispatch_uid="tasking_clear_allowed_contenttypes",
+            )
+        post_migrate.connect(
+            clear_allowed_contenttypes,
+            dispatch_uid="tasking_clear_allowed_contenttypes",
+        )
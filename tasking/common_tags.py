@@ -24,3 +24,34 @@ MISSING_START_DATE = _(
 )
 INVALID_SHAPEFILE = _("Invalid shapefile")
 NO_VALID_POLYGONS = _("No valid polygons in shapefile")
+VIRTUAL_OCCURRENCES_WINDOW = _(
+    "Expanding occurrences requires valid date__gte and date__lte dates."
+)
+VIRTUAL_OCCURRENCES_MAX_DAYS = _(
+    "The date window for expanding occurrences cannot be longer than {days} days."
+)
+VIRTUAL_OCCURRENCES_TOO_MANY = _(
+    "There are more than {limit} occurrences in the date window.  Please use a "
+    "shorter window or filter by task or location."
+)
+INVALID_ID = _("A valid integer is required.")
+INVALID_NDJSON = _("Invalid JSON on line {line}.")
+BULK_LIST_REQUIRED = _("Expected a list of objects.")
+DUPLICATE_IDEMPOTENCY_KEY = _("A submission with this idempotency key exists.")
+INVALID_CURSOR = _("Invalid cursor.")
+INVALID_EXPORT_FORMAT = _("Export format must be one of: {formats}.")
+INVALID_WATERMARK = _("A valid date and time is required.")
+EXPIRED_WATERMARK = _(
+    "Deletions are only kept for {days} days.  Please sync again without since."
+)
+UNKNOWN_SHAPEFILE_FIELD = _("The shapefile has no field called {field}.")
+MISSING_LOCATION_NAME = _("Feature {feature} has no name.")
+DUPLICATE_LOCATION_KEY = _("Feature {feature} has the same key as another: {key}.")
+UNKNOWN_PARENT_KEY = _("Feature {feature} has an unknown parent: {key}.")
+AMBIGUOUS_PARENT_KEY = _(
+    "Feature {feature} has a parent that matches more than one location: {key}."
+)
+CIRCULAR_PARENT_KEY = _("Feature {feature} is one of its own ancestors.")
+UNKNOWN_COUNTRY = _("Feature {feature} has an unknown country: {country}.")
+INVALID_GEOMETRY_OPTION = _("Geometry must be one of: {options}.")
+STALE_JOB = _("The job did not finish in time.")
@@ -48,3 +48,13 @@ class UnnecessaryFiles(Exception):
     """
 
     message = UNNECESSARY_FILE
+
+
+class LocationImportError(Exception):
+    """
+    Custom Exception raised when locations cannot be imported from a shapefile
+    """
+
+    def __init__(self, message):
+        super(LocationImportError, self).__init__(message)
+        self.message = message
@@ -0,0 +1,83 @@
+"""
+Streaming exports for tasking
+"""
+import csv
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it so that csv.writer
+    can produce the lines of a streaming response
+    """
+
+    def write(self, value):  # pylint: disable=no-self-use
+        """
+        Return value instead of storing it
+        """
+        return value
+
+
+def export_value(value):
+    """
+    Returns value in a form that can be written to CSV or JSON
+
+    Datetimes are in the current time zone, as they are in the API.
+    """
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(names, rows):
+    """
+    Yields a header line followed by a CSV line for each row
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow([export_value(value) for value in row])
+
+
+def stream_ndjson(names, rows):
+    """
+    Yields a line of JSON for each row
+    """
+    for row in rows:
+        values = (export_value(value) for value in row)
+        yield json.dumps(dict(zip(names, values))) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
+
+
+def export_queryset(queryset, fields, export_format, filename):
+    """
+    Returns a StreamingHttpResponse of the rows of queryset in export_format
+
+    fields is a list of (name, lookup) tuples.  Rows are read as tuples of
+    values through a server-side cursor, TASKING_EXPORT_CHUNK_SIZE at a
+    time, so memory use does not grow with the size of the export.
+    """
+    stream, content_type = EXPORT_FORMATS[export_format]
+    names = [name for name, _ in fields]
+    rows = queryset.values_list(*[lookup for _, lookup in fields]).iterator(
+        chunk_size=settings.TASKING_EXPORT_CHUNK_SIZE
+    )
+    response = StreamingHttpResponse(stream(names, rows), content_type=content_type)
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="{filename}.{export_format}"'
+    return response
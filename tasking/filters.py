@@ -1,6 +1,8 @@
 """
 Module containing the Filters for tasking app
 """
+from django.db.models import Exists, OuterRef
+
 from django_filters import rest_framework as rest_filters
 from rest_framework import filters
 
@@ -29,6 +31,8 @@ DATETIME_LOOKUPS = [
     "day__lte",
 ]
 TIME_LOOKUPS = ["exact", "gt", "lt", "gte", "lte"]
+DATE_LOWER_BOUNDS = {"date__gt", "date__gte"}
+DATE_UPPER_BOUNDS = {"date__lt", "date__lte"}
 
 
 class TaskOccurrenceFilterSet(rest_filters.FilterSet):
@@ -55,6 +59,11 @@ class TaskOccurrenceFilterSet(rest_filters.FilterSet):
 class TaskOccurenceFilter(filters.BaseFilterBackend):
     """
     Task filter backend that filters the TaskOccurences
+
+    Tasks are first narrowed down using their indexed first_occurrence_date
+    and last_occurrence_date columns.  When the occurrence filters are only
+    lower bounds, or only upper bounds, on the date that is all that is
+    needed; otherwise the occurrences themselves are checked.
     """
 
     def filter_queryset(self, request, queryset, view):
@@ -74,16 +83,33 @@ class TaskOccurenceFilter(filters.BaseFilterBackend):
                 if lookup in TIME_LOOKUPS and name in ["start_time", "end_time"]:
                     filter_args[key] = query_params.get(key)
 
+        if not filter_args:
+            return queryset
+
+        span_args = {}
+        for key, value in filter_args.items():
+            if key in DATE_LOWER_BOUNDS:
+                span_args[key.replace("date", "last_occurrence_date")] = value
+            elif key in DATE_UPPER_BOUNDS:
+                span_args[key.replace("date", "first_occurrence_date")] = value
+            elif key == "date__exact":
+                span_args["first_occurrence_date__lte"] = value
+                span_args["last_occurrence_date__gte"] = value
+        queryset = queryset.filter(**span_args)
+
+        if (
+            set(filter_args) <= DATE_LOWER_BOUNDS
+            or set(filter_args) <= DATE_UPPER_BOUNDS
+        ):
+            return queryset
+
         # pylint: disable=no-member
-        if filter_args:
-            task_ids = (
-                TaskOccurrence.objects.filter(**filter_args)
-                .values_list("task_id", flat=True)
-                .distinct()
-            )
-            return queryset.filter(id__in=task_ids)
-
-        return queryset
+        occurrences = TaskOccurrence.objects.filter(
+            task_id=OuterRef("pk"), **filter_args
+        )
+        return queryset.annotate(has_occurrences=Exists(occurrences)).filter(
+            has_occurrences=True
+        )
 
 
 class TaskFilterSet(rest_filters.FilterSet):
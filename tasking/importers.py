@@ -0,0 +1,461 @@
+"""
+Bulk imports for tasking
+"""
+import zipfile
+from collections import defaultdict, namedtuple
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.gis.gdal import GDALException
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import transaction
+from django.db.models import Case, F, Max, When
+
+from django_countries import countries
+
+from tasking.common_tags import (
+    AMBIGUOUS_PARENT_KEY,
+    CIRCULAR_PARENT_KEY,
+    DUPLICATE_LOCATION_KEY,
+    MISSING_LOCATION_NAME,
+    UNKNOWN_COUNTRY,
+    UNKNOWN_PARENT_KEY,
+    UNKNOWN_SHAPEFILE_FIELD,
+)
+from tasking.exceptions import LocationImportError
+from tasking.models import Location, LocationType
+from tasking.utils import get_shapefile, read_shapefile
+
+# a feature of a layer, read into the values of the location made from it
+LocationFeature = namedtuple(
+    "LocationFeature",
+    ["key", "parent_key", "name", "country", "location_type", "shapefile"],
+)
+
+
+def get_field_value(feature, field):
+    """
+    Returns the value of field in feature as a stripped string, or an empty
+    string if there is no field or no value
+    """
+    if not field:
+        return ""
+    value = feature.get(field)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def get_country_code(value, feature_number):
+    """
+    Returns the two letter code of the country value, which can be a two or
+    three letter code, a numeric code or the name of the country
+    """
+    if not value:
+        return ""
+    code = countries.alpha2(value) or countries.by_name(value)
+    if not code:
+        raise LocationImportError(
+            UNKNOWN_COUNTRY.format(feature=feature_number, country=value)
+        )
+    return code
+
+
+def get_feature_shapefile(feature):
+    """
+    Returns the geometry of feature as a MultiPolygon in WGS 84, or None if
+    it is not a Polygon or a MultiPolygon
+    """
+    try:
+        geom = feature.geom
+    except GDALException:
+        # the feature has no geometry
+        return None
+    if geom.srs is not None:
+        geom.transform(4326)
+    geos = geom.geos
+    geos.srid = 4326
+    if isinstance(geos, Polygon):
+        return MultiPolygon(geos, srid=4326)
+    if isinstance(geos, MultiPolygon):
+        return geos
+    return None
+
+
+# pylint: disable=too-many-arguments
+def read_location_features(  # pylint: disable=bad-continuation
+    layer,
+    name_field,
+    key_field=None,
+    parent_field=None,
+    country_field=None,
+    location_type_field=None,
+    country="",
+    location_type="",
+):
+    """
+    Returns a LocationFeature for each feature in layer
+
+    The *_field arguments are the names of the attribute columns that each
+    value is read from.  country and location_type are used for features
+    that have no value in country_field or location_type_field.
+    """
+    fields = [
+        name_field,
+        key_field,
+        parent_field,
+        country_field,
+        location_type_field,
+    ]
+    for field in fields:
+        if field and field not in layer.fields:
+            raise LocationImportError(UNKNOWN_SHAPEFILE_FIELD.format(field=field))
+
+    result = []
+    for number, feature in enumerate(layer, start=1):
+        name = get_field_value(feature, name_field)
+        if not name:
+            raise LocationImportError(MISSING_LOCATION_NAME.format(feature=number))
+        result.append(
+            LocationFeature(
+                key=get_field_value(feature, key_field),
+                parent_key=get_field_value(feature, parent_field),
+                name=name[:255],
+                country=get_country_code(
+                    get_field_value(feature, country_field) or country, number
+                ),
+                location_type=get_field_value(feature, location_type_field)
+                or location_type,
+                shapefile=get_feature_shapefile(feature),
+            )
+        )
+    return result
+
+
+def get_location_type_ids(names, LocationTypeModelClass=LocationType):
+    """
+    Returns a dict of the ids of the location types called names, creating
+    the ones that do not exist
+    """
+    names = set(names)
+    # pylint: disable=no-member
+    ids = dict(
+        LocationTypeModelClass.objects.filter(name__in=names).values_list("name", "id")
+    )
+    missing = [LocationTypeModelClass(name=name) for name in names if name not in ids]
+    for location_type in LocationTypeModelClass.objects.bulk_create(missing):
+        ids[location_type.name] = location_type.pk
+    return ids
+
+
+# pylint: disable=invalid-name,too-many-locals
+def get_location_parents(features, parent=None, LocationModelClass=Location):
+    """
+    Returns two dicts that link each feature to its parent, by the index of
+    the feature
+
+    The first has the index of the parent for features whose parent is
+    another feature.  The second has the existing location, or None, that
+    the other features go under.
+
+    A parent key that no feature has is looked up by name among the existing
+    locations (under parent, if given).  Features without a parent key go
+    under parent.
+    """
+    keys = {}
+    for index, feature in enumerate(features):
+        if feature.key:
+            if feature.key in keys:
+                raise LocationImportError(
+                    DUPLICATE_LOCATION_KEY.format(feature=index + 1, key=feature.key)
+                )
+            keys[feature.key] = index
+
+    missing = {
+        feature.parent_key
+        for feature in features
+        if feature.parent_key and feature.parent_key not in keys
+    }
+    existing = defaultdict(list)
+    if missing:
+        if parent is not None:
+            queryset = parent.get_descendants(include_self=True)
+        else:
+            queryset = LocationModelClass.objects.all()
+        for location in queryset.filter(name__in=missing).order_by("id"):
+            existing[location.name].append(location)
+
+    parent_indexes = {}
+    parent_locations = {}
+    for index, feature in enumerate(features):
+        if not feature.parent_key:
+            parent_locations[index] = parent
+        elif feature.parent_key in keys:
+            parent_indexes[index] = keys[feature.parent_key]
+        else:
+            matches = existing.get(feature.parent_key, [])
+            if not matches:
+                raise LocationImportError(
+                    UNKNOWN_PARENT_KEY.format(feature=index + 1, key=feature.parent_key)
+                )
+            if len(matches) > 1:
+                raise LocationImportError(
+                    AMBIGUOUS_PARENT_KEY.format(
+                        feature=index + 1, key=feature.parent_key
+                    )
+                )
+            parent_locations[index] = matches[0]
+    return parent_indexes, parent_locations
+
+
+def get_location_depths(parent_indexes, count):
+    """
+    Returns the depth of each of count features below the location that its
+    top-most ancestor among the features goes under
+    """
+    depths = {}
+    for index in range(count):
+        path = []
+        seen = set()
+        node = index
+        while node not in depths:
+            if node not in parent_indexes:
+                depths[node] = 0
+                break
+            if node in seen:
+                raise LocationImportError(CIRCULAR_PARENT_KEY.format(feature=index + 1))
+            path.append(node)
+            seen.add(node)
+            node = parent_indexes[node]
+        for node in reversed(path):
+            depths[node] = depths[parent_indexes[node]] + 1
+    return [depths[index] for index in range(count)]
+
+
+def number_subtree(top, children, tree_fields, start, level, tree_id):
+    """
+    Sets the lft, rght, level and tree_id of the features in the subtree of
+    top, whose lft is start and whose level is level
+
+    Returns the value after the rght of top.
+    """
+    counter = start
+    stack = [(top, level, False)]
+    while stack:
+        node, node_level, visited = stack.pop()
+        if visited:
+            tree_fields[node]["rght"] = counter
+            counter += 1
+            continue
+        tree_fields[node] = {"lft": counter, "level": node_level, "tree_id": tree_id}
+        counter += 1
+        stack.append((node, node_level, True))
+        stack.extend(
+            (child, node_level + 1, False) for child in reversed(children[node])
+        )
+    return counter
+
+
+def count_subtree(top, children):
+    """
+    Returns the number of features in the subtree of top
+    """
+    count = 0
+    stack = [top]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(children[node])
+    return count
+
+
+# pylint: disable=invalid-name,too-many-locals,too-many-branches
+def bulk_create_locations(  # pylint: disable=bad-continuation
+    features,
+    parent=None,
+    batch_size=None,
+    LocationModelClass=Location,
+    LocationTypeModelClass=LocationType,
+):
+    """
+    Creates a location for each LocationFeature in features
+
+    It works this way:
+        - the parent of each feature is found by its parent key (see
+          get_location_parents), and features are ordered the way that MPTT
+          orders them i.e. children after their siblings that come before
+          them in features, and after any existing children
+        - the tree fields of the new locations are worked out up front.  New
+          root locations get new trees, and new locations under existing
+          ones get the space they need in the existing trees in one UPDATE
+          per existing parent
+        - the locations are saved level by level, in INSERT statements of at
+          most batch_size rows each, so that each level knows the ids of its
+          parents
+
+    All of this is done in one transaction, so nothing is saved if anything
+    fails.
+
+    Returns a list of the new locations, in the order of features
+    """
+    if batch_size is None:
+        batch_size = settings.TASKING_LOCATION_IMPORT_BATCH_SIZE
+    features = list(features)
+    count = len(features)
+    if not count:
+        return []
+
+    parent_indexes, parent_locations = get_location_parents(
+        features, parent=parent, LocationModelClass=LocationModelClass
+    )
+    depths = get_location_depths(parent_indexes, count)
+    children = defaultdict(list)
+    for index in range(count):
+        if index in parent_indexes:
+            children[parent_indexes[index]].append(index)
+
+    # the top-most new locations, grouped by the existing location they go
+    # under, or None
+    tops = defaultdict(list)
+    for index in range(count):
+        if index in parent_locations:
+            location = parent_locations[index]
+            tops[location.pk if location is not None else None].append(index)
+
+    tree_fields = {}
+    with transaction.atomic():
+        location_type_ids = get_location_type_ids(
+            [feature.location_type for feature in features if feature.location_type],
+            LocationTypeModelClass=LocationTypeModelClass,
+        )
+
+        existing_ids = [pk for pk in tops if pk is not None]
+        sizes = {
+            pk: sum(2 * count_subtree(top, children) for top in tops[pk])
+            for pk in existing_ids
+        }
+        # pylint: disable=no-member
+        for pk in existing_ids:
+            # make room at the end of the children of the existing location
+            rght, tree_id = (
+                LocationModelClass.objects.select_for_update()
+                .filter(pk=pk)
+                .values_list("rght", "tree_id")
+                .get()
+            )
+            LocationModelClass.objects.filter(tree_id=tree_id, rght__gte=rght).update(
+                lft=Case(
+                    When(lft__gte=rght, then=F("lft") + sizes[pk]), default=F("lft")
+                ),
+                rght=F("rght") + sizes[pk],
+            )
+
+        # the room made under each existing location ends just before its
+        # rght, wherever later updates have moved it to
+        for pk, rght, level, tree_id in LocationModelClass.objects.filter(
+            pk__in=existing_ids
+        ).values_list("pk", "rght", "level", "tree_id"):
+            start = rght - sizes[pk]
+            for top in tops[pk]:
+                start = number_subtree(
+                    top, children, tree_fields, start, level + 1, tree_id
+                )
+
+        if tops[None]:
+            tree_id = (
+                LocationModelClass.objects.aggregate(tree_id=Max("tree_id"))["tree_id"]
+                or 0
+            )
+            for top in tops[None]:
+                tree_id += 1
+                number_subtree(top, children, tree_fields, 1, 0, tree_id)
+
+        locations = [None] * count
+        for depth in range(max(depths) + 1):
+            level_indexes = [index for index in range(count) if depths[index] == depth]
+            level_locations = []
+            for index in level_indexes:
+                feature = features[index]
+                if index in parent_indexes:
+                    parent_id = locations[parent_indexes[index]].pk
+                else:
+                    location = parent_locations[index]
+                    parent_id = location.pk if location is not None else None
+                location = LocationModelClass(
+                    name=feature.name,
+                    country=feature.country,
+                    location_type_id=location_type_ids.get(feature.location_type),
+                    shapefile=feature.shapefile,
+                    parent_id=parent_id,
+                    **tree_fields[index],
+                )
+                # bulk_create does not call save, which sets these
+                location.set_simplified_shapefiles()
+                level_locations.append(location)
+            # siblings are saved in the order of features so that the order
+            # of their ids is the order of their tree fields
+            LocationModelClass.objects.bulk_create(
+                level_locations, batch_size=batch_size
+            )
+            for index, location in zip(level_indexes, level_locations):
+                locations[index] = location
+
+    return locations
+
+
+# pylint: disable=too-many-arguments
+def import_locations(  # pylint: disable=bad-continuation
+    geofile,
+    name_field,
+    key_field=None,
+    parent_field=None,
+    country_field=None,
+    location_type_field=None,
+    country="",
+    location_type="",
+    parent=None,
+    batch_size=None,
+):
+    """
+    Creates a location for each feature in the first layer of the zipped
+    shapefile geofile, which can be a path or a file-like object
+
+    The feature's name_field becomes the location's name and its
+    country_field and location_type_field, if given, its country and
+    location type (which is created if there is none with that name).
+    country and location_type are used for features that have no value in
+    those fields.
+
+    Features whose parent_field matches the key_field of another feature go
+    under that feature.  Other parent_field values are matched against the
+    names of existing locations (under parent, if given).  Features without
+    a parent_field value go under parent, or become root locations.
+
+    Polygon and MultiPolygon geometries are saved as the location's
+    shapefile, in WGS 84.
+
+    Raises LocationImportError if the features cannot be imported, and
+    ShapeFileNotFound, MissingFiles, UnnecessaryFiles or GDALException if
+    the shapefile cannot be read.
+
+    Returns a dict with the number of locations created and the number of
+    seconds it took
+    """
+    started = perf_counter()
+    shpfile = get_shapefile(zipfile.ZipFile(geofile))
+    features = read_shapefile(
+        geofile,
+        shpfile,
+        lambda layer: read_location_features(
+            layer,
+            name_field=name_field,
+            key_field=key_field,
+            parent_field=parent_field,
+            country_field=country_field,
+            location_type_field=location_type_field,
+            country=country,
+            location_type=location_type,
+        ),
+    )
+    locations = bulk_create_locations(features, parent=parent, batch_size=batch_size)
+    return {"locations": len(locations), "seconds": perf_counter() - started}
@@ -0,0 +1,442 @@
+"""
+Background jobs for tasking
+
+Work such as generating the occurrences of a task is described by a Job and
+handed to the backend named by the TASKING_JOB_BACKEND setting:
+
+    tasking.jobs.SyncBackend - runs jobs straight away, in the calling thread
+    tasking.jobs.ThreadPoolBackend - runs jobs in an in-process thread pool
+    tasking.jobs.DatabaseBackend - leaves jobs in the database table, to be
+        run by the process_jobs management command
+"""
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.gis.geos import MultiPolygon
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tasking.common_tags import INVALID_SHAPEFILE, NO_VALID_POLYGONS, STALE_JOB
+from tasking.models import Job
+from tasking.utils import (
+    get_polygons,
+    get_shapefile,
+    read_shapefile,
+    sync_task_occurrences,
+)
+
+TASK_OCCURRENCES_JOB = "task_occurrences"
+LOCATION_SHAPEFILE_JOB = "location_shapefile"
+
+JOB_HANDLERS = {}
+# the job types whose handlers are not run in a transaction
+NON_ATOMIC_JOB_TYPES = set()
+
+
+def register_job(job_type, atomic=True):
+    """
+    Decorator that registers a function as the handler of a job type
+
+    The handler is called with the Job that is being run.  It is run in a
+    transaction unless atomic is False, which lets handlers that report
+    their progress make it visible while they run.
+    """
+
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        if atomic:
+            NON_ATOMIC_JOB_TYPES.discard(job_type)
+        else:
+            NON_ATOMIC_JOB_TYPES.add(job_type)
+        return func
+
+    return decorator
+
+
+def report_job_progress(job, progress, total=None):
+    """
+    Record the number of items that job has done, and the number it has to
+    do if total is given
+
+    Only the progress fields are written, so that this can be called while
+    the job runs.  Nothing is written for jobs that are not saved.
+    """
+    job.progress = progress
+    job.modified = timezone.now()
+    fields = {"progress": progress, "modified": job.modified}
+    if total is not None:
+        job.total = total
+        fields["total"] = total
+    if job.pk is not None:
+        type(job).objects.filter(pk=job.pk).update(**fields)
+
+
+@register_job(TASK_OCCURRENCES_JOB)
+def run_task_occurrences_job(job):
+    """
+    Bring the occurrences of the job's target task in line with its
+    timing_rule
+    """
+    task = job.target_content_object
+    if task is not None and task.timing_rule:
+        sync_task_occurrences(task=task, timing_rule=task.timing_rule)
+
+
+def get_job_input_file(job):
+    """
+    Returns the input file of job as a path if it is stored on the local
+    file system, or as a file-like object otherwise
+    """
+    try:
+        return job.input_file.path
+    except NotImplementedError:
+        with job.input_file.open("rb") as input_file:
+            return BytesIO(input_file.read())
+
+
+@register_job(LOCATION_SHAPEFILE_JOB, atomic=False)
+def run_location_shapefile_job(job):
+    """
+    Set the shapefile of the job's target location from the zipped
+    shapefile stored as the job's input file
+
+    The features are read outside of a transaction, reporting progress every
+    TASKING_JOB_PROGRESS_INTERVAL features, and only the location is saved
+    in one.  The input file is removed once the location is saved.
+    """
+    location = job.target_content_object
+    if location is None:
+        return
+
+    geofile = get_job_input_file(job)
+    shpfile = get_shapefile(zipfile.ZipFile(geofile))
+    interval = settings.TASKING_JOB_PROGRESS_INTERVAL
+
+    def read_geoms(layer):
+        """
+        Returns the geometries of the features in layer, reporting progress
+        """
+        total = len(layer)
+        report_job_progress(job, 0, total)
+        geoms = []
+        for number, feature in enumerate(layer, start=1):
+            geoms.append(feature.geom)
+            if number % interval == 0:
+                report_job_progress(job, number)
+        report_job_progress(job, total)
+        return geoms
+
+    polygons = get_polygons(read_shapefile(geofile, shpfile, read_geoms))
+    if not polygons:
+        raise ValueError(NO_VALID_POLYGONS)
+    try:
+        multipolygon = MultiPolygon(polygons)
+    except TypeError:
+        raise ValueError(INVALID_SHAPEFILE)
+
+    with transaction.atomic():
+        location.shapefile = multipolygon
+        location.save()
+    job.input_file.delete(save=False)
+    type(job).objects.filter(pk=job.pk).update(input_file="")
+
+
+def execute_job(job, retry=True, reraise=False):
+    """
+    Run a job that has been marked as running and record the outcome
+
+    A job that raises an error is put back in the queue until it has been
+    attempted TASKING_JOB_MAX_ATTEMPTS times, after which it is marked as
+    failed.  It is not run again for TASKING_JOB_RETRY_DELAY seconds, a wait
+    that doubles with each attempt.  Pass retry=False to mark it as failed
+    straight away, and reraise=True to raise the error once the outcome has
+    been recorded.
+
+    The outcome is only saved if the job has been saved.
+    """
+    handler = JOB_HANDLERS[job.job_type]
+    failure = None
+    try:
+        if job.job_type in NON_ATOMIC_JOB_TYPES:
+            handler(job)
+        else:
+            with transaction.atomic():
+                handler(job)
+    except Exception as exception:  # pylint: disable=broad-except
+        failure = exception
+        # tasking exceptions keep their message in an attribute
+        job.error = str(getattr(exception, "message", exception))
+        if retry and job.attempts < settings.TASKING_JOB_MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.TASKING_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+    else:
+        job.error = ""
+        job.status = Job.SUCCEEDED
+    job.finished = timezone.now()
+    if job.pk is not None:
+        job.save(update_fields=["status", "error", "run_after", "finished", "modified"])
+    if reraise and failure is not None:
+        raise failure
+    return job
+
+
+def start_job(job):
+    """
+    Mark a job as running, saving it only if it has been saved before
+    """
+    job.status = Job.RUNNING
+    job.attempts += 1
+    job.started = timezone.now()
+    job.finished = None
+    job.progress = 0
+    if job.pk is not None:
+        job.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "started",
+                "finished",
+                "progress",
+                "modified",
+            ]
+        )
+    return job
+
+
+def reset_stale_jobs(JobModelClass=Job):
+    """
+    Put back in the queue the running jobs that have not been touched for
+    TASKING_JOB_TIMEOUT seconds, e.g. because their worker died
+
+    Jobs that have already been attempted TASKING_JOB_MAX_ATTEMPTS times are
+    marked as failed instead.  Returns the number of jobs that were reset.
+    """
+    timeout = settings.TASKING_JOB_TIMEOUT
+    if not timeout:
+        return 0
+    now = timezone.now()
+    # pylint: disable=no-member
+    stale = JobModelClass.objects.filter(
+        status=JobModelClass.RUNNING, modified__lt=now - timedelta(seconds=timeout)
+    )
+    failed = stale.filter(attempts__gte=settings.TASKING_JOB_MAX_ATTEMPTS).update(
+        status=JobModelClass.FAILED, error=STALE_JOB, finished=now, modified=now
+    )
+    retried = stale.update(status=JobModelClass.PENDING, modified=now)
+    return failed + retried
+
+
+def prune_jobs(keep_days, JobModelClass=Job):
+    """
+    Deletes the jobs that finished more than keep_days days ago, along with
+    their input files
+
+    Returns the number of jobs deleted
+    """
+    cut_off = timezone.now() - timedelta(days=keep_days)
+    # pylint: disable=no-member
+    old_jobs = JobModelClass.objects.filter(
+        status__in=[JobModelClass.SUCCEEDED, JobModelClass.FAILED],
+        finished__lt=cut_off,
+    )
+    for job in old_jobs.exclude(input_file="").only("id", "input_file"):
+        job.input_file.delete(save=False)
+    deleted, _ = old_jobs.delete()
+    return deleted
+
+
+def claim_jobs(limit, JobModelClass=Job):
+    """
+    Claim up to limit pending jobs and mark them as running
+
+    Rows that are locked by other workers are skipped so that many workers
+    can take jobs from the same table, and so are failed jobs that are
+    waiting to be retried.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            JobModelClass.objects.select_for_update(skip_locked=True)
+            .filter(status=JobModelClass.PENDING)
+            .filter(Q(run_after__isnull=True) | Q(run_after__lte=now))
+            .order_by("created", "id")[:limit]
+        )
+        for job in jobs:
+            job.status = JobModelClass.RUNNING
+            job.attempts += 1
+            job.started = now
+            job.finished = None
+            job.progress = 0
+            job.modified = now
+        JobModelClass.objects.bulk_update(
+            jobs, ["status", "attempts", "started", "finished", "progress", "modified"]
+        )
+    return jobs
+
+
+def process_jobs(limit=None, JobModelClass=Job):
+    """
+    Run pending jobs until there are none left, or until limit jobs have
+    been run
+
+    Running jobs that have timed out are put back in the queue first.
+    Returns the jobs that were run.
+    """
+    reset_stale_jobs(JobModelClass=JobModelClass)
+    processed = []
+    while limit is None or len(processed) < limit:
+        size = settings.TASKING_JOB_BATCH_SIZE
+        if limit is not None:
+            size = min(size, limit - len(processed))
+        jobs = claim_jobs(size, JobModelClass=JobModelClass)
+        if not jobs:
+            break
+        processed.extend(execute_job(job) for job in jobs)
+    return processed
+
+
+class SyncBackend:
+    """
+    Job backend that runs jobs straight away, in the calling thread
+
+    Errors raised by jobs are recorded and then raised to the caller.  Jobs
+    without an input file are not saved, see enqueue_job.
+    """
+
+    deferred = False
+
+    def enqueue(self, job):  # pylint: disable=no-self-use
+        """
+        Run the job
+        """
+        execute_job(start_job(job), retry=False, reraise=True)
+
+
+def _run_job_in_thread(job_id):
+    """
+    Run a job in a worker thread
+    """
+    close_old_connections()
+    try:
+        # pylint: disable=no-member
+        job = Job.objects.filter(pk=job_id, status=Job.PENDING).first()
+        if job is not None:
+            execute_job(start_job(job), retry=False)
+    finally:
+        connections.close_all()
+
+
+class ThreadPoolBackend:
+    """
+    Job backend that runs jobs in an in-process thread pool
+
+    Jobs are submitted once the current transaction commits so that the
+    worker threads see the rows that the job works on.  Jobs are lost if the
+    process exits before they are run; the process_jobs management command
+    picks up any that are left pending.
+    """
+
+    deferred = True
+    executor = None
+
+    @classmethod
+    def get_executor(cls):
+        """
+        Return the thread pool, creating it the first time it is needed
+        """
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(
+                max_workers=settings.TASKING_JOB_THREAD_POOL_SIZE,
+                thread_name_prefix="tasking-jobs",
+            )
+        return cls.executor
+
+    def enqueue(self, job):
+        """
+        Submit the job to the thread pool
+        """
+        transaction.on_commit(
+            lambda: self.get_executor().submit(_run_job_in_thread, job.pk)
+        )
+
+
+class DatabaseBackend:
+    """
+    Job backend that leaves jobs in the database table, to be run by the
+    process_jobs management command
+    """
+
+    deferred = True
+
+    def enqueue(self, job):  # pylint: disable=no-self-use
+        """
+        Leave the job for a worker
+        """
+        return None
+
+
+def get_job_backend():
+    """
+    Return an instance of the backend named by TASKING_JOB_BACKEND
+    """
+    return import_string(settings.TASKING_JOB_BACKEND)()
+
+
+def enqueue_job(job_type, target, input_file=None, JobModelClass=Job):
+    """
+    Record a job of job_type for target and hand it to the job backend
+
+    When the backend runs jobs later, a job of the same type that is still
+    pending for the same target is returned instead of queueing the same
+    work twice, since handlers work from the current state of their target.
+    If input_file is given, it replaces the input file of that job.
+
+    When the backend runs jobs straight away, a job without an input file is
+    run without being saved: nothing else could look it up before it is done,
+    and saving it would add an INSERT and two UPDATEs to the work it does
+    e.g. on every save of a task whose timing changes.  The returned job then
+    has no pk.
+    """
+    backend = get_job_backend()
+    content_type = ContentType.objects.get_for_model(target)
+    if backend.deferred:
+        with transaction.atomic():
+            # the job is locked so that workers do not claim it while its
+            # input file is being replaced
+            job = (
+                JobModelClass.objects.select_for_update()
+                .filter(
+                    job_type=job_type,
+                    status=JobModelClass.PENDING,
+                    target_content_type=content_type,
+                    target_object_id=target.pk,
+                )
+                .order_by("created")
+                .first()
+            )
+            if job is not None:
+                if input_file is not None:
+                    job.input_file.delete(save=False)
+                    job.input_file = input_file
+                    job.save(update_fields=["input_file", "modified"])
+                return job
+
+    job = JobModelClass(
+        job_type=job_type, target_content_type=content_type, target_object_id=target.pk
+    )
+    if input_file is not None:
+        job.input_file = input_file
+    if backend.deferred or input_file is not None:
+        job.save()
+    backend.enqueue(job)
+    return job
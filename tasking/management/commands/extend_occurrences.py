@@ -0,0 +1,76 @@
+"""
+Management command to extend task occurrences up to the rolling horizon
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import ugettext as _
+
+from tasking.management.utils import report_throughput
+from tasking.models import Task
+from tasking.utils import (
+    OCCURRENCE_BATCH_SIZE,
+    OCCURRENCE_TASK_CHUNK_SIZE,
+    extend_task_occurrences,
+    prune_task_occurrences,
+)
+
+
+class Command(BaseCommand):
+    """
+    Extend the materialized task occurrences up to the rolling horizon
+
+    This is meant to be run periodically e.g. daily.
+    """
+
+    help = _("Extend the materialized task occurrences up to the rolling horizon.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=None,
+            help=_("Delete occurrences that are older than this number of days."),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=OCCURRENCE_TASK_CHUNK_SIZE,
+            help=_("The number of tasks processed at a time."),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OCCURRENCE_BATCH_SIZE,
+            help=_("The maximum number of occurrences per INSERT statement."),
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TASKING_OCCURRENCE_HORIZON_DAYS:
+            raise CommandError(_("TASKING_OCCURRENCE_HORIZON_DAYS is not set."))
+
+        # pylint: disable=no-member
+        queryset = (
+            Task.objects.filter(
+                (Q(timing_rule__isnull=False) & ~Q(timing_rule=""))
+                | Q(tasklocation__isnull=False)
+            )
+            .filter(Q(end__isnull=True) | Q(end__gte=timezone.now()))
+            .distinct()
+            .order_by("id")
+        )
+
+        result = extend_task_occurrences(
+            queryset,
+            chunk_size=options["chunk_size"],
+            batch_size=options["batch_size"],
+        )
+
+        report_throughput(self.stdout, _("Added"), _("tasks"), result)
+
+        if options["keep_days"] is not None:
+            deleted = prune_task_occurrences(options["keep_days"])
+            self.stdout.write(
+                _("Deleted {deleted} old occurrences").format(deleted=deleted)
+            )
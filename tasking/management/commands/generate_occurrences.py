@@ -0,0 +1,80 @@
+"""
+Management command to generate task occurrences in bulk
+"""
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext as _
+
+from tasking.management.utils import report_throughput
+from tasking.models import Task
+from tasking.utils import (
+    OCCURRENCE_BATCH_SIZE,
+    OCCURRENCE_TASK_CHUNK_SIZE,
+    bulk_generate_task_occurrences,
+    bulk_generate_tasklocation_occurrences,
+)
+
+
+class Command(BaseCommand):
+    """
+    Generate task occurrences for many tasks in one pass
+    """
+
+    help = _("Generate task occurrences for many tasks in one pass.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--task",
+            action="append",
+            type=int,
+            dest="task_ids",
+            help=_("Only generate occurrences for this task id (repeatable)."),
+        )
+        parser.add_argument(
+            "--locations",
+            action="store_true",
+            help=_("Also generate occurrences from the task locations of the tasks."),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=OCCURRENCE_TASK_CHUNK_SIZE,
+            help=_("The number of tasks processed at a time."),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OCCURRENCE_BATCH_SIZE,
+            help=_("The maximum number of occurrences per INSERT statement."),
+        )
+
+    def handle(self, *args, **options):
+        # pylint: disable=no-member
+        queryset = (
+            Task.objects.exclude(timing_rule__isnull=True)
+            .exclude(timing_rule="")
+            .order_by("id")
+        )
+        if options["task_ids"]:
+            queryset = queryset.filter(id__in=options["task_ids"])
+
+        result = bulk_generate_task_occurrences(
+            queryset,
+            chunk_size=options["chunk_size"],
+            batch_size=options["batch_size"],
+        )
+        report_throughput(self.stdout, _("Generated"), _("tasks"), result)
+
+        if options["locations"]:
+            # pylint: disable=no-member
+            queryset = Task.objects.filter(tasklocation__isnull=False).distinct()
+            if options["task_ids"]:
+                queryset = queryset.filter(id__in=options["task_ids"])
+
+            result = bulk_generate_tasklocation_occurrences(
+                queryset.order_by("id"),
+                chunk_size=options["chunk_size"],
+                batch_size=options["batch_size"],
+            )
+            report_throughput(
+                self.stdout, _("Generated"), _("tasks from their locations"), result
+            )
@@ -0,0 +1,115 @@
+"""
+Management command to import locations from a shapefile
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import ugettext as _
+
+from tasking.exceptions import (
+    LocationImportError,
+    MissingFiles,
+    ShapeFileNotFound,
+    UnnecessaryFiles,
+)
+from tasking.importers import import_locations
+from tasking.models import Location
+
+
+class Command(BaseCommand):
+    """
+    Create a location for each feature of a zipped shapefile
+
+    See tasking.importers.import_locations for how the attributes of the
+    features are mapped to locations.
+    """
+
+    help = _("Create a location for each feature of a zipped shapefile.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help=_("The path of the zipped shapefile."))
+        parser.add_argument(
+            "--name-field",
+            required=True,
+            help=_("The field that has the name of each location."),
+        )
+        parser.add_argument(
+            "--key-field",
+            help=_("The field that identifies each feature to its children."),
+        )
+        parser.add_argument(
+            "--parent-field",
+            help=_(
+                "The field that has the key of the parent feature, or the name "
+                "of the existing parent location."
+            ),
+        )
+        parser.add_argument(
+            "--country-field",
+            help=_("The field that has the country name or code of each location."),
+        )
+        parser.add_argument(
+            "--location-type-field",
+            help=_("The field that has the location type name of each location."),
+        )
+        parser.add_argument(
+            "--country",
+            default="",
+            help=_("The country code of locations that have no country field."),
+        )
+        parser.add_argument(
+            "--location-type",
+            default="",
+            help=_("The location type name of locations that have none."),
+        )
+        parser.add_argument(
+            "--parent",
+            type=int,
+            help=_("The id of the location that top-level features go under."),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help=_("The maximum number of locations per INSERT statement."),
+        )
+
+    def handle(self, *args, **options):
+        parent = None
+        if options["parent"] is not None:
+            try:
+                parent = Location.objects.get(pk=options["parent"])
+            except Location.DoesNotExist:  # pylint: disable=no-member
+                raise CommandError(
+                    _("There is no location with id {id}.").format(id=options["parent"])
+                )
+
+        try:
+            result = import_locations(
+                options["path"],
+                name_field=options["name_field"],
+                key_field=options["key_field"],
+                parent_field=options["parent_field"],
+                country_field=options["country_field"],
+                location_type_field=options["location_type_field"],
+                country=options["country"],
+                location_type=options["location_type"],
+                parent=parent,
+                batch_size=options["batch_size"],
+            )
+        except (  # pylint: disable=bad-continuation
+            LocationImportError,
+            ShapeFileNotFound,
+            MissingFiles,
+            UnnecessaryFiles,
+        ) as exc:
+            raise CommandError(exc.message)  # pylint: disable=no-member
+
+        seconds = max(result["seconds"], 1e-9)
+        self.stdout.write(
+            _(
+                "Imported {locations} locations in {seconds:.2f}s "
+                "({rate:.1f} locations/s)"
+            ).format(
+                locations=result["locations"],
+                seconds=result["seconds"],
+                rate=result["locations"] / seconds,
+            )
+        )
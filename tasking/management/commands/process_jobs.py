@@ -0,0 +1,54 @@
+"""
+Management command to run pending background jobs
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext as _
+
+from tasking.jobs import process_jobs
+from tasking.models import Job
+
+
+class Command(BaseCommand):
+    """
+    Run the background jobs that are waiting in the database table
+
+    This is the worker for tasking.jobs.DatabaseBackend.  Many workers can
+    be run at the same time.
+    """
+
+    help = _("Run pending background jobs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help=_("The maximum number of jobs to run."),
+        )
+        parser.add_argument(
+            "--forever",
+            action="store_true",
+            help=_("Keep waiting for new jobs instead of exiting when done."),
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5,
+            help=_("The number of seconds to wait between checks for new jobs."),
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = process_jobs(limit=options["limit"])
+            failed = sum(1 for job in jobs if job.status == Job.FAILED)
+            if jobs or not options["forever"]:
+                self.stdout.write(
+                    _("Ran {jobs} jobs, {failed} failed").format(
+                        jobs=len(jobs), failed=failed
+                    )
+                )
+            if not options["forever"]:
+                break
+            time.sleep(options["sleep"])
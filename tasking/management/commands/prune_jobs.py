@@ -0,0 +1,31 @@
+"""
+Management command to delete old background jobs
+"""
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext as _
+
+from tasking.jobs import prune_jobs
+
+
+class Command(BaseCommand):
+    """
+    Delete the background jobs that finished a while ago
+
+    Jobs that are run later, and jobs that have an input file, are recorded
+    in the database table, so this is meant to be run periodically e.g.
+    daily.
+    """
+
+    help = _("Delete background jobs that finished a while ago.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=30,
+            help=_("Delete jobs that finished more than this number of days ago."),
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_jobs(options["keep_days"])
+        self.stdout.write(_("Deleted {deleted} old jobs").format(deleted=deleted))
@@ -0,0 +1,42 @@
+"""
+Management command to delete old records of deleted objects
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import ugettext as _
+
+from tasking.utils import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Delete the tombstones that are older than the sync endpoint keeps them
+    for
+
+    The sync endpoint asks clients whose watermark is older than
+    TASKING_TOMBSTONE_RETENTION_DAYS to sync again from scratch, so older
+    tombstones are not needed.  This is meant to be run periodically e.g.
+    daily.
+    """
+
+    help = _("Delete the records of deleted objects that are no longer synced.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=None,
+            help=_(
+                "Delete tombstones that are older than this number of days.  "
+                "Defaults to TASKING_TOMBSTONE_RETENTION_DAYS."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        keep_days = options["keep_days"]
+        if keep_days is None:
+            keep_days = settings.TASKING_TOMBSTONE_RETENTION_DAYS
+        if keep_days is None:
+            raise CommandError(_("TASKING_TOMBSTONE_RETENTION_DAYS is not set."))
+        deleted = prune_tombstones(keep_days)
+        self.stdout.write(_("Deleted {deleted} old tombstones").format(deleted=deleted))
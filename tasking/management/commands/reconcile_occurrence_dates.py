@@ -0,0 +1,25 @@
+"""
+Management command to fix the occurrence dates of tasks
+"""
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext as _
+
+from tasking.utils import reconcile_occurrence_dates
+
+
+class Command(BaseCommand):
+    """
+    Fix the first_occurrence_date and last_occurrence_date of tasks that
+    have drifted from the occurrences they actually have
+
+    This is only needed after occurrences have been changed in bulk e.g.
+    using QuerySet.update or QuerySet.delete.
+    """
+
+    help = _("Fix the first and last occurrence dates of tasks.")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_occurrence_dates()
+        self.stdout.write(
+            _("Fixed the occurrence dates of {tasks} tasks").format(tasks=fixed)
+        )
@@ -0,0 +1,25 @@
+"""
+Management command to fix the submission counts of tasks
+"""
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext as _
+
+from tasking.utils import reconcile_submission_counts
+
+
+class Command(BaseCommand):
+    """
+    Fix the submission_count of tasks that has drifted from the number of
+    submissions they actually have
+
+    This is only needed after submissions have been changed in bulk e.g.
+    using QuerySet.update or QuerySet.delete.
+    """
+
+    help = _("Fix the submission counts of tasks.")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_submission_counts()
+        self.stdout.write(
+            _("Fixed the submission count of {tasks} tasks").format(tasks=fixed)
+        )
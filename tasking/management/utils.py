@@ -0,0 +1,29 @@
+"""
+Utility functions for tasking management commands
+"""
+from django.utils.translation import ugettext as _
+
+
+def report_throughput(stdout, action, subject, result):
+    """
+    Write out the throughput of occurrence generation
+
+    result is a dict with the number of tasks, the number of occurrences and
+    the number of seconds, as returned by the bulk occurrence functions.
+    """
+    seconds = max(result["seconds"], 1e-9)
+    stdout.write(
+        _(
+            "{action} {occurrences} occurrences for {tasks} {subject} in "
+            "{seconds:.2f}s ({tasks_rate:.1f} tasks/s, "
+            "{occurrences_rate:.1f} occurrences/s)"
+        ).format(
+            action=action,
+            subject=subject,
+            occurrences=result["occurrences"],
+            tasks=result["tasks"],
+            seconds=result["seconds"],
+            tasks_rate=result["tasks"] / seconds,
+            occurrences_rate=result["occurrences"] / seconds,
+        )
+    )
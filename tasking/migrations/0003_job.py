@@ -0,0 +1,122 @@
+# Generated by Django 2.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasking", "0002_auto_20180705_1110"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "target_object_id",
+                    models.PositiveIntegerField(
+                        blank=True, db_index=True, default=None, null=True
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(auto_now=True, verbose_name="Modified"),
+                ),
+                (
+                    "job_type",
+                    models.CharField(
+                        db_index=True,
+                        help_text="The kind of work that this job does.",
+                        max_length=255,
+                        verbose_name="Job Type",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("p", "Pending"),
+                            ("r", "Running"),
+                            ("s", "Succeeded"),
+                            ("f", "Failed"),
+                        ],
+                        db_index=True,
+                        default="p",
+                        help_text="The status of the Job",
+                        max_length=1,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="The number of times this job has been run.",
+                        verbose_name="Attempts",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True,
+                        default="",
+                        help_text="The error raised by the last run of this job.",
+                        verbose_name="Error",
+                    ),
+                ),
+                (
+                    "started",
+                    models.DateTimeField(
+                        blank=True,
+                        default=None,
+                        help_text="The date and time the last run of this job "
+                        "started.",
+                        null=True,
+                        verbose_name="Started",
+                    ),
+                ),
+                (
+                    "finished",
+                    models.DateTimeField(
+                        blank=True,
+                        default=None,
+                        help_text="The date and time the last run of this job "
+                        "finished.",
+                        null=True,
+                        verbose_name="Finished",
+                    ),
+                ),
+                (
+                    "target_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="contenttypes.ContentType",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created", "-id"],
+                "abstract": False,
+                "index_together": {("status", "created")},
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 2.2 on 2026-10-18 12:30
+
+from django.db import migrations, models
+from django.db.models import Max, Min, OuterRef, Subquery
+
+
+def set_occurrence_dates(apps, schema_editor):
+    """
+    Store the first and last occurrence dates of existing tasks
+    """
+    Task = apps.get_model("tasking", "Task")
+    TaskOccurrence = apps.get_model("tasking", "TaskOccurrence")
+    occurrences = (
+        TaskOccurrence.objects.filter(task_id=OuterRef("pk"))
+        .order_by()
+        .values("task_id")
+    )
+    Task.objects.update(
+        first_occurrence_date=Subquery(
+            occurrences.annotate(first_date=Min("date")).values("first_date")
+        ),
+        last_occurrence_date=Subquery(
+            occurrences.annotate(last_date=Max("date")).values("last_date")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0003_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="first_occurrence_date",
+            field=models.DateField(
+                blank=True,
+                db_index=True,
+                default=None,
+                editable=False,
+                help_text="The date of the first stored occurrence of the task.",
+                null=True,
+                verbose_name="First Occurrence Date",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="last_occurrence_date",
+            field=models.DateField(
+                blank=True,
+                db_index=True,
+                default=None,
+                editable=False,
+                help_text="The date of the last stored occurrence of the task.",
+                null=True,
+                verbose_name="Last Occurrence Date",
+            ),
+        ),
+        migrations.RunPython(set_occurrence_dates, migrations.RunPython.noop),
+    ]
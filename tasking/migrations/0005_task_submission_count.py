@@ -0,0 +1,48 @@
+# Generated by Django 2.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def set_submission_counts(apps, schema_editor):
+    """
+    Store the number of submissions of existing tasks
+    """
+    Task = apps.get_model("tasking", "Task")
+    Submission = apps.get_model("tasking", "Submission")
+    Task.objects.update(
+        submission_count=Coalesce(
+            Subquery(
+                Submission.objects.filter(task_id=OuterRef("pk"))
+                .order_by()
+                .values("task_id")
+                .annotate(total=Count("id"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0004_task_occurrence_dates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="submission_count",
+            field=models.PositiveIntegerField(
+                db_index=True,
+                default=0,
+                editable=False,
+                help_text="The number of submissions made for this task.",
+                verbose_name="Submission Count",
+            ),
+        ),
+        migrations.RunPython(set_submission_counts, migrations.RunPython.noop),
+    ]
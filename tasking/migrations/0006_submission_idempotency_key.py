@@ -0,0 +1,28 @@
+# Generated by Django 2.2 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0005_task_submission_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True,
+                default=None,
+                help_text="An optional key, chosen by the client, that identifies "
+                "this submission so that it is only created once however many "
+                "times it is sent.",
+                max_length=255,
+                null=True,
+                unique=True,
+                verbose_name="Idempotency Key",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0006_submission_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["submission_time", "id"], name="tasking_sub_time_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskoccurrence",
+            index=models.Index(
+                fields=["task", "location", "date", "start_time", "id"],
+                name="tasking_occ_keyset_idx",
+            ),
+        ),
+    ]
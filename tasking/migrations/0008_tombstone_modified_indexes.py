@@ -0,0 +1,84 @@
+# Generated by Django 2.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasking", "0007_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "target_object_id",
+                    models.PositiveIntegerField(
+                        blank=True, db_index=True, default=None, null=True
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(auto_now=True, verbose_name="Modified"),
+                ),
+                (
+                    "target_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="contenttypes.ContentType",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["modified", "id"],
+                "abstract": False,
+                "index_together": {("target_content_type", "modified")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="location",
+            index=models.Index(
+                fields=["modified", "id"], name="tasking_location_mod_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["modified", "id"], name="tasking_project_mod_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["modified", "id"], name="tasking_task_mod_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tasklocation",
+            index=models.Index(
+                fields=["modified", "id"], name="tasking_taskloc_mod_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskoccurrence",
+            index=models.Index(fields=["modified", "id"], name="tasking_occ_mod_idx"),
+        ),
+    ]
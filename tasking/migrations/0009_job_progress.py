@@ -0,0 +1,44 @@
+# Generated by Django 2.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0008_tombstone_modified_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="progress",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="The number of items that the last run of this job has done.",
+                verbose_name="Progress",
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="total",
+            field=models.PositiveIntegerField(
+                blank=True,
+                default=None,
+                help_text="The number of items that this job has to do, if known.",
+                null=True,
+                verbose_name="Total",
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="input_file",
+            field=models.FileField(
+                blank=True,
+                default="",
+                help_text="A file that this job works on e.g. an uploaded shapefile.",
+                upload_to="tasking/jobs/",
+                verbose_name="Input File",
+            ),
+        ),
+    ]
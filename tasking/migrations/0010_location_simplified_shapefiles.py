@@ -0,0 +1,84 @@
+# Generated by Django 2.2 on 2026-10-18 18:20
+
+import django.contrib.gis.db.models.fields
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F, Func, Value
+
+DEFAULT_TOLERANCES = {"fine": 0.0001, "medium": 0.001, "coarse": 0.01}
+
+
+def set_simplified_shapefiles(apps, schema_editor):
+    """
+    Simplify the shapefiles of existing locations, in the database
+    """
+    Location = apps.get_model("tasking", "Location")
+    tolerances = getattr(
+        settings, "TASKING_SHAPEFILE_SIMPLIFY_TOLERANCES", DEFAULT_TOLERANCES
+    )
+    output_field = django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)
+    Location.objects.exclude(shapefile=None).update(
+        **{
+            f"shapefile_{level}": Func(
+                Func(
+                    F("shapefile"),
+                    Value(tolerance),
+                    function="ST_SimplifyPreserveTopology",
+                    output_field=output_field,
+                ),
+                function="ST_Multi",
+                output_field=output_field,
+            )
+            for level, tolerance in tolerances.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0009_job_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="location",
+            name="shapefile_fine",
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(
+                blank=True,
+                default=None,
+                editable=False,
+                help_text="The Shapefile, simplified with the fine tolerance.",
+                null=True,
+                srid=4326,
+                verbose_name="Fine Shapefile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="location",
+            name="shapefile_medium",
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(
+                blank=True,
+                default=None,
+                editable=False,
+                help_text="The Shapefile, simplified with the medium tolerance.",
+                null=True,
+                srid=4326,
+                verbose_name="Medium Shapefile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="location",
+            name="shapefile_coarse",
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(
+                blank=True,
+                default=None,
+                editable=False,
+                help_text="The Shapefile, simplified with the coarse tolerance.",
+                null=True,
+                srid=4326,
+                verbose_name="Coarse Shapefile",
+            ),
+        ),
+        migrations.RunPython(set_simplified_shapefiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0010_location_simplified_shapefiles"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="location",
+            index=models.Index(fields=["radius"], name="tasking_location_radius_idx"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasking", "0011_location_radius_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="run_after",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="The date and time before which this job is not run again.",
+                null=True,
+                verbose_name="Run After",
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 """
 Task Models init module
 """
+from tasking.models.jobs import BaseJob, Job  # noqa
 from tasking.models.locations import BaseLocation, Location  # noqa
 from tasking.models.locationtypes import BaseLocationType, LocationType  # noqa
 from tasking.models.occurrences import BaseOccurrence, TaskOccurrence  # noqa
@@ -8,3 +9,4 @@ from tasking.models.projects import BaseProject, Project  # noqa
 from tasking.models.segment_rules import BaseSegmentRule, SegmentRule  # noqa
 from tasking.models.submissions import BaseSubmission, Submission  # noqa
 from tasking.models.tasks import BaseTask, BaseTaskLocation, Task, TaskLocation  # noqa
+from tasking.models.tombstones import BaseTombstone, Tombstone  # noqa
@@ -0,0 +1,127 @@
+"""
+Module for the Job model(s)
+"""
+from django.db import models
+from django.utils.translation import ugettext as _
+
+from tasking.models.base import GenericFKModel, TimeStampedModel
+
+
+class BaseJob(GenericFKModel, TimeStampedModel, models.Model):
+    """
+    Base abstract model class for a Job
+
+    A Job is a unit of background work, such as generating the occurrences
+    of a task, that is carried out on its target object.
+    """
+
+    PENDING = "p"
+    RUNNING = "r"
+    SUCCEEDED = "s"
+    FAILED = "f"
+
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (SUCCEEDED, _("Succeeded")),
+        (FAILED, _("Failed")),
+    )
+
+    job_type = models.CharField(
+        verbose_name=_("Job Type"),
+        max_length=255,
+        db_index=True,
+        help_text=_("The kind of work that this job does."),
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        max_length=1,
+        db_index=True,
+        help_text=_("The status of the Job"),
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name=_("Attempts"),
+        default=0,
+        help_text=_("The number of times this job has been run."),
+    )
+    error = models.TextField(
+        verbose_name=_("Error"),
+        blank=True,
+        default="",
+        help_text=_("The error raised by the last run of this job."),
+    )
+    started = models.DateTimeField(
+        verbose_name=_("Started"),
+        null=True,
+        blank=True,
+        default=None,
+        help_text=_("The date and time the last run of this job started."),
+    )
+    finished = models.DateTimeField(
+        verbose_name=_("Finished"),
+        null=True,
+        blank=True,
+        default=None,
+        help_text=_("The date and time the last run of this job finished."),
+    )
+    run_after = models.DateTimeField(
+        verbose_name=_("Run After"),
+        null=True,
+        blank=True,
+        default=None,
+        help_text=_("The date and time before which this job is not run again."),
+    )
+    progress = models.PositiveIntegerField(
+        verbose_name=_("Progress"),
+        default=0,
+        help_text=_("The number of items that the last run of this job has done."),
+    )
+    total = models.PositiveIntegerField(
+        verbose_name=_("Total"),
+        null=True,
+        blank=True,
+        default=None,
+        help_text=_("The number of items that this job has to do, if known."),
+    )
+    input_file = models.FileField(
+        verbose_name=_("Input File"),
+        upload_to="tasking/jobs/",
+        blank=True,
+        default="",
+        help_text=_("A file that this job works on e.g. an uploaded shapefile."),
+    )
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for BaseJob
+        """
+
+        abstract = True
+
+
+class Job(BaseJob):
+    """
+    Job model class
+    """
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for Job
+        """
+
+        abstract = False
+        app_label = "tasking"
+        ordering = ["-created", "-id"]
+        index_together = [["status", "created"]]
+
+    def __str__(self):
+        """
+        String representation of a Job object
+
+        e.g. task_occurrences 1 - Pending
+        """
+        return f"{self.job_type} {self.pk} - {self.get_status_display()}"
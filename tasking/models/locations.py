@@ -1,7 +1,9 @@
 """
 Module for the Location model(s)
 """
+from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.gis.geos import MultiPolygon
 from django.utils.translation import ugettext as _
 
 from django_countries.fields import CountryField
@@ -10,6 +12,22 @@ from mptt.models import MPTTModel, TreeForeignKey
 from tasking.models.base import GeoTimeStampedModel
 
 
+def get_simplified_shapefile(shapefile, tolerance):
+    """
+    Returns shapefile simplified with tolerance, in the units of its
+    coordinates, as a MultiPolygon
+    """
+    if shapefile is None or shapefile.empty:
+        return None
+    simplified = shapefile.simplify(tolerance, preserve_topology=True)
+    if simplified.geom_type == "Polygon":
+        simplified = MultiPolygon(simplified)
+    elif simplified.geom_type != "MultiPolygon" or simplified.empty:
+        return None
+    simplified.srid = shapefile.srid
+    return simplified
+
+
 class BaseLocation(MPTTModel, GeoTimeStampedModel, models.Model):
     """
     Base abstract model class for a Location
@@ -65,6 +83,41 @@ class BaseLocation(MPTTModel, GeoTimeStampedModel, models.Model):
         help_text=_("This represents the description of the Location."),
         default="",
     )
+    shapefile_fine = models.MultiPolygonField(
+        srid=4326,
+        verbose_name=_("Fine Shapefile"),
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+        help_text=_("The Shapefile, simplified with the fine tolerance."),
+    )
+    shapefile_medium = models.MultiPolygonField(
+        srid=4326,
+        verbose_name=_("Medium Shapefile"),
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+        help_text=_("The Shapefile, simplified with the medium tolerance."),
+    )
+    shapefile_coarse = models.MultiPolygonField(
+        srid=4326,
+        verbose_name=_("Coarse Shapefile"),
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+        help_text=_("The Shapefile, simplified with the coarse tolerance."),
+    )
+
+    # the fields that hold the shapefile simplified with each of the
+    # tolerances in TASKING_SHAPEFILE_SIMPLIFY_TOLERANCES
+    SIMPLIFIED_SHAPEFILE_FIELDS = {
+        "fine": "shapefile_fine",
+        "medium": "shapefile_medium",
+        "coarse": "shapefile_coarse",
+    }
 
     # pylint: disable=no-self-use
     # pylint: disable=too-few-public-methods
@@ -75,6 +128,37 @@ class BaseLocation(MPTTModel, GeoTimeStampedModel, models.Model):
 
         abstract = True
 
+    def save(self, *args, **kwargs):
+        """
+        Custom save method for BaseLocation
+
+        The simplified shapefiles are refreshed whenever the shapefile is
+        saved.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "shapefile" in update_fields:
+            self.set_simplified_shapefiles()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | set(
+                    self.SIMPLIFIED_SHAPEFILE_FIELDS.values()
+                )
+        super(BaseLocation, self).save(*args, **kwargs)
+
+    def set_simplified_shapefiles(self):
+        """
+        Set the simplified shapefiles from the shapefile
+
+        Each polygon is simplified without changing its topology, so that
+        polygons stay valid; shared borders between locations are
+        simplified separately and may not line up exactly.  This is called
+        by save; call it before saving locations using bulk_create.
+        """
+        tolerances = settings.TASKING_SHAPEFILE_SIMPLIFY_TOLERANCES
+        for level, field in self.SIMPLIFIED_SHAPEFILE_FIELDS.items():
+            setattr(
+                self, field, get_simplified_shapefile(self.shapefile, tolerances[level])
+            )
+
     class MPTTMeta:
         """
         This is the MPTTMeta options class for the abstract Location model
@@ -108,6 +192,11 @@ class Location(BaseLocation):
         abstract = False
         app_label = "tasking"
         ordering = ["country", "name", "id"]
+        indexes = [
+            models.Index(fields=["modified", "id"], name="tasking_location_mod_idx"),
+            # vector tiles look up the largest radius
+            models.Index(fields=["radius"], name="tasking_location_radius_idx"),
+        ]
 
     # pylint: disable=no-else-return
     def __str__(self):
@@ -8,12 +8,8 @@ from django.db import models
 class TaskManager(models.Manager):
     """
     Custom manager for Task
-    """
 
-    def get_queryset(self):
-        """
-        Custom get_queryset for Task Model
-        """
-        queryset = super(TaskManager, self).get_queryset()
-        queryset = queryset.annotate(submission_count=models.Count("submission__id"))
-        return queryset
+    Unlike the default Task manager, this does not order tasks by their
+    place in the tree.  submission_count used to be annotated here; it is
+    now a column on Task that is kept up to date by Submission.
+    """
@@ -2,6 +2,8 @@
 Occurrence models module
 """
 from django.db import models
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.utils import timezone
 from django.utils.dateformat import DateFormat
 from django.utils.translation import ugettext as _
 
@@ -56,6 +58,55 @@ class TaskOccurrence(BaseOccurrence):
         abstract = False
         app_label = "tasking"
         ordering = ["task", "location", "date", "start_time"]
+        indexes = [
+            models.Index(
+                fields=["task", "location", "date", "start_time", "id"],
+                name="tasking_occ_keyset_idx",
+            ),
+            models.Index(fields=["modified", "id"], name="tasking_occ_mod_idx"),
+        ]
+
+    @classmethod
+    def update_task_occurrence_dates(cls, task_ids):
+        """
+        Store the first and last occurrence dates of the tasks with the
+        given ids on the tasks themselves, in one UPDATE
+
+        task_ids can be a list or a queryset of task ids.  This needs to be
+        called whenever occurrences are saved or deleted in bulk.  The tasks
+        are marked as modified so that they are synced.
+        """
+        # pylint: disable=protected-access
+        task_model = cls._meta.get_field("task").related_model
+        # pylint: disable=no-member
+        occurrences = (
+            cls.objects.filter(task_id=OuterRef("pk")).order_by().values("task_id")
+        )
+        task_model.objects.filter(pk__in=task_ids).update(
+            first_occurrence_date=Subquery(
+                occurrences.annotate(first_date=Min("date")).values("first_date")
+            ),
+            last_occurrence_date=Subquery(
+                occurrences.annotate(last_date=Max("date")).values("last_date")
+            ),
+            modified=timezone.now(),
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Custom save method for TaskOccurrence
+        """
+        super(TaskOccurrence, self).save(*args, **kwargs)
+        self.update_task_occurrence_dates([self.task_id])
+
+    def delete(self, *args, **kwargs):
+        """
+        Custom delete method for TaskOccurrence
+        """
+        task_id = self.task_id
+        result = super(TaskOccurrence, self).delete(*args, **kwargs)
+        self.update_task_occurrence_dates([task_id])
+        return result
 
     def __str__(self):
         """
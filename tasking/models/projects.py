@@ -50,6 +50,9 @@ class Project(BaseProject):
         abstract = False
         ordering = ["name"]
         app_label = "tasking"
+        indexes = [
+            models.Index(fields=["modified", "id"], name="tasking_project_mod_idx")
+        ]
 
     def __str__(self):
         """
@@ -3,7 +3,9 @@
 Module for the Task Submission model(s)
 """
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 from django.utils.translation import ugettext as _
 
 from tasking.models.base import GenericFKModel, TimeStampedModel
@@ -59,6 +61,19 @@ class BaseSubmission(GenericFKModel, TimeStampedModel, models.Model):
         default="",
         help_text=_("This represents the comments."),
     )
+    idempotency_key = models.CharField(
+        _("Idempotency Key"),
+        max_length=255,
+        null=True,
+        blank=True,
+        default=None,
+        unique=True,
+        help_text=_(
+            "An optional key, chosen by the client, that identifies this "
+            "submission so that it is only created once however many times "
+            "it is sent."
+        ),
+    )
 
     # pylint: disable=no-self-use
     # pylint: disable=too-few-public-methods
@@ -101,6 +116,67 @@ class Submission(BaseSubmission):
         abstract = False
         app_label = "tasking"
         ordering = ["submission_time", "task__name", "id"]
+        indexes = [
+            models.Index(
+                fields=["submission_time", "id"], name="tasking_sub_time_id_idx"
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Keep track of the task that the submission was loaded with
+        """
+        instance = super(Submission, cls).from_db(db, field_names, values)
+        # pylint: disable=attribute-defined-outside-init
+        instance._loaded_task_id = instance.task_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Custom save method for Submission
+
+        Keeps the submission_count of the task(s) involved up to date.
+        """
+        adding = self._state.adding
+        loaded_task_id = getattr(self, "_loaded_task_id", None)
+        with transaction.atomic():
+            super(Submission, self).save(*args, **kwargs)
+            if adding:
+                self.change_submission_count(self.task_id, 1)
+            elif loaded_task_id is not None and loaded_task_id != self.task_id:
+                self.change_submission_count(loaded_task_id, -1)
+                self.change_submission_count(self.task_id, 1)
+        # pylint: disable=attribute-defined-outside-init
+        self._loaded_task_id = self.task_id
+
+    def delete(self, *args, **kwargs):
+        """
+        Custom delete method for Submission
+
+        Keeps the submission_count of the task up to date.
+        """
+        with transaction.atomic():
+            result = super(Submission, self).delete(*args, **kwargs)
+            self.change_submission_count(self.task_id, -1)
+        return result
+
+    @classmethod
+    def change_submission_count(cls, task_id, delta):
+        """
+        Add delta to the submission_count of the task with task_id
+
+        This is done in the database so that concurrent submissions do not
+        overwrite each other's changes.  It needs to be called for
+        submissions that are created in bulk.  The task is marked as
+        modified so that it is synced.
+        """
+        # pylint: disable=protected-access
+        task_model = cls._meta.get_field("task").related_model
+        # pylint: disable=no-member
+        task_model.objects.filter(pk=task_id).update(
+            submission_count=F("submission_count") + delta, modified=timezone.now()
+        )
 
     def __str__(self):
         """
@@ -109,6 +109,31 @@ class BaseTask(MPTTModel, GenericFKModel, TimeStampedModel, models.Model):
         ),
     )
 
+    first_occurrence_date = models.DateField(
+        verbose_name=_("First Occurrence Date"),
+        null=True,
+        blank=True,
+        default=None,
+        db_index=True,
+        editable=False,
+        help_text=_("The date of the first stored occurrence of the task."),
+    )
+    last_occurrence_date = models.DateField(
+        verbose_name=_("Last Occurrence Date"),
+        null=True,
+        blank=True,
+        default=None,
+        db_index=True,
+        editable=False,
+        help_text=_("The date of the last stored occurrence of the task."),
+    )
+
+    # the fields that task occurrences are generated from
+    OCCURRENCE_FIELDS = ("timing_rule", "end")
+    # the fields that are kept up to date by UPDATE queries of their own, and
+    # that saving an existing task must not overwrite with stale values
+    DENORMALIZED_FIELDS = ("first_occurrence_date", "last_occurrence_date")
+
     # pylint: disable=no-self-use
     # pylint: disable=too-few-public-methods
     class Meta:
@@ -118,6 +143,63 @@ class BaseTask(MPTTModel, GenericFKModel, TimeStampedModel, models.Model):
 
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Keep track of the loaded values of the fields that occurrences are
+        generated from
+        """
+        instance = super(BaseTask, cls).from_db(db, field_names, values)
+        instance.set_loaded_occurrence_values(dict(zip(field_names, values)))
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Custom save method for BaseTask
+
+        Existing tasks are saved without the fields in DENORMALIZED_FIELDS,
+        unless update_fields says otherwise.
+        """
+        if (
+            not self._state.adding
+            and not args
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            # pylint: disable=no-member
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in deferred
+            ]
+        super(BaseTask, self).save(*args, **kwargs)
+        self.set_loaded_occurrence_values(
+            {name: getattr(self, name) for name in self.OCCURRENCE_FIELDS}
+        )
+
+    def set_loaded_occurrence_values(self, values):
+        """
+        Remember the stored values of the fields in OCCURRENCE_FIELDS
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self._loaded_occurrence_values = {
+            name: values[name] for name in self.OCCURRENCE_FIELDS if name in values
+        }
+
+    def occurrence_fields_changed(self):
+        """
+        Returns True if any of the fields in OCCURRENCE_FIELDS differs from
+        what was last loaded from or saved to the database
+        """
+        loaded = getattr(self, "_loaded_occurrence_values", {})
+        for name in self.OCCURRENCE_FIELDS:
+            if name not in loaded or loaded[name] != getattr(self, name):
+                return True
+        return False
+
 
 class BaseTaskLocation(TimeStampedModel, models.Model):
     """
@@ -160,6 +242,9 @@ class TaskLocation(BaseTaskLocation):
         abstract = False
         app_label = "tasking"
         ordering = ["task", "location", "start"]
+        indexes = [
+            models.Index(fields=["modified", "id"], name="tasking_taskloc_mod_idx")
+        ]
 
     def __str__(self):
         """
@@ -184,10 +269,20 @@ class Task(BaseTask):
         default=None,
         help_text=_("This represents the locations."),
     )
+    submission_count = models.PositiveIntegerField(
+        verbose_name=_("Submission Count"),
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text=_("The number of submissions made for this task."),
+    )
 
-    # Custom Manager that has submission_count field
+    # Custom Manager that uses the default ordering of Task
     with_submission_count = TaskManager()
 
+    # submission_count is changed in the database by Submission objects
+    DENORMALIZED_FIELDS = BaseTask.DENORMALIZED_FIELDS + ("submission_count",)
+
     # pylint: disable=no-self-use
     # pylint: disable=too-few-public-methods
     class Meta:
@@ -198,6 +293,7 @@ class Task(BaseTask):
         abstract = False
         app_label = "tasking"
         ordering = ["start", "name", "id"]
+        indexes = [models.Index(fields=["modified", "id"], name="tasking_task_mod_idx")]
 
     def __str__(self):
         """
@@ -0,0 +1,50 @@
+"""
+Module for the Tombstone model(s)
+"""
+from django.db import models
+
+from tasking.models.base import GenericFKModel, TimeStampedModel
+
+
+class BaseTombstone(GenericFKModel, TimeStampedModel, models.Model):
+    """
+    Base abstract model class for a Tombstone
+
+    A Tombstone records that its target object was deleted so that clients
+    that sync changes can find out about it.  The target_content_type and
+    target_object_id of the deleted object are kept; target_content_object
+    is always None.
+    """
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for BaseTombstone
+        """
+
+        abstract = True
+
+
+class Tombstone(BaseTombstone):
+    """
+    Tombstone model class
+    """
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for Tombstone
+        """
+
+        abstract = False
+        app_label = "tasking"
+        ordering = ["modified", "id"]
+        index_together = [["target_content_type", "modified"]]
+
+    def __str__(self):
+        """
+        String representation of a Tombstone object
+
+        e.g. task 1
+        """
+        return f"{self.target_content_type} {self.target_object_id}"
@@ -0,0 +1,312 @@
+"""
+Pagination classes for tasking
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, time
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from tasking.common_tags import INVALID_CURSOR
+
+
+class CursorEncoder(json.JSONEncoder):
+    """
+    JSON encoder for the values in cursors
+
+    Unlike DjangoJSONEncoder, this keeps the microseconds of times so that
+    rows are not skipped or repeated.
+    """
+
+    def default(self, o):  # pylint: disable=method-hidden
+        if isinstance(o, (date, time)):
+            return o.isoformat()
+        return super(CursorEncoder, self).default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that uses the values of the last row of a page to get
+    the next one
+
+    Unlike OFFSET based pagination, every page costs the same however deep
+    it is, as long as there is an index on the ordering fields.
+
+    ordering is a list of fields on the model, all in ascending order, the
+    last of which has to be unique.  Pagination is only used when the
+    request has a cursor or page_size query parameter so that clients that
+    do not ask for pages still get plain lists.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ["id"]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (  # pylint: disable=bad-continuation
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+
+        # pylint: disable=attribute-defined-outside-init
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        # pylint: disable=protected-access
+        self.fields = [queryset.model._meta.get_field(name) for name in self.ordering]
+
+        reverse, position = self.decode_cursor(request)
+        if reverse:
+            queryset = queryset.order_by(
+                *[f"-{field.attname}" for field in self.fields]
+            )
+        else:
+            queryset = queryset.order_by(*[field.attname for field in self.fields])
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        # moving back from a page means that there is a page after it, and
+        # moving forward from a page means that there is a page before it
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        """
+        Returns the page size asked for, within the allowed limits
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.TASKING_PAGE_SIZE
+        return max(1, min(page_size, settings.TASKING_MAX_PAGE_SIZE))
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Returns a Q object that matches the rows that come after position,
+        or before it if reverse is True
+
+        NULLs come last in ascending order, as they do in PostgreSQL.
+        """
+        conditions = []
+        for index, field in enumerate(self.fields):
+            equal = [
+                Q(**{f"{other.attname}__isnull": True})
+                if value is None
+                else Q(**{other.attname: value})
+                for other, value in zip(self.fields[:index], position[:index])
+            ]
+            value = position[index]
+            if value is None:
+                if reverse:
+                    beyond = Q(**{f"{field.attname}__isnull": False})
+                else:
+                    # nothing comes after NULL
+                    continue
+            elif reverse:
+                beyond = Q(**{f"{field.attname}__lt": value})
+            else:
+                beyond = Q(**{f"{field.attname}__gt": value})
+                if field.null:
+                    beyond |= Q(**{f"{field.attname}__isnull": True})
+            conditions.append(reduce(and_, equal + [beyond]))
+        if not conditions:
+            # pagination went past the last row
+            return Q(pk__in=[])
+        return reduce(or_, conditions)
+
+    def get_position(self, instance):
+        """
+        Returns the values of the ordering fields of instance
+        """
+        return [getattr(instance, field.attname) for field in self.fields]
+
+    def encode_cursor(self, reverse, position):
+        """
+        Returns the URL with a cursor for position
+        """
+        cursor = json.dumps([reverse, position], cls=CursorEncoder)
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """
+        Returns the direction and the position in the cursor of the request
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            reverse, values = json.loads(
+                urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            )
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                None if value is None else field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError, UnicodeError):
+            raise NotFound(INVALID_CURSOR)
+        return bool(reverse), position
+
+    def get_next_link(self):
+        """
+        Returns the URL of the next page
+        """
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(False, self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        """
+        Returns the URL of the previous page
+        """
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.get_position(self.page[0]))
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class SubmissionPagination(KeysetPagination):
+    """
+    Keyset pagination for submissions
+    """
+
+    ordering = ["submission_time", "id"]
+
+
+class TaskOccurrencePagination(KeysetPagination):
+    """
+    Keyset pagination for task occurrences
+    """
+
+    ordering = ["task", "location", "date", "start_time", "id"]
+
+
+class SyncPagination(KeysetPagination):
+    """
+    Keyset pagination for the sync endpoint
+
+    Each list of the sync response, e.g. the changed tasks or the deleted
+    occurrences, is paged by (modified, id) on its own.  The cursor holds
+    the watermark of the first page along with the position reached in each
+    list, and null for the lists that have been read to the end.  Unlike the
+    other paginations, pages are always used.
+    """
+
+    ordering = ["modified", "id"]
+
+    def paginate_lists(self, lists, request, watermark):
+        """
+        Returns the watermark to send to the client and an OrderedDict of
+        the page of each queryset in lists, a list of (key, queryset) pairs
+
+        watermark is used unless the request has a cursor, in which case the
+        watermark of the first page is used.
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.positions = OrderedDict()
+        watermark, positions = self.decode_sync_cursor(request, watermark)
+
+        pages = OrderedDict()
+        for key, queryset in lists:
+            # pylint: disable=protected-access
+            self.fields = [
+                queryset.model._meta.get_field(name) for name in self.ordering
+            ]
+            if key in positions and positions[key] is None:
+                pages[key] = []
+                self.positions[key] = None
+                continue
+            queryset = queryset.order_by(*[field.attname for field in self.fields])
+            if positions.get(key) is not None:
+                position = self.decode_position(positions[key])
+                queryset = queryset.filter(self.get_keyset_filter(position, False))
+            results = list(queryset[: self.page_size + 1])
+            has_more = len(results) > self.page_size
+            pages[key] = results[: self.page_size]
+            self.positions[key] = (
+                self.get_position(pages[key][-1]) if has_more else None
+            )
+        self.watermark = watermark
+        return watermark, pages
+
+    def decode_position(self, values):
+        """
+        Returns the position in a cursor as values of the ordering fields
+        """
+        try:
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(INVALID_CURSOR)
+
+    def decode_sync_cursor(self, request, watermark):
+        """
+        Returns the watermark and the positions in the cursor of the request
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return watermark, {}
+        try:
+            state = json.loads(
+                urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            )
+            watermark = parse_datetime(state["watermark"])
+            positions = dict(state["positions"])
+            if watermark is None:
+                raise ValueError
+        except (KeyError, TypeError, ValueError, UnicodeError):
+            raise NotFound(INVALID_CURSOR)
+        return watermark, positions
+
+    def get_next_link(self):
+        """
+        Returns the URL of the next page, if any list has more items
+        """
+        if all(position is None for position in self.positions.values()):
+            return None
+        cursor = json.dumps(
+            {"watermark": self.watermark, "positions": self.positions},
+            cls=CursorEncoder,
+        )
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -0,0 +1,35 @@
+"""
+Parsers for tasking
+"""
+import json
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from tasking.common_tags import INVALID_NDJSON
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON into a list of objects, one per line
+
+    Blank lines are ignored.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        for line_number, line in enumerate(iter(stream.readline, b""), start=1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ParseError(INVALID_NDJSON.format(line=line_number))
+        return items
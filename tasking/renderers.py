@@ -0,0 +1,22 @@
+"""
+Renderers for tasking
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class MVTRenderer(BaseRenderer):
+    """
+    Renders Mapbox vector tiles, which are built as bytes by the view
+
+    Anything else, such as the details of an error, is rendered as JSON.
+    """
+
+    media_type = "application/vnd.mapbox-vector-tile"
+    format = "mvt"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return JSONRenderer().render(data, renderer_context=renderer_context)
@@ -0,0 +1,212 @@
+"""
+Parsing of rrule strings for tasking
+
+Parsed rrule objects are kept in a bounded LRU cache keyed by the rule
+string, so that validators, serializers and occurrence generation do not
+parse the same rule over and over.  The cached objects are shared and
+should therefore never be modified.
+"""
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+
+from dateutil.rrule import (
+    DAILY,
+    HOURLY,
+    MINUTELY,
+    MONTHLY,
+    SECONDLY,
+    WEEKLY,
+    YEARLY,
+    rrule,
+    rrulestr,
+)
+
+RRULE_CACHE_SIZE = getattr(settings, "TASKING_RRULE_CACHE_SIZE", 1024)
+# the length of the periods of rrule frequencies whose periods are all the
+# same length
+FIXED_PERIODS = {
+    WEEKLY: timedelta(weeks=1),
+    DAILY: timedelta(days=1),
+    HOURLY: timedelta(hours=1),
+    MINUTELY: timedelta(minutes=1),
+    SECONDLY: timedelta(seconds=1),
+}
+
+
+@lru_cache(maxsize=RRULE_CACHE_SIZE)
+def _parse_rrule(rule_string):
+    """
+    Parses rule_string; the results are cached
+    """
+    return rrulestr(rule_string)
+
+
+def get_rrule(rule_string):
+    """
+    Returns the rrule object for rule_string
+
+    Raises the same errors as dateutil.rrule.rrulestr for invalid input.
+
+    Rules without a DTSTART are not cached because dateutil uses the time
+    at which they are parsed as their start.
+    """
+    if not isinstance(rule_string, str) or "DTSTART" not in rule_string.upper():
+        return rrulestr(rule_string)
+    return _parse_rrule(rule_string)
+
+
+def rrule_cache_info():
+    """
+    Returns the hits, misses, maxsize and currsize of the rrule cache
+    """
+    return _parse_rrule.cache_info()
+
+
+def clear_rrule_cache():
+    """
+    Empties the rrule cache and resets its counters
+    """
+    _parse_rrule.cache_clear()
+
+
+def _get_weekly_last_occurrence(dtstart, count, interval, byweekday, wkst):
+    """
+    Returns the last datetime of a weekly rule that has count occurrences
+    on the byweekday days of every interval weeks
+    """
+    # offsets of the days from the start of the week
+    offsets = sorted({(day - wkst) % 7 for day in byweekday})
+    start_offset = (dtstart.weekday() - wkst) % 7
+    # the first week only includes the days from dtstart onwards
+    first_week = [offset for offset in offsets if offset >= start_offset]
+
+    if count <= len(first_week):
+        week, offset = 0, first_week[count - 1]
+    else:
+        weeks, index = divmod(count - len(first_week) - 1, len(offsets))
+        week, offset = weeks + 1, offsets[index]
+
+    return dtstart + timedelta(days=week * interval * 7 + offset - start_offset)
+
+
+# pylint: disable=protected-access,too-many-return-statements
+def _compute_count_rule_end(rrule_obj):
+    """
+    Computes the last datetime of a COUNT rrule without expanding it
+
+    This only works for rules that:
+        - are DAILY, WEEKLY, MONTHLY or YEARLY
+        - occur once a day at the DTSTART time
+        - only use BYDAY with WEEKLY rules or DAILY rules with an INTERVAL
+          of 1
+        - do not use any other BYxxx parts
+
+    Returns None for any other rule.
+    """
+    if not isinstance(rrule_obj, rrule) or not rrule_obj._count:
+        return None
+
+    dtstart = rrule_obj._dtstart
+    timeset = rrule_obj._timeset
+    if (  # pylint: disable=bad-continuation
+        rrule_obj._until is not None
+        or rrule_obj._bynweekday
+        or rrule_obj._bynmonthday
+        or rrule_obj._byyearday
+        or rrule_obj._byweekno
+        or rrule_obj._bysetpos
+        or rrule_obj._byeaster
+        or timeset is None
+        or len(timeset) != 1
+        or timeset[0].replace(tzinfo=None) != dtstart.time()
+    ):
+        return None
+
+    count = rrule_obj._count
+    interval = rrule_obj._interval
+    freq = rrule_obj._freq
+    byweekday = rrule_obj._byweekday
+    bymonth = rrule_obj._bymonth
+    bymonthday = rrule_obj._bymonthday
+
+    try:
+        if freq in (DAILY, WEEKLY) and bymonth is None and not bymonthday:
+            if freq == DAILY and byweekday is None:
+                return dtstart + timedelta(days=(count - 1) * interval)
+            if freq == DAILY and interval == 1:
+                return _get_weekly_last_occurrence(
+                    dtstart, count, 1, byweekday, rrule_obj._wkst
+                )
+            if freq == WEEKLY:
+                return _get_weekly_last_occurrence(
+                    dtstart, count, interval, byweekday, rrule_obj._wkst
+                )
+        elif (  # pylint: disable=bad-continuation
+            freq == MONTHLY
+            and bymonth is None
+            and byweekday is None
+            and bymonthday == (dtstart.day,)
+            # every month has these days
+            and dtstart.day <= 28
+        ):
+            months = dtstart.month - 1 + (count - 1) * interval
+            return dtstart.replace(
+                year=dtstart.year + months // 12, month=months % 12 + 1
+            )
+        elif (  # pylint: disable=bad-continuation
+            freq == YEARLY
+            and bymonth == (dtstart.month,)
+            and byweekday is None
+            and bymonthday == (dtstart.day,)
+            # not every year has a 29th of February
+            and (dtstart.month, dtstart.day) != (2, 29)
+        ):
+            return dtstart.replace(year=dtstart.year + (count - 1) * interval)
+    except (OverflowError, ValueError):
+        # past the year 9999, where dateutil stops
+        return None
+
+    return None
+
+
+def get_rrule_last_occurrence(rrule_obj):
+    """
+    Returns the last datetime of an rrule that has an end
+
+    The last datetime of common COUNT rules is computed arithmetically;
+    other rules are expanded, which might be slow if they have many
+    occurrences.
+    """
+    last = _compute_count_rule_end(rrule_obj)
+    if last is None:
+        last = rrule_obj[-1]
+    return last
+
+
+# pylint: disable=protected-access
+def iter_rrule_from(rrule_obj, the_datetime):
+    """
+    Returns an iterator over the datetimes of rrule_obj from the_datetime
+    onwards (inclusive)
+
+    dateutil always expands rules from their DTSTART, even in after() and
+    between(), which gets slower the older a rule is.  Rules without a COUNT
+    whose periods are all the same length (WEEKLY and shorter) are instead
+    expanded from a DTSTART moved forward by whole INTERVALs to just before
+    the_datetime, which leaves all of their later datetimes where they were.
+    Other rules are expanded from their DTSTART.
+    """
+    if (  # pylint: disable=bad-continuation
+        isinstance(rrule_obj, rrule)
+        and not rrule_obj._count
+        and rrule_obj._freq in FIXED_PERIODS
+    ):
+        period = FIXED_PERIODS[rrule_obj._freq] * rrule_obj._interval
+        dtstart = rrule_obj._dtstart
+        if the_datetime > dtstart + period:
+            periods = (the_datetime - dtstart) // period
+            # replace returns a new rule, so the cached one is not modified
+            rrule_obj = rrule_obj.replace(dtstart=dtstart + periods * period)
+    return rrule_obj.xafter(the_datetime, inc=True)
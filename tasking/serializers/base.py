@@ -1,10 +1,74 @@
 """
 Base Serializers
 """
+from collections import defaultdict
+
 from rest_framework import serializers
 
 from tasking.common_tags import TARGET_DOES_NOT_EXIST
-from tasking.utils import get_allowed_contenttypes
+from tasking.utils import allowed_contenttypes, get_allowed_contenttypes
+
+# the keys in the serializer context under which lookups are cached
+TARGET_CACHE_KEY = "tasking_target_cache"
+RELATED_CACHE_KEY = "tasking_related_cache"
+
+
+def get_target_cache(context):
+    """
+    Returns the cache of target lookups kept in the serializer context
+
+    The cache maps (content type id, target id) to whether the target exists.
+    The serializer context is created for each request, so the cache does
+    not outlive the request.
+    """
+    return context.setdefault(TARGET_CACHE_KEY, {})
+
+
+def get_related_cache(context, field_name):
+    """
+    Returns the cache of related objects of field_name kept in the
+    serializer context
+
+    The cache maps primary keys, as strings, to the related object, or to
+    None if there is no such object.
+    """
+    return context.setdefault(RELATED_CACHE_KEY, {}).setdefault(field_name, {})
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that looks for the related object in a cache kept
+    in the serializer context before querying the database
+
+    GenericForeignKeyListSerializer fills the cache for all the items of a
+    list in one query per field.
+    """
+
+    def to_internal_value(self, data):
+        cache = get_related_cache(self.context, self.field_name)
+        key = str(data)
+        if key in cache:
+            if cache[key] is None:
+                self.fail("does_not_exist", pk_value=data)
+            return cache[key]
+        return super(CachedPrimaryKeyRelatedField, self).to_internal_value(data)
+
+
+class AllowedContentTypeField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField for content types that looks them up in the
+    process-wide cache of allowed content types instead of the database
+    """
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        content_type = allowed_contenttypes.get_for_id(pk)
+        if content_type is None:
+            self.fail("does_not_exist", pk_value=data)
+        return content_type
 
 
 class ContentTypeFieldSerializer(serializers.ModelSerializer):
@@ -12,19 +76,122 @@ class ContentTypeFieldSerializer(serializers.ModelSerializer):
     Serializer class that provides a contenty_type field
     """
 
-    target_content_type = serializers.PrimaryKeyRelatedField(
+    target_content_type = AllowedContentTypeField(
         many=False, queryset=get_allowed_contenttypes()
     )
 
 
+class GenericForeignKeyListSerializer(serializers.ListSerializer):
+    """
+    List serializer class for serializers that use GenericForeignKeySerializer
+
+    Before the items are validated, the existence of all their targets is
+    checked using one query per content type.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Look up the related objects of all the items before validating them
+        """
+        if isinstance(data, list):
+            self.prefetch(data)
+        return super(GenericForeignKeyListSerializer, self).to_internal_value(data)
+
+    def prefetch(self, data):
+        """
+        Look up the targets and related objects of the items in data and
+        cache the results in the serializer context
+
+        Items can then be validated one at a time by serializers that share
+        the context without querying the database for each item.
+        """
+        self.check_targets(data)
+        self.fetch_related(data)
+
+    def fetch_related(self, data):
+        """
+        Look up the objects of the CachedPrimaryKeyRelatedField fields of
+        the items in data and cache the results
+        """
+        for field_name, field in self.child.fields.items():
+            if not isinstance(field, CachedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            cache = get_related_cache(self.context, field_name)
+            wanted = {}
+            for item in data:
+                try:
+                    value = item.get(field_name)
+                    key = str(value)
+                    if key not in cache and value not in (None, ""):
+                        wanted[key] = int(value)
+                except (AttributeError, TypeError, ValueError):
+                    # the item's own validation reports the problem
+                    continue
+            if not wanted:
+                continue
+            found = field.get_queryset().in_bulk(set(wanted.values()))
+            for key, pk in wanted.items():
+                cache[key] = found.get(pk)
+
+    def check_targets(self, data):
+        """
+        Look up the targets of the items in data and cache the results
+        """
+        cache = get_target_cache(self.context)
+        target_ids = defaultdict(set)
+        for item in data:
+            try:
+                content_type_id = int(item.get("target_content_type"))
+                target_id = int(item.get("target_id"))
+            except (AttributeError, TypeError, ValueError):
+                # the item's own validation reports the problem
+                continue
+            if (content_type_id, target_id) not in cache:
+                target_ids[content_type_id].add(target_id)
+
+        for content_type_id, ids in target_ids.items():
+            model_class = allowed_contenttypes.get_model_class(content_type_id)
+            if model_class is None:
+                # not allowed, or the model is not installed
+                continue
+            existing = set(
+                model_class.objects.filter(pk__in=ids)
+                .order_by()
+                .values_list("pk", flat=True)
+            )
+            for target_id in ids:
+                cache[(content_type_id, target_id)] = target_id in existing
+
+
 class GenericForeignKeySerializer(ContentTypeFieldSerializer):
     """
     Serializer class that provides fields and methods for dealing
     with generic foreign keys
+
+    Subclasses should set list_serializer_class to
+    GenericForeignKeyListSerializer in their Meta so that lists of objects
+    have their targets checked in bulk.
     """
 
     target_id = serializers.IntegerField(source="target_object_id")
 
+    def target_exists(self, target_model_contenttype, target_id):
+        """
+        Returns True if the target exists
+
+        Lookups are cached for the rest of the request.
+        """
+        cache = get_target_cache(self.context)
+        key = (target_model_contenttype.pk, target_id)
+        if key not in cache:
+            target_model_class = allowed_contenttypes.get_model_class(
+                target_model_contenttype.pk
+            )
+            if target_model_class is None:
+                target_model_class = target_model_contenttype.model_class()
+            cache[key] = target_model_class.objects.filter(pk=target_id).exists()
+        return cache[key]
+
     def validate(self, attrs):
         """
         Validate target id
@@ -40,11 +207,7 @@ class GenericForeignKeySerializer(ContentTypeFieldSerializer):
             target_id = attrs.get("target_object_id")
             target_model_contenttype = attrs.get("target_content_type")
 
-        target_model_class = target_model_contenttype.model_class()
-
-        try:
-            target_model_class.objects.get(pk=target_id)
-        except target_model_class.DoesNotExist:
+        if not self.target_exists(target_model_contenttype, target_id):
             raise serializers.ValidationError({"target_id": TARGET_DOES_NOT_EXIST})
 
         return attrs
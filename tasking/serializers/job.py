@@ -0,0 +1,39 @@
+"""
+Job Serializers
+"""
+from rest_framework import serializers
+
+from tasking.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Job serializer class
+    """
+
+    target_id = serializers.IntegerField(source="target_object_id", read_only=True)
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for JobSerializer
+        """
+
+        model = Job
+        fields = [
+            "id",
+            "job_type",
+            "status",
+            "target_content_type",
+            "target_id",
+            "attempts",
+            "error",
+            "run_after",
+            "progress",
+            "total",
+            "started",
+            "finished",
+            "created",
+            "modified",
+        ]
+        read_only_fields = fields
@@ -4,10 +4,8 @@ Location Serializers
 import logging
 import zipfile
 from io import BytesIO
-from os import path
-from tempfile import TemporaryDirectory
 
-from django.contrib.gis.gdal import DataSource
+from django.contrib.gis.gdal import GDALException
 from django.contrib.gis.geos import MultiPolygon, Point
 
 from django_countries import Countries
@@ -23,10 +21,21 @@ from tasking.common_tags import (
 )
 from tasking.exceptions import MissingFiles, ShapeFileNotFound, UnnecessaryFiles
 from tasking.models import Location
-from tasking.utils import get_polygons, get_shapefile
+from tasking.utils import get_polygons, get_shapefile, get_shapefile_geoms
 
 LOGGER = logging.getLogger(__name__)
 
+# the ways that the shapefile of locations can be represented, chosen using
+# the geometry query parameter
+FULL_GEOMETRY = "full"
+BBOX_GEOMETRY = "bbox"
+NO_GEOMETRY = "none"
+GEOMETRY_OPTIONS = (
+    [FULL_GEOMETRY]
+    + list(Location.SIMPLIFIED_SHAPEFILE_FIELDS)
+    + [BBOX_GEOMETRY, NO_GEOMETRY]
+)
+
 
 class ShapeFileField(GeometryField):
     """
@@ -46,12 +55,13 @@ class ShapeFileField(GeometryField):
         multipolygon = value
 
         if multipolygon is not None:
-            # open zipfile given : path to a file (a string),
-            # a file-like object or a path-like object
+            # uploads that are large enough are written to a temporary file
+            # by Django, others are kept in memory
             try:
-                zip_file = zipfile.ZipFile(value.temporary_file_path())
+                geofile = value.temporary_file_path()
             except AttributeError:
-                zip_file = zipfile.ZipFile(value)
+                geofile = value
+            zip_file = zipfile.ZipFile(geofile)
 
             # Call get_shapefile method to get the .shp files name
             try:
@@ -60,34 +70,26 @@ class ShapeFileField(GeometryField):
                 # pylint: disable=no-member
                 raise serializers.ValidationError(exp.message)
 
-            # Setup a Temporary Directory to store Shapefiles
-            with TemporaryDirectory() as temp_dir:
-                tpath = temp_dir
-
-                # Extract all files to Temporary Directory
-                zip_file.extractall(tpath)
-
-                # concatenate Shapefile path
-                shp_path = path.join(tpath, shpfile)
-
-                # Make the shapefile a DataSource
-                data_source = DataSource(shp_path)
-                layer = data_source[0]
+            # read the shapefile from the zip file without extracting it
+            try:
+                polygon_data = get_shapefile_geoms(geofile, shpfile)
+            except GDALException as exc:
+                LOGGER.exception(exc)
+                raise serializers.ValidationError(INVALID_SHAPEFILE)
 
-                # Get geoms for all Polygons in Datasource
-                polygon_data = layer.get_geoms()
-                polygons = get_polygons(polygon_data)
+            # Get geoms for all Polygons in Datasource
+            polygons = get_polygons(polygon_data)
 
-                if not polygons:
-                    LOGGER.exception(NO_VALID_POLYGONS)
-                    raise serializers.ValidationError(NO_VALID_POLYGONS)
+            if not polygons:
+                LOGGER.exception(NO_VALID_POLYGONS)
+                raise serializers.ValidationError(NO_VALID_POLYGONS)
 
-                try:
-                    multipolygon = MultiPolygon(polygons)
-                except TypeError as exc:
-                    # this shapefile is just not valid for some reason
-                    LOGGER.exception(exc)
-                    raise serializers.ValidationError(INVALID_SHAPEFILE)
+            try:
+                multipolygon = MultiPolygon(polygons)
+            except TypeError as exc:
+                # this shapefile is just not valid for some reason
+                LOGGER.exception(exc)
+                raise serializers.ValidationError(INVALID_SHAPEFILE)
 
         return multipolygon
 
@@ -161,6 +163,28 @@ class LocationSerializer(serializers.ModelSerializer):
     shapefile = ShapeFileField(required=False)
     geopoint = GeopointField(required=False)
 
+    def get_fields(self):
+        """
+        Represent the shapefile as chosen by the geometry in the context
+
+        A simplified shapefile or a bounding box (which the queryset has to
+        be annotated with as shapefile_bbox) is read only, and no geometry
+        leaves out the shapefile.
+        """
+        fields = super(LocationSerializer, self).get_fields()
+        geometry = self.context.get("geometry", FULL_GEOMETRY)
+        if geometry == NO_GEOMETRY:
+            del fields["shapefile"]
+        elif geometry == BBOX_GEOMETRY:
+            fields["shapefile"] = ShapeFileField(
+                source="shapefile_bbox", read_only=True
+            )
+        elif geometry in Location.SIMPLIFIED_SHAPEFILE_FIELDS:
+            fields["shapefile"] = ShapeFileField(
+                source=Location.SIMPLIFIED_SHAPEFILE_FIELDS[geometry], read_only=True
+            )
+        return fields
+
     def validate(self, attrs):
         """
         Custom Validation for Location Serializer
@@ -207,3 +231,51 @@ class LocationSerializer(serializers.ModelSerializer):
             "created",
             "modified",
         ]
+
+
+class LocationImportSerializer(serializers.Serializer):
+    """
+    Serializer for the options of a location import
+    """
+
+    # pylint: disable=abstract-method
+
+    shapefile = serializers.FileField()
+    name_field = serializers.CharField()
+    key_field = serializers.CharField(required=False, allow_blank=True)
+    parent_field = serializers.CharField(required=False, allow_blank=True)
+    country_field = serializers.CharField(required=False, allow_blank=True)
+    location_type_field = serializers.CharField(required=False, allow_blank=True)
+    country = SerializableCountryField(
+        allow_blank=True, required=False, choices=Countries()
+    )
+    location_type = serializers.CharField(required=False, allow_blank=True)
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Location.objects.all(), required=False, allow_null=True
+    )
+
+
+class LocationShapefileSerializer(serializers.Serializer):
+    """
+    Serializer for a zipped shapefile that is uploaded to be processed in
+    the background
+    """
+
+    # pylint: disable=abstract-method
+
+    shapefile = serializers.FileField()
+
+    def validate_shapefile(self, value):  # pylint: disable=no-self-use
+        """
+        Check that the zip file has the files that a shapefile needs, without
+        reading the shapefile itself
+        """
+        try:
+            get_shapefile(zipfile.ZipFile(value))
+        except zipfile.BadZipFile:
+            raise serializers.ValidationError(INVALID_SHAPEFILE)
+        except (ShapeFileNotFound, MissingFiles, UnnecessaryFiles) as exp:
+            # pylint: disable=no-member
+            raise serializers.ValidationError(exp.message)
+        value.seek(0)
+        return value
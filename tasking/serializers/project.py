@@ -2,7 +2,10 @@
 Project Serializers
 """
 from tasking.models import Project
-from tasking.serializers.base import GenericForeignKeySerializer
+from tasking.serializers.base import (
+    GenericForeignKeyListSerializer,
+    GenericForeignKeySerializer,
+)
 
 
 class ProjectSerializer(GenericForeignKeySerializer):
@@ -17,6 +20,7 @@ class ProjectSerializer(GenericForeignKeySerializer):
         """
 
         model = Project
+        list_serializer_class = GenericForeignKeyListSerializer
         fields = [
             "id",
             "name",
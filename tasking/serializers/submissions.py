@@ -3,9 +3,13 @@ Submission Serializers
 """
 from rest_framework import serializers
 
-from tasking.common_tags import CANT_EDIT_TASK
+from tasking.common_tags import CANT_EDIT_TASK, DUPLICATE_IDEMPOTENCY_KEY
 from tasking.models import Submission
-from tasking.serializers.base import GenericForeignKeySerializer
+from tasking.serializers.base import (
+    CachedPrimaryKeyRelatedField,
+    GenericForeignKeyListSerializer,
+    GenericForeignKeySerializer,
+)
 
 
 class SubmissionSerializer(GenericForeignKeySerializer):
@@ -13,6 +17,8 @@ class SubmissionSerializer(GenericForeignKeySerializer):
     Submission serializer class
     """
 
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     def validate_task(self, value):
         """
         Validate Task
@@ -23,6 +29,23 @@ class SubmissionSerializer(GenericForeignKeySerializer):
             raise serializers.ValidationError(CANT_EDIT_TASK)
         return value
 
+    # pylint: disable=no-self-use
+    def validate_idempotency_key(self, value):
+        """
+        Validate idempotency key
+        """
+        # a blank key is the same as no key
+        value = value or None
+        if (  # pylint: disable=bad-continuation
+            value is not None
+            and self.instance is not None
+            and value != self.instance.idempotency_key
+            # pylint: disable=no-member
+            and Submission.objects.filter(idempotency_key=value).exists()
+        ):
+            raise serializers.ValidationError(DUPLICATE_IDEMPOTENCY_KEY)
+        return value
+
     # pylint: disable=too-few-public-methods
     class Meta:
         """
@@ -42,5 +65,10 @@ class SubmissionSerializer(GenericForeignKeySerializer):
             "comments",
             "target_content_type",
             "target_id",
+            "idempotency_key",
         ]
+        # duplicate idempotency keys return the existing submission, see
+        # SubmissionViewSet, instead of failing validation
+        extra_kwargs = {"idempotency_key": {"validators": []}}
         model = Submission
+        list_serializer_class = GenericForeignKeyListSerializer
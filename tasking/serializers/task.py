@@ -1,7 +1,8 @@
 """
 Tasking Serializers
 """
-from dateutil.rrule import rrulestr
+from collections import defaultdict, deque
+
 from rest_framework import serializers
 
 from tasking.common_tags import (
@@ -11,7 +12,11 @@ from tasking.common_tags import (
     MISSING_START_DATE,
 )
 from tasking.models import Task, TaskLocation
-from tasking.serializers.base import GenericForeignKeySerializer
+from tasking.rrules import get_rrule
+from tasking.serializers.base import (
+    GenericForeignKeyListSerializer,
+    GenericForeignKeySerializer,
+)
 from tasking.utils import get_rrule_end, get_rrule_start
 from tasking.validators import validate_rrule
 
@@ -25,6 +30,50 @@ def check_timing_rule(value):
     raise serializers.ValidationError(INVALID_TIMING_RULE)
 
 
+def get_task_location_key(location_id, start, end, timing_rule):
+    """
+    Returns the values that tell TaskLocation objects of a task apart
+    """
+    return (location_id, start, end, timing_rule)
+
+
+def set_task_locations(task, locations_data):
+    """
+    Makes locations_data the TaskLocation objects of task
+
+    Existing TaskLocation objects that match an item in locations_data are
+    kept, the rest are deleted in one query and the missing ones are created
+    in one query.
+    """
+    existing = defaultdict(deque)
+    # pylint: disable=no-member
+    for task_location in TaskLocation.objects.filter(task=task).order_by("id"):
+        existing[
+            get_task_location_key(
+                task_location.location_id,
+                task_location.start,
+                task_location.end,
+                task_location.timing_rule,
+            )
+        ].append(task_location)
+
+    to_create = []
+    for data in locations_data:
+        key = get_task_location_key(
+            data["location"].pk, data["start"], data["end"], data["timing_rule"]
+        )
+        if existing[key]:
+            existing[key].popleft()
+        else:
+            to_create.append(TaskLocation(task=task, **data))
+
+    stale_ids = [item.pk for items in existing.values() for item in items]
+    if stale_ids:
+        TaskLocation.objects.filter(pk__in=stale_ids).delete()
+    if to_create:
+        TaskLocation.objects.bulk_create(to_create)
+
+
 class TaskLocationSerializer(serializers.ModelSerializer):
     """
     TaskLocation serialzier class
@@ -55,6 +104,22 @@ class TaskLocationSerializer(serializers.ModelSerializer):
         return check_timing_rule(value)
 
 
+class TaskLocationSyncSerializer(TaskLocationSerializer):
+    """
+    TaskLocation serializer class used when syncing changes, which includes
+    the id that deletions are reported by
+    """
+
+    # pylint: disable=too-few-public-methods
+    class Meta:
+        """
+        Meta options for TaskLocationSyncSerializer
+        """
+
+        model = TaskLocation
+        fields = ["id"] + TaskLocationSerializer.Meta.fields
+
+
 class TaskLocationCreateSerializer(TaskLocationSerializer):
     """
     Serializer model class used when creating a TaskLocation object
@@ -84,7 +149,7 @@ class TaskSerializer(GenericForeignKeySerializer):
     """
 
     start = serializers.DateTimeField(required=False)
-    submission_count = serializers.SerializerMethodField()
+    submission_count = serializers.IntegerField(read_only=True)
     locations_input = TaskLocationCreateSerializer(
         many=True, required=False, write_only=True
     )
@@ -120,6 +185,7 @@ class TaskSerializer(GenericForeignKeySerializer):
         ]
         read_only_fields = ["locations"]
         model = Task
+        list_serializer_class = GenericForeignKeyListSerializer
 
     # pylint: disable=no-self-use
     def validate_timing_rule(self, value):
@@ -146,8 +212,9 @@ class TaskSerializer(GenericForeignKeySerializer):
             # get start and end from timing rules
             timing_rule = attrs.get("timing_rule")
             if timing_rule is not None:
-                timing_rule_start = get_rrule_start(rrulestr(timing_rule))
-                timing_rule_end = get_rrule_end(rrulestr(timing_rule))
+                the_rrule = get_rrule(timing_rule)
+                timing_rule_start = get_rrule_start(the_rrule)
+                timing_rule_end = get_rrule_end(the_rrule)
             else:
                 timing_rule_start = None
                 timing_rule_end = None
@@ -191,22 +258,13 @@ class TaskSerializer(GenericForeignKeySerializer):
 
         return super(TaskSerializer, self).validate(attrs)
 
-    def get_submission_count(self, obj):
-        """
-        Add a custom method to get submission count
-        """
-        try:
-            return obj.submission_count
-        except AttributeError:
-            return obj.submissions
-
     def get_task_locations(self, obj):
         """
         Get serialized TaskLocation objects
+
+        This uses the prefetched TaskLocation objects when they are available
         """
-        # pylint: disable=no-member
-        queryset = TaskLocation.objects.filter(task=obj)
-        return TaskLocationSerializer(queryset, many=True).data
+        return TaskLocationSerializer(obj.tasklocation_set.all(), many=True).data
 
     def create(self, validated_data):
         """
@@ -216,10 +274,10 @@ class TaskSerializer(GenericForeignKeySerializer):
 
         task = super(TaskSerializer, self).create(validated_data=validated_data)
 
-        for location_data in locations_data:
-            location_data["task"] = task
-            TaskLocationSerializer.create(
-                TaskLocationSerializer(), validated_data=location_data
+        if locations_data:
+            # pylint: disable=no-member
+            TaskLocation.objects.bulk_create(
+                [TaskLocation(task=task, **data) for data in locations_data]
             )
 
         return task
@@ -237,14 +295,6 @@ class TaskSerializer(GenericForeignKeySerializer):
         # linked to this task and that other relationships should be removed
         # if task_locations is empty it means the user is removing all Task and
         # Location relationships
-
-        # pylint: disable=no-member
-        TaskLocation.objects.filter(task=task).delete()
-
-        for location_data in locations_data:
-            location_data["task"] = task
-            TaskLocationSerializer.create(
-                TaskLocationSerializer(), validated_data=location_data
-            )
+        set_task_locations(task, locations_data)
 
         return task
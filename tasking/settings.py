@@ -3,3 +3,61 @@
 TASKING_CHECK_NUMBER_OF_FILES_IN_SHAPEFILES_DIR = False
 TASKING_SHAPEFILE_IGNORE_INVALID_TYPES = False
 TASKING_SHAPEFILE_ALLOW_NESTED_MULTIPOLYGONS = False
+# the number of days of future occurrences that are kept materialized for
+# each task.  None means occurrences are generated up to TASKING_MAX_OCCURRENCES
+TASKING_OCCURRENCE_HORIZON_DAYS = None
+# the longest date window that occurrences can be expanded for on the fly
+TASKING_VIRTUAL_OCCURRENCES_MAX_DAYS = 366
+# the largest number of occurrences that are expanded on the fly at a time;
+# requests for more are rejected instead of being cut short
+TASKING_VIRTUAL_OCCURRENCES_MAX_RESULTS = 10000
+# the backend that background jobs, such as generating occurrences, are run by
+TASKING_JOB_BACKEND = "tasking.jobs.SyncBackend"
+# the number of worker threads used by tasking.jobs.ThreadPoolBackend
+TASKING_JOB_THREAD_POOL_SIZE = 4
+# the number of times a failing job is run by process_jobs before giving up
+TASKING_JOB_MAX_ATTEMPTS = 3
+# the number of seconds that process_jobs waits before running a failed job
+# again.  The wait is doubled after each further failure
+TASKING_JOB_RETRY_DELAY = 60
+# the number of jobs that process_jobs claims at a time
+TASKING_JOB_BATCH_SIZE = 10
+# the number of seconds after which a running job that has not reported
+# progress is assumed to have lost its worker and is run again by process_jobs
+TASKING_JOB_TIMEOUT = 3600
+# the number of submissions validated and saved at a time by the bulk
+# submissions endpoint
+TASKING_SUBMISSION_BULK_BATCH_SIZE = 500
+# the default and the largest number of items in a page of submissions or
+# occurrences, when clients ask for pages
+TASKING_PAGE_SIZE = 100
+TASKING_MAX_PAGE_SIZE = 1000
+# the number of rows that exports read from the database at a time
+TASKING_EXPORT_CHUNK_SIZE = 2000
+# the number of seconds that the watermarks returned by the sync endpoint are
+# moved back by, so that rows saved by transactions that were still running
+# when changes were read are not missed
+TASKING_SYNC_WATERMARK_OVERLAP = 60
+# the number of days that the records of deleted objects are kept for the sync
+# endpoint.  Clients whose watermark is older have to sync again from scratch.
+# None keeps them forever
+TASKING_TOMBSTONE_RETENTION_DAYS = 30
+# the maximum number of locations saved in one INSERT statement when locations
+# are imported from a shapefile
+TASKING_LOCATION_IMPORT_BATCH_SIZE = 1000
+# the number of items that jobs do between updates of their progress
+TASKING_JOB_PROGRESS_INTERVAL = 100
+# the tolerances, in degrees, that the simplified shapefiles of locations are
+# simplified with.  The keys are fixed; each has its own field on Location
+TASKING_SHAPEFILE_SIMPLIFY_TOLERANCES = {
+    "fine": 0.0001,
+    "medium": 0.001,
+    "coarse": 0.01,
+}
+# the cache that location vector tiles are kept in, and for how many seconds.
+# Tiles are cached by the latest modified time of the locations that they are
+# built from, so changes to locations are seen straight away
+TASKING_TILE_CACHE = "default"
+TASKING_TILE_CACHE_TIMEOUT = 3600
+# the deepest zoom level that location vector tiles are built for
+TASKING_TILE_MAX_ZOOM = 22
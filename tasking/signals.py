@@ -4,17 +4,42 @@ Signals for tasking
 These signals are not connected by default, you will have to connect them
 'manually' in your own code
 """
-from tasking.utils import generate_task_occurrences
+from django.contrib.contenttypes.models import ContentType
+
+from tasking.jobs import TASK_OCCURRENCES_JOB, enqueue_job
+from tasking.models import Tombstone
 
 
 # pylint: disable=unused-argument
 def create_occurrences(sender, instance, created, **kwargs):
     """
     Create occurrences when a task timing_rule changes
+
+    Nothing is done if none of the fields that occurrences are generated
+    from have changed.  Otherwise, only the occurrences that differ from
+    the timing_rule are created, updated or deleted.
+
+    The work is done by the job backend set in TASKING_JOB_BACKEND; the
+    status of the Job that is returned shows when the occurrences are ready.
+    """
+    if instance.timing_rule and (created or instance.occurrence_fields_changed()):
+        return enqueue_job(TASK_OCCURRENCES_JOB, instance)
+    return None
+
+
+# pylint: disable=unused-argument
+def create_tombstone(sender, instance, **kwargs):
+    """
+    Record the deletion of an object so that clients that sync changes
+    find out about it
+
+    Connect this to the post_delete signal of each model that is synced,
+    see tasking.viewsets.sync.SYNC_SECTIONS.  Occurrences that are deleted in
+    bulk by tasking.utils.bulk_delete_occurrences do not send the signal;
+    their tombstones are saved in bulk instead.
     """
-    if instance.timing_rule:
-        # delete any existing occurrences
-        instance.taskoccurrence_set.all().delete()
-        # generate new occurrences
-        if instance.timing_rule:
-            generate_task_occurrences(task=instance, timing_rule=instance.timing_rule)
+    # pylint: disable=no-member
+    return Tombstone.objects.create(
+        target_content_type=ContentType.objects.get_for_model(instance),
+        target_object_id=instance.pk,
+    )
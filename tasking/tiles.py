@@ -0,0 +1,169 @@
+"""
+Mapbox vector tiles for tasking
+"""
+from math import atan, degrees, pi, sinh
+
+from django.db import connection
+
+from tasking.models import Location
+
+# half the width of the world in web mercator (EPSG:3857) metres
+WEB_MERCATOR_MAX = 20037508.342789244
+# the size of tiles, in tile coordinates, and the size of the buffer around
+# them that geometries are clipped to
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_LAYER = "locations"
+# the length, in metres, of the shortest degree of latitude and of a degree of
+# longitude at the equator, used to turn the radius of locations into degrees
+METRES_PER_DEGREE_LATITUDE = 110574
+METRES_PER_DEGREE_LONGITUDE = 111320
+# degrees of longitude get too short to divide by closer to the poles
+MAX_LATITUDE = 89.9
+# the shapefile field that is drawn in tiles up to each zoom level, most
+# simplified first; the full shapefile is drawn beyond the last one
+TILE_SHAPEFILE_ZOOMS = [
+    (6, "shapefile_coarse"),
+    (10, "shapefile_medium"),
+    (13, "shapefile_fine"),
+]
+
+
+def get_tile_bounds(zoom, x, y):
+    """
+    Returns the (xmin, ymin, xmax, ymax) web mercator bounds of a tile
+    """
+    size = 2 * WEB_MERCATOR_MAX / 2**zoom
+    xmin = -WEB_MERCATOR_MAX + x * size
+    ymax = WEB_MERCATOR_MAX - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def get_tile_max_latitude(bounds):
+    """
+    Returns the largest absolute latitude, in degrees, within the web
+    mercator bounds of a tile
+    """
+    _, ymin, _, ymax = bounds
+    return degrees(atan(sinh(max(abs(ymin), abs(ymax)) / WEB_MERCATOR_MAX * pi)))
+
+
+def get_tile_shapefile_field(zoom):
+    """
+    Returns the name of the shapefile field that is drawn at zoom
+    """
+    for max_zoom, field in TILE_SHAPEFILE_ZOOMS:
+        if zoom <= max_zoom:
+            return field
+    return "shapefile"
+
+
+# pylint: disable=invalid-name
+def render_location_tile(queryset, zoom, x, y, LocationModelClass=Location):
+    """
+    Returns a Mapbox vector tile, built by PostGIS, of the locations in
+    queryset that are in the tile at zoom, x and y
+
+    Locations are drawn from their shapefile, simplified to suit the zoom
+    level, or from a buffer of radius metres around their geopoint.  Each
+    feature has the id, name, country, location_type and parent of its
+    location.
+
+    Both kinds of locations are found using the spatial indexes of their
+    fields: geopoints are looked for in the bounds of the tile expanded by
+    the largest radius of any location, in degrees, before the distance to
+    the tile is checked in web mercator units.  A radius of r metres is
+    r / cos(latitude) of those units, which is worked out at the edge of the
+    buffer furthest from the equator so that no location is missed.
+    """
+    quote = connection.ops.quote_name
+    # pylint: disable=protected-access
+    table = quote(LocationModelClass._meta.db_table)
+    shapefile = quote(get_tile_shapefile_field(zoom))
+    ids_sql, ids_params = queryset.order_by().values("pk").query.sql_with_params()
+
+    sql = f"""
+        SELECT ST_AsMVT(tile, %s, %s, 'geom')
+        FROM (
+            SELECT
+                id,
+                name,
+                country,
+                location_type_id AS location_type,
+                parent_id AS parent,
+                ST_AsMVTGeom(
+                    ST_Transform(
+                        COALESCE(
+                            {shapefile},
+                            shapefile,
+                            ST_Buffer(geopoint::geography, radius::float8)::geometry
+                        ),
+                        3857
+                    ),
+                    bounds.geom,
+                    %s,
+                    %s,
+                    true
+                ) AS geom
+            FROM
+                {table},
+                (
+                    SELECT
+                        ST_MakeEnvelope(%s, %s, %s, %s, 3857) AS geom,
+                        ST_Transform(
+                            ST_MakeEnvelope(%s, %s, %s, %s, 3857), 4326
+                        ) AS wgs84,
+                        COALESCE(
+                            (SELECT MAX(radius) FROM {table}), 0
+                        )::float8 / %s AS radius_lat
+                ) AS bounds
+            WHERE
+                id IN ({ids_sql})
+                AND (
+                    shapefile && bounds.wgs84
+                    OR (
+                        geopoint && ST_Expand(
+                            bounds.wgs84,
+                            bounds.radius_lat * %s / cos(
+                                radians(LEAST(%s + bounds.radius_lat, %s))
+                            ),
+                            bounds.radius_lat
+                        )
+                        AND ST_DWithin(
+                            ST_Transform(geopoint, 3857),
+                            bounds.geom,
+                            radius::float8 / cos(
+                                radians(
+                                    LEAST(
+                                        abs(ST_Y(geopoint)) + radius::float8 / %s,
+                                        %s
+                                    )
+                                )
+                            )
+                        )
+                    )
+                )
+        ) AS tile
+        WHERE geom IS NOT NULL
+    """
+    bounds = list(get_tile_bounds(zoom, x, y))
+    params = (
+        [TILE_LAYER, TILE_EXTENT, TILE_EXTENT, TILE_BUFFER]
+        + bounds
+        + bounds
+        + [METRES_PER_DEGREE_LATITUDE]
+        + list(ids_params)
+        + [
+            METRES_PER_DEGREE_LATITUDE / METRES_PER_DEGREE_LONGITUDE,
+            get_tile_max_latitude(bounds),
+            MAX_LATITUDE,
+            METRES_PER_DEGREE_LATITUDE,
+            MAX_LATITUDE,
+        ]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return b""
+    return bytes(row[0])
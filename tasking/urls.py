@@ -8,10 +8,12 @@ from rest_framework import routers
 
 from tasking.viewsets import (
     ContentTypeViewSet,
+    JobViewSet,
     LocationViewSet,
     ProjectViewSet,
     SegmentRuleViewSet,
     SubmissionViewSet,
+    SyncViewSet,
     TaskOccurrenceViewSet,
     TaskViewSet,
 )
@@ -19,10 +21,12 @@ from tasking.viewsets import (
 # pylint: disable=invalid-name
 router = routers.DefaultRouter(trailing_slash=False)
 router.register(r"contenttypes", ContentTypeViewSet)
+router.register(r"jobs", JobViewSet)
 router.register(r"locations", LocationViewSet)
 router.register(r"projects", ProjectViewSet)
 router.register(r"segment-rules", SegmentRuleViewSet)
 router.register(r"submissions", SubmissionViewSet)
+router.register(r"sync", SyncViewSet, basename="sync")
 router.register(r"occurrences", TaskOccurrenceViewSet)
 router.register(r"tasks", TaskViewSet)
 
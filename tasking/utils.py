@@ -3,16 +3,36 @@
 Utility functions for tasking
 """
 import operator
-from datetime import time
+from collections import defaultdict, deque
+from ctypes import c_char_p, c_int, c_uint64, c_void_p
+from datetime import date, datetime, time, timedelta
 from functools import reduce
+from itertools import islice
+from time import perf_counter
+from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.gis.gdal import geometries
-from django.db.models import Q
+from django.contrib.gis.gdal import DataSource, geometries
+from django.contrib.gis.gdal.libgdal import std_call
+from django.contrib.gis.gdal.prototypes.generation import int_output, voidptr_output
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DateField,
+    F,
+    IntegerField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
 from django.utils import timezone
-
-from dateutil.rrule import rrulestr
+from django.utils.encoding import force_bytes
 
 from tasking.exceptions import (
     MissingFiles,
@@ -20,7 +40,8 @@ from tasking.exceptions import (
     TargetDoesNotExist,
     UnnecessaryFiles,
 )
-from tasking.models import TaskOccurrence
+from tasking.models import Submission, Task, TaskLocation, TaskOccurrence, Tombstone
+from tasking.rrules import get_rrule, get_rrule_last_occurrence, iter_rrule_from
 
 DEFAULT_ALLOWED_CONTENTTYPES = [
     {"app_label": "tasking", "model": "task"},
@@ -39,6 +60,22 @@ ALLOWED_CONTENTTYPES = getattr(
     settings, "TASKING_ALLOWED_CONTENTTYPES", DEFAULT_ALLOWED_CONTENTTYPES
 )
 MAX_OCCURRENCES = getattr(settings, "TASKING_MAX_OCCURRENCES", 500)
+# the number of tasks processed at a time when generating occurrences in bulk
+OCCURRENCE_TASK_CHUNK_SIZE = getattr(
+    settings, "TASKING_OCCURRENCE_TASK_CHUNK_SIZE", 500
+)
+# the maximum number of occurrences saved in one INSERT statement
+OCCURRENCE_BATCH_SIZE = getattr(settings, "TASKING_OCCURRENCE_BATCH_SIZE", 2000)
+
+# GDAL virtual file system routines used to read shapefiles in memory
+# https://gdal.org/api/cpl.html#cpl-vsi-h
+# the buffer is passed as c_char_p so that bytes are handed over without a copy
+# pylint: disable=invalid-name
+create_vsi_file = voidptr_output(
+    std_call("VSIFileFromMemBuffer"), [c_char_p, c_char_p, c_uint64, c_int]
+)
+close_vsi_file = int_output(std_call("VSIFCloseL"), [c_void_p])
+unlink_vsi_file = int_output(std_call("VSIUnlink"), [c_char_p])
 
 
 def get_allowed_contenttypes(allowed_content_types=ALLOWED_CONTENTTYPES):
@@ -54,6 +91,88 @@ def get_allowed_contenttypes(allowed_content_types=ALLOWED_CONTENTTYPES):
     return ContentType.objects.none()
 
 
+class AllowedContentTypes:
+    """
+    Process-wide cache of the allowed content types
+
+    The allowed content types are read in one query the first time they are
+    needed and kept, along with their model classes, until clear is called.
+    tasking.apps connects clear to the signals that are sent when ContentType
+    rows change.
+    """
+
+    def __init__(self, allowed_content_types=ALLOWED_CONTENTTYPES):
+        self.allowed_content_types = allowed_content_types
+        self._cache = None
+
+    def _get_cache(self):
+        """
+        Returns the cached lookups, reading the content types if needed
+        """
+        cache = self._cache
+        if cache is None:
+            content_types = list(
+                get_allowed_contenttypes(self.allowed_content_types).order_by(
+                    "app_label", "model"
+                )
+            )
+            # built in full before being stored so that other threads never
+            # see a partial cache
+            cache = (
+                content_types,
+                {item.pk: item for item in content_types},
+                {(item.app_label, item.model): item for item in content_types},
+                {item.pk: item.model_class() for item in content_types},
+            )
+            self._cache = cache
+        return cache
+
+    def clear(self):
+        """
+        Forget the cached content types
+        """
+        self._cache = None
+
+    def all(self):
+        """
+        Returns a list of the allowed content types
+        """
+        return list(self._get_cache()[0])
+
+    def get_for_id(self, pk):
+        """
+        Returns the allowed content type with pk, or None
+        """
+        return self._get_cache()[1].get(pk)
+
+    def get_by_natural_key(self, app_label, model):
+        """
+        Returns the allowed content type of app_label and model, or None
+        """
+        return self._get_cache()[2].get((app_label, model))
+
+    def get_model_class(self, pk):
+        """
+        Returns the model class of the allowed content type with pk, or None
+        """
+        return self._get_cache()[3].get(pk)
+
+
+# pylint: disable=invalid-name
+allowed_contenttypes = AllowedContentTypes()
+
+
+# pylint: disable=unused-argument
+def clear_allowed_contenttypes(sender=None, **kwargs):
+    """
+    Clear the cache of allowed content types
+
+    This is connected to the post_save, post_delete and post_migrate
+    signals.
+    """
+    allowed_contenttypes.clear()
+
+
 def get_occurrence_start_time(the_rrule, start_time_input=None):
     """
     Get the start time used to create a task occurrence
@@ -88,47 +207,95 @@ def get_occurrence_end_time(task, the_rrule, end_time_input=None):
     return end_time
 
 
-# pylint: disable=invalid-name
-def generate_task_occurrences(  # pylint: disable=bad-continuation
+def get_occurrence_window():
+    """
+    Returns the (first, last) dates of the rolling horizon within which
+    occurrences are materialized
+
+    Both are None unless TASKING_OCCURRENCE_HORIZON_DAYS is set.
+    """
+    horizon = settings.TASKING_OCCURRENCE_HORIZON_DAYS
+    if not horizon:
+        return None, None
+    today = timezone.localdate()
+    return today, today + timedelta(days=horizon)
+
+
+def get_rrule_datetime(rrule_obj, the_date):
+    """
+    Returns the start of the_date as a datetime that can be compared with
+    the datetimes produced by rrule_obj
+    """
+    # pylint: disable=protected-access
+    tzinfo = rrule_obj._dtstart.tzinfo
+    return datetime.combine(the_date, time.min).replace(tzinfo=tzinfo)
+
+
+# pylint: disable=invalid-name,too-many-arguments,too-many-locals,too-many-branches
+def build_task_occurrences(  # pylint: disable=bad-continuation
     task,
     timing_rule,
     start_time_input=None,
     end_time_input=None,
     OccurrenceModelClass=TaskOccurrence,
+    from_date=None,
+    until_date=None,
+    location_id=None,
+    limit=MAX_OCCURRENCES,
 ):
     """
-    Generates TaskOccurrence objects using the Task timing_rule field
+    Builds (but does not save) OccurrenceModelClass objects using the
+    timing_rule
 
-    It works this way:
-        - gets the start_time from the timing_rule
-        - only generates a maximum of MAX_OCCURRENCES
-        - the end time is always 23:59:59
-            * the very last task occurrence will have the same end_time as
-              the end_time from the timing_rule
-        - occurrences with the same start_time and end_time will not be
-          created, they will be skipped silently
-        - only works for valid rrules
+    See generate_task_occurrences for the rules that are followed.
 
-    Returns a Queryset of OccurrenceModel class objects
+    If from_date and/or until_date are provided, only occurrences on or
+    between those dates are built.  When until_date is provided, the
+    occurrences are limited by the window instead of MAX_OCCURRENCES, and
+    limit (if not None) only caps how many occurrences are built in one go.
+    When neither is provided, the rolling horizon from get_occurrence_window
+    is used.
+
+    The built objects are linked to the location whose id is location_id, if
+    provided.
+
+    Returns a list of unsaved OccurrenceModelClass objects
     """
 
     # get the rrule
     try:
-        the_rrule = rrulestr(timing_rule)
+        the_rrule = get_rrule(timing_rule)
     except ValueError:
         # not valid rrule string
-        # pylint: disable=no-member
-        return OccurrenceModelClass.objects.none()
+        return []
     except TypeError:
         # not a string
-        # pylint: disable=no-member
-        return OccurrenceModelClass.objects.none()
+        return []
 
-    # get the max occurrences we can make right now
-    try:
-        occurrence_count = min(the_rrule.count(), MAX_OCCURRENCES)
-    except ValueError:
-        occurrence_count = MAX_OCCURRENCES
+    if from_date is None and until_date is None:
+        from_date, until_date = get_occurrence_window()
+
+    if until_date is None:
+        # get the max occurrences we can make right now
+        # we only expand as many items as we could possibly need because
+        # calling count() on an rrule with no end expands it all the way to
+        # the year 9999
+        try:
+            occurrence_count = sum(1 for _ in islice(the_rrule, MAX_OCCURRENCES))
+        except ValueError:
+            occurrence_count = MAX_OCCURRENCES
+        rrule_instances = iter(the_rrule)
+    else:
+        # the window limits the number of occurrences, so we do not need to
+        # count occurrences from the very start.  dateutil still expands
+        # rules from their DTSTART, which iter_rrule_from avoids where it can
+        occurrence_count = None
+        if from_date is None:
+            rrule_instances = iter(the_rrule)
+        else:
+            rrule_instances = iter_rrule_from(
+                the_rrule, get_rrule_datetime(the_rrule, from_date)
+            )
 
     # the end datetime for the task
     task_end = task.end
@@ -138,17 +305,30 @@ def generate_task_occurrences(  # pylint: disable=bad-continuation
     end_time = get_occurrence_end_time(task, the_rrule, end_time_input=end_time_input)
 
     occurrence_list = []
+    # the number of occurrences built so far, including those before from_date
+    generated = 0
 
     # lets loop through all datetimes in the rrule
-    for rrule_instance in the_rrule:
+    # we keep track of the next item so that we know which one is the last
+    next_instance = next(rrule_instances, None)
+    while next_instance is not None:
+        rrule_instance = next_instance
+        next_instance = next(rrule_instances, None)
 
         # if we've reached our max count or if rrule_instance is
         # greater than the task_end we then break the loop
-        if len(occurrence_list) == occurrence_count or (
+        if generated == occurrence_count or (
             task_end is not None and rrule_instance.date() > task_end.date()
         ):
             break
 
+        # if we are past the window or have built as many occurrences as we
+        # can in one go we also break the loop
+        if until_date is not None and (
+            rrule_instance.date() > until_date or len(occurrence_list) == limit
+        ):
+            break
+
         # if end time is provided as in input use it as the_end_time
         if end_time_input:
             this_end_time = end_time_input
@@ -163,15 +343,25 @@ def generate_task_occurrences(  # pylint: disable=bad-continuation
             # end date for the timing_rule this is because we believe that
             # the task must end no later than the timing_rule dictates
             if end_time is not None:
-                if len(occurrence_list) + 1 == occurrence_count:
+                if occurrence_count is None:
+                    is_last = next_instance is None
+                else:
+                    is_last = generated + 1 == occurrence_count
+                if is_last:
                     this_end_time = end_time
 
         # do nothing unless this_end_time > start_time
         # we compare just the hour and minute values because ... well :)
         if this_end_time > start_time:
+            generated += 1
+
+            if from_date is not None and rrule_instance.date() < from_date:
+                continue
+
             # define the OccurrenceModelClass object
             occurrence_obj = OccurrenceModelClass(
                 task=task,
+                location_id=location_id,
                 date=rrule_instance.date(),
                 start_time=start_time,
                 end_time=this_end_time,
@@ -179,14 +369,431 @@ def generate_task_occurrences(  # pylint: disable=bad-continuation
 
             occurrence_list.append(occurrence_obj)
 
+    return occurrence_list
+
+
+# pylint: disable=invalid-name
+def generate_task_occurrences(  # pylint: disable=bad-continuation
+    task,
+    timing_rule,
+    start_time_input=None,
+    end_time_input=None,
+    OccurrenceModelClass=TaskOccurrence,
+):
+    """
+    Generates TaskOccurrence objects using the Task timing_rule field
+
+    It works this way:
+        - gets the start_time from the timing_rule
+        - only generates a maximum of MAX_OCCURRENCES
+        - the end time is always 23:59:59
+            * the very last task occurrence will have the same end_time as
+              the end_time from the timing_rule
+        - occurrences with the same start_time and end_time will not be
+          created, they will be skipped silently
+        - only works for valid rrules
+
+    Returns a Queryset of OccurrenceModel class objects
+    """
+    occurrence_list = build_task_occurrences(
+        task=task,
+        timing_rule=timing_rule,
+        start_time_input=start_time_input,
+        end_time_input=end_time_input,
+        OccurrenceModelClass=OccurrenceModelClass,
+    )
+
     if occurrence_list:
         # pylint: disable=no-member
         OccurrenceModelClass.objects.bulk_create(occurrence_list)
+        OccurrenceModelClass.update_task_occurrence_dates([task.pk])
 
     # return the task occurrences
+    # pylint: disable=no-member
+    return OccurrenceModelClass.objects.filter(task=task)
+
+
+# pylint: disable=invalid-name
+def bulk_delete_occurrences(  # pylint: disable=bad-continuation
+    queryset, batch_size=OCCURRENCE_BATCH_SIZE, TombstoneModelClass=Tombstone
+):
+    """
+    Deletes the occurrences in queryset in one DELETE statement
+
+    post_delete signals are not sent for the deleted occurrences.  Instead,
+    if anything listens to them (e.g. tasking.signals.create_tombstone), the
+    deletions are recorded in Tombstone objects saved in INSERT statements
+    of at most batch_size rows each rather than one row at a time.
+
+    Returns the number of occurrences deleted
+    """
+    occurrence_ids = list(queryset.order_by().values_list("pk", flat=True))
+    if not occurrence_ids:
+        return 0
+    if post_delete.has_listeners(queryset.model):
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        # pylint: disable=no-member
+        TombstoneModelClass.objects.bulk_create(
+            [
+                TombstoneModelClass(
+                    target_content_type=content_type, target_object_id=occurrence_id
+                )
+                for occurrence_id in occurrence_ids
+            ],
+            batch_size=batch_size,
+        )
+    # pylint: disable=protected-access
+    queryset.model.objects.filter(pk__in=occurrence_ids)._raw_delete(queryset.db)
+    return len(occurrence_ids)
+
+
+# pylint: disable=invalid-name
+def save_occurrence_changes(  # pylint: disable=bad-continuation
+    wanted, existing, batch_size=OCCURRENCE_BATCH_SIZE
+):
+    """
+    Saves the difference between the unsaved occurrences in wanted and the
+    stored occurrences in the existing queryset
+
+    Occurrences are matched by task, location and date:
+        - matching occurrences are left untouched (their ids do not change)
+        - matching occurrences whose times differ are updated
+        - wanted occurrences without a match are created
+        - stored occurrences without a match are deleted
+
+    Writes are done in statements of at most batch_size rows each.
+
+    Returns True if any occurrence was created or deleted
+    """
+    stored = defaultdict(deque)
+    for occurrence in existing.order_by("date", "start_time", "id"):
+        key = (occurrence.task_id, occurrence.location_id, occurrence.date)
+        stored[key].append(occurrence)
+
+    to_create = []
+    to_update = []
+    for occurrence in wanted:
+        key = (occurrence.task_id, occurrence.location_id, occurrence.date)
+        if stored[key]:
+            current = stored[key].popleft()
+            if (current.start_time, current.end_time) != (
+                occurrence.start_time,
+                occurrence.end_time,
+            ):
+                current.start_time = occurrence.start_time
+                current.end_time = occurrence.end_time
+                # bulk_update does not take care of auto_now fields
+                current.modified = timezone.now()
+                to_update.append(current)
+        else:
+            to_create.append(occurrence)
+
+    stale_ids = [occurrence.pk for items in stored.values() for occurrence in items]
+
+    model = existing.model
+    if stale_ids:
+        bulk_delete_occurrences(
+            model.objects.filter(pk__in=stale_ids), batch_size=batch_size
+        )
+    if to_update:
+        model.objects.bulk_update(
+            to_update, ["start_time", "end_time", "modified"], batch_size=batch_size
+        )
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+
+    return bool(stale_ids or to_create)
+
+
+# pylint: disable=invalid-name
+def sync_task_occurrences(  # pylint: disable=bad-continuation
+    task,
+    timing_rule,
+    start_time_input=None,
+    end_time_input=None,
+    OccurrenceModelClass=TaskOccurrence,
+):
+    """
+    Brings the stored task-level occurrences of a task in line with the
+    timing_rule
+
+    Unlike deleting and re-generating the occurrences, this compares what the
+    timing_rule expands to with what is already stored and:
+        - leaves matching occurrences untouched (their ids do not change)
+        - updates the times of occurrences whose date is still valid
+        - creates occurrences for new dates
+        - deletes occurrences whose date is no longer valid
+
+    Only occurrences that are not linked to a location are considered.  In
+    rolling horizon mode, occurrences before the start of the window are
+    left alone.
+
+    Returns a Queryset of OccurrenceModel class objects
+    """
+    from_date, until_date = get_occurrence_window()
+    wanted = build_task_occurrences(
+        task=task,
+        timing_rule=timing_rule,
+        start_time_input=start_time_input,
+        end_time_input=end_time_input,
+        OccurrenceModelClass=OccurrenceModelClass,
+        from_date=from_date,
+        until_date=until_date,
+    )
+
+    # pylint: disable=no-member
+    existing = OccurrenceModelClass.objects.filter(task=task, location=None)
+    if from_date is not None:
+        existing = existing.filter(date__gte=from_date)
+
+    if save_occurrence_changes(wanted, existing):
+        OccurrenceModelClass.update_task_occurrence_dates([task.pk])
+
     return OccurrenceModelClass.objects.filter(task=task)
 
 
+def chunked(iterable, size):
+    """
+    Splits an iterable into lists of at most size items
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# pylint: disable=invalid-name
+def bulk_generate_task_occurrences(  # pylint: disable=bad-continuation
+    tasks,
+    chunk_size=OCCURRENCE_TASK_CHUNK_SIZE,
+    batch_size=OCCURRENCE_BATCH_SIZE,
+    OccurrenceModelClass=TaskOccurrence,
+):
+    """
+    Generates TaskOccurrence objects for many tasks in one pass
+
+    It works this way:
+        - tasks (an iterable or a queryset) are processed chunk_size at a time
+        - for each chunk, existing task-level occurrences are fetched in one
+          query and compared by date with the new ones in the same way as
+          sync_task_occurrences: unchanged occurrences keep their ids and
+          only the differences are saved, in statements of at most
+          batch_size rows each
+        - occurrences are built in the same way as generate_task_occurrences
+        - tasks without a timing_rule are skipped
+        - in rolling horizon mode, occurrences before the start of the window
+          are left alone
+
+    Returns a dict with the number of tasks processed, the number of
+    occurrences the tasks now have in the window and the number of seconds it
+    took
+    """
+    from_date, until_date = get_occurrence_window()
+    started = perf_counter()
+    task_total = 0
+    occurrence_total = 0
+
+    if hasattr(tasks, "iterator"):
+        tasks = tasks.iterator(chunk_size=chunk_size)
+
+    for task_chunk in chunked(tasks, chunk_size):
+        task_chunk = [task for task in task_chunk if task.timing_rule]
+        if not task_chunk:
+            continue
+
+        occurrence_list = []
+        for task in task_chunk:
+            occurrence_list.extend(
+                build_task_occurrences(
+                    task=task,
+                    timing_rule=task.timing_rule,
+                    OccurrenceModelClass=OccurrenceModelClass,
+                    from_date=from_date,
+                    until_date=until_date,
+                )
+            )
+
+        # pylint: disable=no-member
+        existing = OccurrenceModelClass.objects.filter(
+            task_id__in=[task.pk for task in task_chunk], location=None
+        )
+        if from_date is not None:
+            existing = existing.filter(date__gte=from_date)
+
+        with transaction.atomic():
+            if save_occurrence_changes(
+                occurrence_list, existing, batch_size=batch_size
+            ):
+                OccurrenceModelClass.update_task_occurrence_dates(
+                    [task.pk for task in task_chunk]
+                )
+
+        task_total += len(task_chunk)
+        occurrence_total += len(occurrence_list)
+
+    return {
+        "tasks": task_total,
+        "occurrences": occurrence_total,
+        "seconds": perf_counter() - started,
+    }
+
+
+# pylint: disable=invalid-name
+def extend_task_occurrences(  # pylint: disable=bad-continuation
+    tasks,
+    chunk_size=OCCURRENCE_TASK_CHUNK_SIZE,
+    batch_size=OCCURRENCE_BATCH_SIZE,
+    OccurrenceModelClass=TaskOccurrence,
+    TaskLocationModelClass=TaskLocation,
+):
+    """
+    Extends the materialized occurrences of many tasks up to the end of the
+    rolling horizon
+
+    It works this way:
+        - tasks (an iterable or a queryset) are processed chunk_size at a time
+        - for each chunk, the TaskLocation objects of all the tasks and the
+          last stored occurrence date of every task and of every
+          (task, location) pair are fetched in one query each
+        - occurrences after that date (and not before the start of the
+          window) up to the end of the window are built from the timing_rule
+          of the task, and from the timing_rule of each of its TaskLocation
+          objects, and then saved in INSERT statements of at most batch_size
+          rows each
+
+    Does nothing unless TASKING_OCCURRENCE_HORIZON_DAYS is set.
+
+    Returns a dict with the number of tasks processed, the number of
+    occurrences the tasks now have in the window and the number of seconds it
+    took
+    """
+    from_date, until_date = get_occurrence_window()
+    started = perf_counter()
+    task_total = 0
+    occurrence_total = 0
+
+    if until_date is None:
+        return {"tasks": 0, "occurrences": 0, "seconds": perf_counter() - started}
+
+    def get_from_date(last_date):
+        """
+        Returns the date from which to build occurrences that come after
+        last_date
+        """
+        if last_date is None:
+            return from_date
+        return max(from_date, last_date + timedelta(days=1))
+
+    if hasattr(tasks, "iterator"):
+        tasks = tasks.iterator(chunk_size=chunk_size)
+
+    for task_chunk in chunked(tasks, chunk_size):
+        tasks_by_id = {task.pk: task for task in task_chunk}
+
+        # pylint: disable=no-member
+        task_locations = list(
+            TaskLocationModelClass.objects.filter(
+                task_id__in=tasks_by_id.keys()
+            ).order_by("id")
+        )
+        last_dates = {
+            (task_id, location_id): last_date
+            for task_id, location_id, last_date in OccurrenceModelClass.objects.filter(
+                task_id__in=tasks_by_id.keys()
+            )
+            .order_by()
+            .values("task_id", "location_id")
+            .annotate(last_date=Max("date"))
+            .values_list("task_id", "location_id", "last_date")
+        }
+
+        occurrence_list = []
+        for task in task_chunk:
+            last_date = last_dates.get((task.pk, None))
+            if not task.timing_rule or (
+                last_date is not None and last_date >= until_date
+            ):
+                continue
+            occurrence_list.extend(
+                build_task_occurrences(
+                    task=task,
+                    timing_rule=task.timing_rule,
+                    OccurrenceModelClass=OccurrenceModelClass,
+                    from_date=get_from_date(last_date),
+                    until_date=until_date,
+                )
+            )
+
+        for task_location in task_locations:
+            last_date = last_dates.get(
+                (task_location.task_id, task_location.location_id)
+            )
+            if last_date is not None and last_date >= until_date:
+                continue
+            occurrence_list.extend(
+                build_task_occurrences(
+                    task=tasks_by_id[task_location.task_id],
+                    timing_rule=task_location.timing_rule,
+                    start_time_input=task_location.start,
+                    end_time_input=task_location.end,
+                    OccurrenceModelClass=OccurrenceModelClass,
+                    from_date=get_from_date(last_date),
+                    until_date=until_date,
+                    location_id=task_location.location_id,
+                )
+            )
+
+        OccurrenceModelClass.objects.bulk_create(occurrence_list, batch_size=batch_size)
+        OccurrenceModelClass.update_task_occurrence_dates(
+            {occurrence.task_id for occurrence in occurrence_list}
+        )
+
+        task_total += len(task_chunk)
+        occurrence_total += len(occurrence_list)
+
+    return {
+        "tasks": task_total,
+        "occurrences": occurrence_total,
+        "seconds": perf_counter() - started,
+    }
+
+
+def prune_task_occurrences(keep_days, OccurrenceModelClass=TaskOccurrence):
+    """
+    Deletes the occurrences that ended more than keep_days days ago
+
+    Returns the number of occurrences deleted
+    """
+    cut_off = timezone.localdate() - timedelta(days=keep_days)
+    # pylint: disable=no-member
+    task_ids = list(
+        OccurrenceModelClass.objects.filter(date__lt=cut_off)
+        .order_by()
+        .values_list("task_id", flat=True)
+        .distinct()
+    )
+    deleted = bulk_delete_occurrences(
+        OccurrenceModelClass.objects.filter(date__lt=cut_off)
+    )
+    for task_id_chunk in chunked(task_ids, OCCURRENCE_TASK_CHUNK_SIZE):
+        OccurrenceModelClass.update_task_occurrence_dates(task_id_chunk)
+    return deleted
+
+
+def prune_tombstones(keep_days, TombstoneModelClass=Tombstone):
+    """
+    Deletes the tombstones that were recorded more than keep_days days ago
+
+    Returns the number of tombstones deleted
+    """
+    cut_off = timezone.now() - timedelta(days=keep_days)
+    # pylint: disable=no-member
+    deleted, _ = TombstoneModelClass.objects.filter(modified__lt=cut_off).delete()
+    return deleted
+
+
 def generate_tasklocation_occurrences(  # pylint: disable=bad-continuation
     task_location, OccurrenceModelClass=TaskOccurrence
 ):
@@ -199,17 +806,253 @@ def generate_tasklocation_occurrences(  # pylint: disable=bad-continuation
         - occurrences with the same start_time and end_time will not be
           created, they will be skipped silently
         - only works for valid rrules
+        - the occurrences are linked to the location of the TaskLocation
 
     Returns a Queryset of OccurrenceModel class objects
     """
-    return generate_task_occurrences(
+    occurrence_list = build_task_occurrences(
         task=task_location.task,
         timing_rule=task_location.timing_rule,
         start_time_input=task_location.start,
         end_time_input=task_location.end,
         OccurrenceModelClass=OccurrenceModelClass,
+        location_id=task_location.location_id,
+    )
+
+    if occurrence_list:
+        # pylint: disable=no-member
+        OccurrenceModelClass.objects.bulk_create(occurrence_list)
+        OccurrenceModelClass.update_task_occurrence_dates([task_location.task_id])
+
+    # return the task occurrences
+    # pylint: disable=no-member
+    return OccurrenceModelClass.objects.filter(task=task_location.task)
+
+
+# pylint: disable=invalid-name
+def bulk_generate_tasklocation_occurrences(  # pylint: disable=bad-continuation
+    tasks,
+    chunk_size=OCCURRENCE_TASK_CHUNK_SIZE,
+    batch_size=OCCURRENCE_BATCH_SIZE,
+    OccurrenceModelClass=TaskOccurrence,
+    TaskLocationModelClass=TaskLocation,
+):
+    """
+    Generates TaskOccurrence objects from all the TaskLocation objects of
+    many tasks in one pass
+
+    It works this way:
+        - tasks (an iterable or a queryset) are processed chunk_size at a time
+        - for each chunk, the TaskLocation objects of all the tasks are
+          fetched in one query
+        - existing occurrences that are linked to a location are fetched in
+          one query and compared by location and date with the new ones:
+          unchanged occurrences keep their ids and only the differences are
+          saved, in statements of at most batch_size rows each
+        - occurrences are built in the same way as
+          generate_tasklocation_occurrences, and are linked to the location of
+          the TaskLocation they come from
+        - in rolling horizon mode, occurrences before the start of the window
+          are left alone
+
+    Returns a dict with the number of tasks processed, the number of
+    occurrences the tasks now have in the window and the number of seconds it
+    took
+    """
+    from_date, until_date = get_occurrence_window()
+    started = perf_counter()
+    task_total = 0
+    occurrence_total = 0
+
+    if hasattr(tasks, "iterator"):
+        tasks = tasks.iterator(chunk_size=chunk_size)
+
+    for task_chunk in chunked(tasks, chunk_size):
+        tasks_by_id = {task.pk: task for task in task_chunk}
+
+        occurrence_list = []
+        # pylint: disable=no-member
+        task_locations = TaskLocationModelClass.objects.filter(
+            task_id__in=tasks_by_id.keys()
+        ).order_by("id")
+        for task_location in task_locations:
+            occurrence_list.extend(
+                build_task_occurrences(
+                    task=tasks_by_id[task_location.task_id],
+                    timing_rule=task_location.timing_rule,
+                    start_time_input=task_location.start,
+                    end_time_input=task_location.end,
+                    OccurrenceModelClass=OccurrenceModelClass,
+                    from_date=from_date,
+                    until_date=until_date,
+                    location_id=task_location.location_id,
+                )
+            )
+
+        existing = OccurrenceModelClass.objects.filter(
+            task_id__in=tasks_by_id.keys(), location__isnull=False
+        )
+        if from_date is not None:
+            existing = existing.filter(date__gte=from_date)
+
+        with transaction.atomic():
+            if save_occurrence_changes(
+                occurrence_list, existing, batch_size=batch_size
+            ):
+                OccurrenceModelClass.update_task_occurrence_dates(list(tasks_by_id))
+
+        task_total += len(task_chunk)
+        occurrence_total += len(occurrence_list)
+
+    return {
+        "tasks": task_total,
+        "occurrences": occurrence_total,
+        "seconds": perf_counter() - started,
+    }
+
+
+def expand_occurrences(tasks, task_locations, from_date, until_date, limit=None):
+    """
+    Expands the occurrences of tasks and task_locations that fall between
+    from_date and until_date (both inclusive) without saving them
+
+    This is used to get occurrences straight from the timing rules of tasks
+    and task locations, instead of reading stored occurrences.  The expanded
+    occurrences are linked to the location of the task location that they
+    come from.
+
+    If limit is given, expanding stops as soon as there are more than limit
+    occurrences, so that callers can tell that there are too many instead
+    of getting some of them.
+
+    Returns a list of unsaved TaskOccurrence objects ordered in the same
+    way as stored TaskOccurrence objects
+    """
+    sources = [
+        {"task": task, "timing_rule": task.timing_rule}
+        for task in tasks
+        if task.timing_rule
+    ] + [
+        {
+            "task": task_location.task,
+            "timing_rule": task_location.timing_rule,
+            "start_time_input": task_location.start,
+            "end_time_input": task_location.end,
+            "location_id": task_location.location_id,
+        }
+        for task_location in task_locations
+    ]
+
+    occurrence_list = []
+    for source in sources:
+        if limit is not None and len(occurrence_list) > limit:
+            break
+        occurrence_list.extend(
+            build_task_occurrences(
+                from_date=from_date,
+                until_date=until_date,
+                limit=None if limit is None else limit + 1 - len(occurrence_list),
+                **source,
+            )
+        )
+
+    occurrence_list.sort(
+        key=lambda item: (
+            item.task_id,
+            item.location_id is None,
+            item.location_id or 0,
+            item.date,
+            item.start_time,
+        )
     )
 
+    return occurrence_list
+
+
+# pylint: disable=invalid-name
+def reconcile_submission_counts(  # pylint: disable=bad-continuation
+    TaskModelClass=Task, SubmissionModelClass=Submission
+):
+    """
+    Fixes the submission_count of tasks that does not match the number of
+    submissions that they actually have
+
+    The submission_count is kept up to date when submissions are saved or
+    deleted one at a time, but not by bulk operations such as
+    QuerySet.update or QuerySet.delete.
+
+    Returns the number of tasks that were fixed
+    """
+    # pylint: disable=no-member
+    actual_count = Coalesce(
+        Subquery(
+            SubmissionModelClass.objects.filter(task_id=OuterRef("pk"))
+            .order_by()
+            .values("task_id")
+            .annotate(total=Count("id"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+    task_ids = list(
+        TaskModelClass.objects.annotate(actual_count=actual_count)
+        .exclude(submission_count=F("actual_count"))
+        .values_list("pk", flat=True)
+    )
+    for task_id_chunk in chunked(task_ids, OCCURRENCE_TASK_CHUNK_SIZE):
+        TaskModelClass.objects.filter(pk__in=task_id_chunk).update(
+            submission_count=actual_count, modified=timezone.now()
+        )
+    return len(task_ids)
+
+
+# pylint: disable=invalid-name
+def reconcile_occurrence_dates(  # pylint: disable=bad-continuation
+    TaskModelClass=Task, OccurrenceModelClass=TaskOccurrence
+):
+    """
+    Fixes the first_occurrence_date and last_occurrence_date of tasks that do
+    not match the occurrences that they actually have
+
+    The dates are kept up to date when occurrences are saved or deleted one
+    at a time and by the functions in this module that change occurrences in
+    bulk, but not by other bulk operations such as QuerySet.update or
+    QuerySet.delete.
+
+    Returns the number of tasks that were fixed
+    """
+    # pylint: disable=no-member
+    occurrences = (
+        OccurrenceModelClass.objects.filter(task_id=OuterRef("pk"))
+        .order_by()
+        .values("task_id")
+    )
+
+    def coalesce(expression):
+        """
+        Returns expression with NULL replaced by a date that can be compared
+        """
+        return Coalesce(expression, Value(date.min), output_field=DateField())
+
+    task_ids = list(
+        TaskModelClass.objects.annotate(
+            stored_first=coalesce(F("first_occurrence_date")),
+            stored_last=coalesce(F("last_occurrence_date")),
+            actual_first=coalesce(
+                Subquery(occurrences.annotate(first=Min("date")).values("first"))
+            ),
+            actual_last=coalesce(
+                Subquery(occurrences.annotate(last=Max("date")).values("last"))
+            ),
+        )
+        .filter(~Q(stored_first=F("actual_first")) | ~Q(stored_last=F("actual_last")))
+        .values_list("pk", flat=True)
+    )
+    for task_id_chunk in chunked(task_ids, OCCURRENCE_TASK_CHUNK_SIZE):
+        OccurrenceModelClass.update_task_occurrence_dates(task_id_chunk)
+    return len(task_ids)
+
 
 def get_rrule_start(rrule_obj):
     """
@@ -236,7 +1079,7 @@ def get_rrule_end(rrule_obj):
         end = until
     elif count is not None:
         # if count is set instead we use the last ocurrence
-        end = rrule_obj[-1]  # might be slow if many occurrences
+        end = get_rrule_last_occurrence(rrule_obj)
         # we must strip the time because we should only infer the date
         # when using count, we set it to the very end of the day
         end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
@@ -252,9 +1095,15 @@ def get_rrule_end(rrule_obj):
 def get_target(app_label, target_type):
     """
     Returns the target_type
+
+    Allowed content types come from the process-wide cache; others from the
+    cache of the ContentType manager.
     """
+    content_type = allowed_contenttypes.get_by_natural_key(app_label, target_type)
+    if content_type is not None:
+        return content_type
     try:
-        return ContentType.objects.get(app_label=app_label, model=target_type)
+        return ContentType.objects.get_by_natural_key(app_label, target_type)
     except ContentType.DoesNotExist:  # pylint: disable=no-member
         raise TargetDoesNotExist()
 
@@ -295,6 +1144,60 @@ def get_shapefile(geofile):
     return needed_files["shp"]
 
 
+def get_shapefile_geoms(geofile, shpfile):
+    """
+    Returns the geometries in the first layer of the shapefile named shpfile
+    in the zip file geofile
+
+    Raises GDALException if the shapefile cannot be read.
+    """
+    return read_shapefile(geofile, shpfile, lambda layer: layer.get_geoms())
+
+
+def read_shapefile(geofile, shpfile, reader):
+    """
+    Returns what reader returns when called with the first layer of the
+    shapefile named shpfile in the zip file geofile
+
+    The zip file is read in place through GDAL's /vsizip/ file system
+    instead of being extracted.  geofile can be the path of a zip file, or a
+    file-like object, which is handed to GDAL as a /vsimem/ file so that
+    nothing is written to disk.  reader must not keep references to the
+    layer or its features, which are closed when it returns.
+
+    Raises GDALException if the shapefile cannot be read.
+    """
+    if isinstance(geofile, str):
+        return _read_layer(f"/vsizip/{geofile}/{shpfile}", reader)
+
+    geofile.seek(0)
+    data = geofile.read()
+    # GDAL reads the zip straight from the memory of data, which it does not
+    # take ownership of and only reads from; data stays referenced until the
+    # /vsimem/ file is unlinked below
+    vsi_path = f"/vsimem/tasking-{uuid4().hex}.zip"
+    close_vsi_file(create_vsi_file(force_bytes(vsi_path), data, len(data), False))
+    try:
+        return _read_layer(f"/vsizip/{vsi_path}/{shpfile}", reader)
+    finally:
+        unlink_vsi_file(force_bytes(vsi_path))
+
+
+def _read_layer(ds_path, reader):
+    """
+    Returns what reader returns when called with the first layer of the data
+    source at ds_path
+
+    The data source is closed before this returns, so that the file it was
+    read from can be removed.
+    """
+    data_source = DataSource(ds_path)
+    try:
+        return reader(data_source[0])
+    finally:
+        del data_source
+
+
 def get_polygons(geom_object_list):
     """
     Takes a geom object list and returns polygons, runs recursively
@@ -1,7 +1,7 @@
 """
 Tasking validators
 """
-from dateutil.rrule import rrulestr
+from tasking.rrules import get_rrule
 
 
 def validate_rrule(rule_string):
@@ -9,7 +9,7 @@ def validate_rrule(rule_string):
     Validates an rrule string; returns True or False
     """
     try:
-        rrulestr(rule_string)
+        get_rrule(rule_string)
     except ValueError:
         # this string is not a valid rrule
         return False
@@ -2,10 +2,12 @@
 Tasking Viewsets init module
 """
 from tasking.viewsets.contenttype import ContentTypeViewSet  # noqa
+from tasking.viewsets.jobs import JobViewSet  # noqa
 from tasking.viewsets.locations import LocationViewSet  # noqa
 from tasking.viewsets.locationtype import LocationTypeViewSet  # noqa
 from tasking.viewsets.occurrences import TaskOccurrenceViewSet  # noqa
 from tasking.viewsets.projects import ProjectViewSet  # noqa
 from tasking.viewsets.segment_rules import SegmentRuleViewSet  # noqa
 from tasking.viewsets.submissions import SubmissionViewSet  # noqa
+from tasking.viewsets.sync import SyncViewSet  # noqa
 from tasking.viewsets.tasks import TaskViewSet  # noqa
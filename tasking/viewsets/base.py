@@ -0,0 +1,66 @@
+"""
+Base classes for tasking viewsets
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalListMixin:
+    """
+    Mixin that answers conditional GET requests for lists
+
+    The ETag and Last-Modified headers of a list are worked out from one
+    aggregate query over the filtered queryset: the latest modified time
+    and the number of rows.  Clients that send the ETag back in
+    If-None-Match get a 304 Not Modified response, without the list being
+    serialized, as long as nothing in it has changed.
+
+    Last-Modified is only informational: deleting a row can leave the latest
+    modified time as it was, so If-Modified-Since is not answered with 304.
+
+    conditional_aggregates adds aggregates of values that can change
+    without the modified time of their rows changing.
+    """
+
+    conditional_aggregates = {}
+
+    def get_list_validators(self, request, queryset):
+        """
+        Returns the ETag and the Last-Modified timestamp of the list of
+        queryset
+        """
+        values = queryset.order_by().aggregate(
+            _last_modified=Max("modified"),
+            _count=Count("pk"),
+            **self.conditional_aggregates,
+        )
+        # the same rows look different for other query parameters and
+        # renderers
+        key = [request.get_full_path(), request.accepted_renderer.format]
+        key.extend(str(values[name]) for name in sorted(values))
+        etag = quote_etag(hashlib.md5("|".join(key).encode("utf-8")).hexdigest())
+
+        last_modified = values["_last_modified"]
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        """
+        List objects, or answer with 304 Not Modified if the client has the
+        current list
+        """
+        etag, last_modified = self.get_list_validators(
+            request, self.filter_queryset(self.get_queryset())
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super(ConditionalListMixin, self).list(request, *args, **kwargs)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
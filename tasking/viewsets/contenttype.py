@@ -1,17 +1,23 @@
 """
 ContentType viewsets
 """
+from django.http import Http404
+
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from tasking.serializers import ContentTypeSerializer
-from tasking.utils import get_allowed_contenttypes
+from tasking.utils import allowed_contenttypes, get_allowed_contenttypes
 
 
 # pylint: disable=too-many-ancestors
 class ContentTypeViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Read Only Viewset for ContentType
+
+    Content types are read from the process-wide cache of allowed content
+    types rather than the database.
     """
 
     serializer_class = ContentTypeSerializer
@@ -21,3 +27,23 @@ class ContentTypeViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         queryset = super(ContentTypeViewSet, self).get_queryset()
         return queryset.order_by("app_label", "model")
+
+    def get_object(self):
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise Http404
+        content_type = allowed_contenttypes.get_for_id(pk)
+        if content_type is None:
+            raise Http404
+        self.check_object_permissions(self.request, content_type)
+        return content_type
+
+    def list(self, request, *args, **kwargs):
+        content_types = allowed_contenttypes.all()
+        page = self.paginate_queryset(content_types)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(content_types, many=True)
+        return Response(serializer.data)
@@ -0,0 +1,31 @@
+"""
+Job viewsets
+"""
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from tasking.models import Job
+from tasking.serializers import JobSerializer
+
+
+# pylint: disable=too-many-ancestors
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Viewset for background jobs
+
+    Clients can use this to find out when work that runs in the background,
+    such as generating the occurrences of a task, is done.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+    filterset_fields = [
+        "job_type",
+        "status",
+        "target_content_type",
+        "target_object_id",
+    ]
+    ordering_fields = ["created", "modified", "status"]
+    queryset = Job.objects.all()  # pylint: disable=no-member
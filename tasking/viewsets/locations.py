@@ -1,16 +1,61 @@
 """
 Location viewsets
 """
+import logging
+from zipfile import BadZipFile
+
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Envelope
+from django.contrib.gis.gdal import GDALException
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from tasking.common_tags import (
+    GEODETAILS_ONLY,
+    INVALID_GEOMETRY_OPTION,
+    INVALID_SHAPEFILE,
+)
+from tasking.exceptions import (
+    LocationImportError,
+    MissingFiles,
+    ShapeFileNotFound,
+    UnnecessaryFiles,
+)
+from tasking.importers import import_locations
+from tasking.jobs import LOCATION_SHAPEFILE_JOB, enqueue_job
 from tasking.models import Location
-from tasking.serializers import LocationSerializer
+from tasking.renderers import MVTRenderer
+from tasking.serializers import (
+    JobSerializer,
+    LocationImportSerializer,
+    LocationSerializer,
+    LocationShapefileSerializer,
+)
+from tasking.serializers.location import (
+    BBOX_GEOMETRY,
+    FULL_GEOMETRY,
+    GEOMETRY_OPTIONS,
+    NO_GEOMETRY,
+)
+from tasking.tiles import render_location_tile
+from tasking.viewsets.base import ConditionalListMixin
+
+LOGGER = logging.getLogger(__name__)
 
 
 # pylint: disable=too-many-ancestors
 class LocationViewSet(  # pylint: disable=bad-continuation
+    ConditionalListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -33,3 +78,151 @@ class LocationViewSet(  # pylint: disable=bad-continuation
     search_fields = ["name"]
     ordering_fields = ["name", "created"]
     queryset = Location.objects.all()
+
+    def get_geometry(self):
+        """
+        Returns how the shapefile of locations is represented, as chosen by
+        the geometry query parameter of GET requests
+        """
+        if getattr(self.request, "method", None) != "GET":
+            return FULL_GEOMETRY
+        geometry = self.request.query_params.get("geometry", FULL_GEOMETRY)
+        if geometry not in GEOMETRY_OPTIONS:
+            raise ValidationError(
+                {
+                    "geometry": INVALID_GEOMETRY_OPTION.format(
+                        options=", ".join(GEOMETRY_OPTIONS)
+                    )
+                }
+            )
+        return geometry
+
+    def get_queryset(self):
+        """
+        Only read the geometry that is represented
+        """
+        geometry = self.get_geometry()
+        deferred = list(Location.SIMPLIFIED_SHAPEFILE_FIELDS.values())
+        queryset = super(LocationViewSet, self).get_queryset()
+        if geometry in Location.SIMPLIFIED_SHAPEFILE_FIELDS:
+            deferred.remove(Location.SIMPLIFIED_SHAPEFILE_FIELDS[geometry])
+            deferred.append("shapefile")
+        elif geometry == BBOX_GEOMETRY:
+            deferred.append("shapefile")
+            queryset = queryset.annotate(shapefile_bbox=Envelope("shapefile"))
+        elif geometry == NO_GEOMETRY:
+            deferred.append("shapefile")
+        return queryset.defer(*deferred)
+
+    def get_serializer_context(self):
+        context = super(LocationViewSet, self).get_serializer_context()
+        context["geometry"] = self.get_geometry()
+        return context
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_shapefile(self, request):
+        """
+        Create a location for each feature of an uploaded, zipped shapefile
+
+        See tasking.importers.import_locations for how the attributes of the
+        features are mapped to locations.
+        """
+        serializer = LocationImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        upload = options.pop("shapefile")
+        # uploads that are large enough are written to a temporary file by
+        # Django, others are kept in memory
+        try:
+            geofile = upload.temporary_file_path()
+        except AttributeError:
+            geofile = upload
+
+        try:
+            result = import_locations(geofile, **options)
+        except LocationImportError as exc:
+            raise ValidationError({"shapefile": exc.message})
+        except (ShapeFileNotFound, MissingFiles, UnnecessaryFiles) as exc:
+            # pylint: disable=no-member
+            raise ValidationError({"shapefile": exc.message})
+        except (BadZipFile, GDALException) as exc:
+            LOGGER.exception(exc)
+            raise ValidationError({"shapefile": INVALID_SHAPEFILE})
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="shapefile",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def upload_shapefile(self, request, pk=None):
+        """
+        Store a zipped shapefile for the location and set the location's
+        shapefile from it in a background job
+
+        Returns the job, whose progress can be followed using the jobs API.
+        When the job backend runs jobs straight away, errors in the shapefile
+        are returned as validation errors instead.
+        """
+        location = self.get_object()
+        if location.geopoint is not None or location.radius is not None:
+            raise ValidationError({"shapefile": GEODETAILS_ONLY})
+
+        serializer = LocationShapefileSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = enqueue_job(
+                LOCATION_SHAPEFILE_JOB,
+                location,
+                input_file=serializer.validated_data["shapefile"],
+            )
+        except (ShapeFileNotFound, MissingFiles, UnnecessaryFiles) as exc:
+            # pylint: disable=no-member
+            raise ValidationError({"shapefile": exc.message})
+        except ValueError as exc:
+            raise ValidationError({"shapefile": str(exc)})
+        except (BadZipFile, GDALException) as exc:
+            LOGGER.exception(exc)
+            raise ValidationError({"shapefile": INVALID_SHAPEFILE})
+        job.refresh_from_db()
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"tiles/(?P<z>[0-9]+)/(?P<x>[0-9]+)/(?P<y>[0-9]+)\.mvt",
+        renderer_classes=[MVTRenderer],
+    )
+    def tiles(self, request, z, x, y):  # pylint: disable=invalid-name
+        """
+        Return a Mapbox vector tile of the locations that match the filters
+        of the request
+
+        Tiles are built by PostGIS and cached in TASKING_TILE_CACHE under
+        the ETag of the request, which changes whenever the locations do.
+        """
+        zoom, x, y = int(z), int(x), int(y)
+        if zoom > settings.TASKING_TILE_MAX_ZOOM or x >= 2**zoom or y >= 2**zoom:
+            raise NotFound()
+
+        queryset = self.filter_queryset(super(LocationViewSet, self).get_queryset())
+        etag, last_modified = self.get_list_validators(request, queryset)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cache = caches[settings.TASKING_TILE_CACHE]
+            key = "tasking-location-tile-" + etag.strip('"')
+            tile = cache.get(key)
+            if tile is None:
+                tile = render_location_tile(queryset, zoom, x, y)
+                cache.set(key, tile, settings.TASKING_TILE_CACHE_TIMEOUT)
+            response = HttpResponse(tile, content_type=MVTRenderer.media_type)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -1,19 +1,41 @@
 """
 TaskOccurrence viewsets
 """
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from tasking.common_tags import (
+    INVALID_ID,
+    VIRTUAL_OCCURRENCES_MAX_DAYS,
+    VIRTUAL_OCCURRENCES_TOO_MANY,
+    VIRTUAL_OCCURRENCES_WINDOW,
+)
 from tasking.filters import TaskOccurrenceFilterSet
-from tasking.models import TaskOccurrence
+from tasking.models import Task, TaskLocation, TaskOccurrence
+from tasking.pagination import TaskOccurrencePagination
 from tasking.serializers import TaskOccurrenceSerializer
+from tasking.utils import expand_occurrences, get_occurrence_window
+from tasking.viewsets.base import ConditionalListMixin
 
 
 # pylint: disable=too-many-ancestors
-class TaskOccurrenceViewSet(viewsets.ReadOnlyModelViewSet):
+class TaskOccurrenceViewSet(ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Viewset for occurrence
+
+    Passing virtual=true when listing occurrences expands them on the fly
+    from the timing rules of tasks and task locations, for the window given
+    by date__gte and date__lte, instead of reading stored occurrences.
+
+    Stored occurrences are returned a page at a time when a cursor or
+    page_size is given.
     """
 
     serializer_class = TaskOccurrenceSerializer
@@ -22,3 +44,87 @@ class TaskOccurrenceViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = TaskOccurrenceFilterSet
     ordering_fields = ["created", "date", "start_time", "end_time"]
     queryset = TaskOccurrence.objects.all()  # pylint: disable=no-member
+    pagination_class = TaskOccurrencePagination
+
+    def list(self, request, *args, **kwargs):
+        """
+        List occurrences, expanding them on the fly if asked to
+        """
+        if request.query_params.get("virtual", "").lower() in ("true", "1"):
+            return self.list_virtual(request)
+        return super(TaskOccurrenceViewSet, self).list(request, *args, **kwargs)
+
+    def list_virtual(self, request):
+        """
+        List occurrences expanded on the fly from timing rules
+        """
+        try:
+            from_date = parse_date(request.query_params.get("date__gte", ""))
+            until_date = parse_date(request.query_params.get("date__lte", ""))
+        except ValueError:
+            # well formatted but not a real date e.g. 2020-02-30
+            raise ValidationError({"date": VIRTUAL_OCCURRENCES_WINDOW})
+        if from_date is None or until_date is None or from_date > until_date:
+            raise ValidationError({"date": VIRTUAL_OCCURRENCES_WINDOW})
+
+        max_days = settings.TASKING_VIRTUAL_OCCURRENCES_MAX_DAYS
+        if (until_date - from_date).days >= max_days:
+            raise ValidationError(
+                {"date": VIRTUAL_OCCURRENCES_MAX_DAYS.format(days=max_days)}
+            )
+
+        active = Q(end__isnull=True) | Q(end__date__gte=from_date)
+        # pylint: disable=no-member
+        tasks = Task.objects.filter(active).exclude(timing_rule__isnull=True)
+        task_locations = TaskLocation.objects.select_related("task").filter(
+            Q(task__end__isnull=True) | Q(task__end__date__gte=from_date)
+        )
+
+        # every occurrence of a task from its first stored one onwards is
+        # stored, except before the start of the rolling horizon, so tasks
+        # whose first stored occurrence is after the window have none in it
+        horizon_start, _ = get_occurrence_window()
+        if horizon_start is None or until_date >= horizon_start:
+            tasks = tasks.exclude(first_occurrence_date__gt=until_date)
+            task_locations = task_locations.exclude(
+                task__first_occurrence_date__gt=until_date
+            )
+
+        task_id = self._get_id_param(request, "task")
+        if task_id is not None:
+            tasks = tasks.filter(pk=task_id)
+            task_locations = task_locations.filter(task_id=task_id)
+
+        location_id = self._get_id_param(request, "location")
+        if location_id is not None:
+            # occurrences expanded from task timing rules have no location
+            tasks = tasks.none()
+            task_locations = task_locations.filter(location_id=location_id)
+
+        max_results = settings.TASKING_VIRTUAL_OCCURRENCES_MAX_RESULTS
+        occurrences = expand_occurrences(
+            tasks=tasks,
+            task_locations=task_locations,
+            from_date=from_date,
+            until_date=until_date,
+            limit=max_results,
+        )
+        if len(occurrences) > max_results:
+            raise ValidationError(
+                {"date": VIRTUAL_OCCURRENCES_TOO_MANY.format(limit=max_results)}
+            )
+        serializer = self.get_serializer(occurrences, many=True)
+        return Response(serializer.data)
+
+    @staticmethod
+    def _get_id_param(request, name):
+        """
+        Returns the integer value of the query parameter called name
+        """
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: INVALID_ID})
@@ -1,12 +1,43 @@
 """
 Submission viewsets
 """
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from tasking.common_tags import BULK_LIST_REQUIRED, INVALID_EXPORT_FORMAT
+from tasking.exports import EXPORT_FORMATS, export_queryset
 from tasking.models import Submission
+from tasking.pagination import SubmissionPagination
+from tasking.parsers import NDJSONParser
 from tasking.serializers import SubmissionSerializer
+from tasking.utils import chunked
+
+# the columns of submission exports, named as they are in SubmissionSerializer
+SUBMISSION_EXPORT_FIELDS = [
+    ("id", "id"),
+    ("modified", "modified"),
+    ("created", "created"),
+    ("task", "task_id"),
+    ("location", "location_id"),
+    ("user", "user_id"),
+    ("submission_time", "submission_time"),
+    ("valid", "valid"),
+    ("status", "status"),
+    ("comments", "comments"),
+    ("target_content_type", "target_content_type_id"),
+    ("target_id", "target_object_id"),
+    ("idempotency_key", "idempotency_key"),
+]
 
 
 # pylint: disable=too-many-ancestors
@@ -33,3 +64,187 @@ class SubmissionViewSet(  # pylint: disable=bad-continuation
     search_fields = ["task__name"]
     ordering_fields = ["created", "valid", "status", "submission_time", "task__id"]
     queryset = Submission.objects.all()  # pylint: disable=no-member
+    pagination_class = SubmissionPagination
+
+    def get_existing_submission(self, request):
+        """
+        Returns the submission that has the idempotency key sent in the
+        request, if any
+        """
+        try:
+            key = request.data.get("idempotency_key")
+        except AttributeError:
+            return None
+        if not key:
+            return None
+        # pylint: disable=no-member
+        return Submission.objects.filter(idempotency_key=key).first()
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create a submission
+
+        If a submission with the same idempotency key exists, it is returned
+        instead of creating another one.
+        """
+        existing = self.get_existing_submission(request)
+        if existing is None:
+            try:
+                with transaction.atomic():
+                    return super(SubmissionViewSet, self).create(
+                        request, *args, **kwargs
+                    )
+            except IntegrityError:
+                # the same submission was created by a concurrent request
+                existing = self.get_existing_submission(request)
+                if existing is None:
+                    raise
+
+        serializer = self.get_serializer(existing)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        """
+        Create many submissions from a JSON array or an NDJSON stream
+
+        The submissions are validated and saved TASKING_SUBMISSION_BULK_BATCH_SIZE
+        at a time.  The related objects of each batch are looked up in a few
+        queries and the valid submissions are saved using bulk_create.
+
+        Returns the id, or the errors, of each submission in the order that
+        they were sent.  Submissions whose idempotency key has already been
+        used are not created again; the id of the existing submission is
+        returned instead.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError({"non_field_errors": [BULK_LIST_REQUIRED]})
+
+        results = []
+        for batch in chunked(rows, settings.TASKING_SUBMISSION_BULK_BATCH_SIZE):
+            results.extend(self.create_batch(batch, offset=len(results)))
+
+        failed = sum(1 for result in results if "errors" in result)
+        existing = sum(1 for result in results if result.get("existing"))
+        return Response(
+            {
+                "created": len(results) - failed - existing,
+                "existing": existing,
+                "failed": failed,
+                "results": results,
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream the submissions that match the filters of the request as
+        NDJSON, or as CSV if export_format is csv
+
+        Rows are read as plain values rather than model instances and
+        written out as they are read.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {
+                    "export_format": INVALID_EXPORT_FORMAT.format(
+                        formats=", ".join(sorted(EXPORT_FORMATS))
+                    )
+                }
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.query.order_by:
+            # the default ordering joins on tasks; this one uses an index
+            queryset = queryset.order_by("submission_time", "id")
+        return export_queryset(
+            queryset, SUBMISSION_EXPORT_FIELDS, export_format, "submissions"
+        )
+
+    def create_batch(self, batch, offset):
+        """
+        Validate and save a batch of submissions
+
+        Returns the result of each submission
+        """
+        # the serializers share their context, and so the cached lookups
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        serializer_class(data=batch, many=True, context=context).prefetch(batch)
+
+        valid_rows = []
+        results = {}
+        for index, row in enumerate(batch, start=offset):
+            serializer = serializer_class(data=row, context=context)
+            if serializer.is_valid():
+                valid_rows.append((index, serializer.validated_data))
+            else:
+                results[index] = {"index": index, "errors": serializer.errors}
+
+        try:
+            results.update(self.save_batch(valid_rows))
+        except IntegrityError:
+            # some idempotency keys were saved by a concurrent request
+            results.update(self.save_batch(valid_rows))
+
+        return [results[index] for index in sorted(results)]
+
+    def save_batch(self, rows):
+        """
+        Save a batch of validated submissions using bulk_create
+
+        rows is a list of (index, validated data) tuples.  Submissions whose
+        idempotency key has already been used are not saved again; the id of
+        the existing submission is returned instead.
+
+        Returns a dict of the result of each submission keyed by index
+        """
+        keys = {
+            data["idempotency_key"] for _, data in rows if data.get("idempotency_key")
+        }
+        # pylint: disable=no-member
+        existing = dict(
+            Submission.objects.filter(idempotency_key__in=keys).values_list(
+                "idempotency_key", "id"
+            )
+        )
+
+        results = {}
+        submissions = {}
+        repeated = []
+        for index, data in rows:
+            key = data.get("idempotency_key")
+            if key in existing:
+                results[index] = {"index": index, "id": existing[key], "existing": True}
+            elif key and key in submissions:
+                # sent more than once in the same batch
+                repeated.append((index, key))
+            else:
+                submissions[key or index] = (index, Submission(**data))
+
+        with transaction.atomic():
+            Submission.objects.bulk_create(
+                [submission for _, submission in submissions.values()]
+            )
+            task_counts = Counter(
+                submission.task_id for _, submission in submissions.values()
+            )
+            for task_id, count in task_counts.items():
+                Submission.change_submission_count(task_id, count)
+
+        for index, submission in submissions.values():
+            results[index] = {"index": index, "id": submission.pk}
+        for index, key in repeated:
+            results[index] = {
+                "index": index,
+                "id": submissions[key][1].pk,
+                "existing": True,
+            }
+        return results
@@ -0,0 +1,146 @@
+"""
+Sync viewsets
+"""
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from tasking.common_tags import EXPIRED_WATERMARK, INVALID_WATERMARK
+from tasking.models import (
+    Location,
+    Project,
+    Task,
+    TaskLocation,
+    TaskOccurrence,
+    Tombstone,
+)
+from tasking.pagination import SyncPagination
+from tasking.serializers import (
+    LocationSerializer,
+    ProjectSerializer,
+    TaskLocationSyncSerializer,
+    TaskOccurrenceSerializer,
+    TaskSerializer,
+)
+
+# the name, queryset and serializer class of each kind of object that is
+# synced.  Querysets prefetch what their serializers read, as in the
+# viewsets of each model.
+# pylint: disable=no-member
+SYNC_SECTIONS = [
+    ("projects", Project.objects.prefetch_related("tasks"), ProjectSerializer),
+    (
+        "locations",
+        Location.objects.defer(*Location.SIMPLIFIED_SHAPEFILE_FIELDS.values()),
+        LocationSerializer,
+    ),
+    (
+        "tasks",
+        Task.with_submission_count.prefetch_related(
+            "tasklocation_set", "segment_rules", "locations"
+        ),
+        TaskSerializer,
+    ),
+    ("task_locations", TaskLocation.objects.all(), TaskLocationSyncSerializer),
+    ("occurrences", TaskOccurrence.objects.all(), TaskOccurrenceSerializer),
+]
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    Viewset for syncing offline clients
+
+    Returns the objects that have been modified, and the ids of those that
+    have been deleted, since the watermark that the client sent, along with
+    the watermark to send next time.  Each list is paged by (modified, id)
+    and the next link has to be followed until it is null.
+    """
+
+    permission_classes = [IsAuthenticated]
+    pagination_class = SyncPagination
+
+    def list(self, request):
+        """
+        List the changes since the watermark in the since query parameter,
+        or everything if there is none
+        """
+        since = self.get_since(request)
+        # rows saved by transactions that have not committed yet can have
+        # modified times before now, so the next sync starts a little earlier
+        watermark = timezone.now() - timedelta(
+            seconds=settings.TASKING_SYNC_WATERMARK_OVERLAP
+        )
+        context = {"request": request, "view": self}
+
+        lists = []
+        for name, queryset, _serializer_class in SYNC_SECTIONS:
+            changed = queryset.all()
+            if since is not None:
+                changed = changed.filter(modified__gte=since)
+                deleted = Tombstone.objects.filter(
+                    target_content_type=ContentType.objects.get_for_model(
+                        queryset.model
+                    ),
+                    modified__gte=since,
+                )
+                lists.append((f"{name}.deleted", deleted))
+            lists.append((f"{name}.changed", changed))
+
+        paginator = self.pagination_class()
+        watermark, pages = paginator.paginate_lists(lists, request, watermark)
+
+        data = OrderedDict(
+            [
+                ("watermark", watermark.isoformat().replace("+00:00", "Z")),
+                ("next", paginator.get_next_link()),
+            ]
+        )
+        for name, _queryset, serializer_class in SYNC_SECTIONS:
+            changed = pages[f"{name}.changed"]
+            deleted = pages.get(f"{name}.deleted", [])
+            data[name] = OrderedDict(
+                [
+                    (
+                        "changed",
+                        serializer_class(changed, many=True, context=context).data,
+                    ),
+                    ("deleted", [item.target_object_id for item in deleted]),
+                ]
+            )
+
+        return Response(data)
+
+    @staticmethod
+    def get_since(request):
+        """
+        Returns the watermark in the since query parameter, if any
+        """
+        value = request.query_params.get("since")
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({"since": INVALID_WATERMARK})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        retention_days = settings.TASKING_TOMBSTONE_RETENTION_DAYS
+        if (  # pylint: disable=bad-continuation
+            retention_days is not None
+            and since < timezone.now() - timedelta(days=retention_days)
+        ):
+            raise ValidationError(
+                {"since": EXPIRED_WATERMARK.format(days=retention_days)}
+            )
+        return since
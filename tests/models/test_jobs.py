@@ -0,0 +1,19 @@
+"""
+Test for Job models
+"""
+from django.test import TestCase
+
+from model_mommy import mommy
+
+
+class TestJob(TestCase):
+    """
+    Test class for Job models
+    """
+
+    def test_job_model_str(self):
+        """
+        Test the str method on Job model
+        """
+        job = mommy.make("tasking.Job", job_type="task_occurrences")
+        self.assertEqual(f"task_occurrences {job.pk} - Pending", job.__str__())
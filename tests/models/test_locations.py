@@ -1,10 +1,29 @@
 """
 Test for Location model
 """
+import math
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
 from django.test import TestCase
 
 from model_mommy import mommy
 
+from tasking.models import Location
+
+
+def make_circle(points):
+    """
+    Returns a MultiPolygon of a circle with points points
+    """
+    coords = [
+        (
+            36.8 + 0.1 * math.cos(2 * math.pi * i / points),
+            -1.3 + 0.1 * math.sin(2 * math.pi * i / points),
+        )
+        for i in range(points)
+    ]
+    return MultiPolygon(Polygon(coords + coords[:1]), srid=4326)
+
 
 class TestLocations(TestCase):
     """
@@ -34,3 +53,37 @@ class TestLocations(TestCase):
         nairobi = mommy.make("tasking.Location", name="Nairobi")
         hurlingham = mommy.make("tasking.Location", name="Hurlingham", parent=nairobi)
         self.assertEqual(nairobi, hurlingham.parent)
+
+    def test_location_simplified_shapefiles(self):
+        """
+        Test that the simplified shapefiles are refreshed when the shapefile
+        is saved
+        """
+        nairobi = mommy.make(
+            "tasking.Location", name="Nairobi", shapefile=make_circle(5000)
+        )
+        nairobi = Location.objects.get(pk=nairobi.pk)
+
+        sizes = [
+            nairobi.shapefile.num_coords,
+            nairobi.shapefile_fine.num_coords,
+            nairobi.shapefile_medium.num_coords,
+            nairobi.shapefile_coarse.num_coords,
+        ]
+        self.assertEqual(sorted(sizes, reverse=True), sizes)
+        self.assertLess(sizes[3], sizes[0] / 10)
+        self.assertTrue(nairobi.shapefile_coarse.valid)
+        self.assertEqual(4326, nairobi.shapefile_coarse.srid)
+
+        # only saving the shapefile refreshes them
+        nairobi.shapefile = make_circle(50)
+        nairobi.save(update_fields=["name"])
+        nairobi.refresh_from_db()
+        self.assertEqual(sizes[1], nairobi.shapefile_fine.num_coords)
+
+        nairobi.shapefile = None
+        nairobi.save(update_fields=["shapefile"])
+        nairobi.refresh_from_db()
+        self.assertIsNone(nairobi.shapefile_fine)
+        self.assertIsNone(nairobi.shapefile_medium)
+        self.assertIsNone(nairobi.shapefile_coarse)
@@ -54,3 +54,31 @@ class TestOccurrence(TestCase):
         )
         expected = "22nd May 2018, 7 a.m. to 2:30 p.m."
         self.assertEqual(expected, item.get_timestring())
+
+    def test_task_occurrence_dates(self):
+        """
+        Test that saving and deleting occurrences keeps the first and last
+        occurrence dates of the task up to date
+        """
+        task = mommy.make("tasking.Task")
+        first = mommy.make(
+            "tasking.TaskOccurrence", task=task, date=datetime.date(2018, 5, 24)
+        )
+        last = mommy.make(
+            "tasking.TaskOccurrence", task=task, date=datetime.date(2018, 6, 2)
+        )
+        task.refresh_from_db()
+        self.assertEqual(datetime.date(2018, 5, 24), task.first_occurrence_date)
+        self.assertEqual(datetime.date(2018, 6, 2), task.last_occurrence_date)
+
+        # the task is marked as modified so that it is synced
+        modified = task.modified
+        last.delete()
+        task.refresh_from_db()
+        self.assertEqual(datetime.date(2018, 5, 24), task.last_occurrence_date)
+        self.assertTrue(task.modified > modified)
+
+        first.delete()
+        task.refresh_from_db()
+        self.assertIsNone(task.first_occurrence_date)
+        self.assertIsNone(task.last_occurrence_date)
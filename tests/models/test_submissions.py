@@ -23,3 +23,59 @@ class TestSubmission(TestCase):
         )
         expected = f"Cattle Price - {submission.task.id}" f" submission {submission.id}"
         self.assertEqual(expected, str(submission))
+
+    def test_submission_count(self):
+        """
+        Test that the submission_count of tasks is kept up to date
+        """
+        cattle = mommy.make("tasking.Task", name="Cattle Price")
+        goats = mommy.make("tasking.Task", name="Goat Price")
+        submission = mommy.make("tasking.Submission", task=cattle)
+        mommy.make("tasking.Submission", task=cattle)
+        cattle.refresh_from_db()
+        self.assertEqual(2, cattle.submission_count)
+
+        # saving without changing the task leaves the count alone
+        submission.refresh_from_db()
+        submission.comments = "Changed"
+        submission.save()
+        cattle.refresh_from_db()
+        self.assertEqual(2, cattle.submission_count)
+
+        # moving the submission to another task
+        submission.task = goats
+        submission.save()
+        cattle.refresh_from_db()
+        goats.refresh_from_db()
+        self.assertEqual(1, cattle.submission_count)
+        self.assertEqual(1, goats.submission_count)
+
+        submission.delete()
+        goats.refresh_from_db()
+        self.assertEqual(0, goats.submission_count)
+
+    def test_submission_count_task_save(self):
+        """
+        Test that saving a task does not overwrite its submission_count
+        """
+        cattle = mommy.make("tasking.Task", name="Cattle Price")
+        mommy.make("tasking.Submission", task=cattle)
+        self.assertEqual(0, cattle.submission_count)
+
+        cattle.name = "Cattle Prices"
+        cattle.save()
+        cattle.refresh_from_db()
+        self.assertEqual(1, cattle.submission_count)
+        self.assertEqual("Cattle Prices", cattle.name)
+
+    def test_submission_count_task_modified(self):
+        """
+        Test that changing the submission_count of a task marks it as
+        modified
+        """
+        cattle = mommy.make("tasking.Task", name="Cattle Price")
+        modified = cattle.modified
+        mommy.make("tasking.Submission", task=cattle)
+        cattle.refresh_from_db()
+        self.assertEqual(1, cattle.submission_count)
+        self.assertTrue(cattle.modified > modified)
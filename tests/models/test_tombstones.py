@@ -0,0 +1,26 @@
+"""
+Test for Tombstone models
+"""
+from django.test import TestCase
+
+from model_mommy import mommy
+
+from tasking.models import Task
+
+
+class TestTombstone(TestCase):
+    """
+    Test class for Tombstone models
+    """
+
+    def test_tombstone_model_str(self):
+        """
+        Test the str method on Tombstone model
+        """
+        tombstone = mommy.make(
+            "tasking.Tombstone", target_content_object=mommy.make("tasking.Task")
+        )
+        # pylint: disable=no-member
+        Task.objects.all().delete()
+        tombstone.refresh_from_db()
+        self.assertEqual(f"task {tombstone.target_object_id}", tombstone.__str__())
@@ -3,10 +3,14 @@ Test for Project Serializers
 """
 from collections import OrderedDict
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from model_mommy import mommy
 from tests.base import TestBase
 
 from tasking.serializers import ProjectSerializer
+from tasking.serializers.base import TARGET_CACHE_KEY
 
 
 class TestProjectSerializer(TestBase):
@@ -79,3 +83,60 @@ class TestProjectSerializer(TestBase):
         self.assertEqual(
             set(expected_fields), set(list(serializer_instance.data.keys()))
         )
+
+    def test_validate_many_targets(self):
+        """
+        Test that the targets of many projects are checked with one query per
+        content type
+        """
+        tasks = mommy.make("tasking.Task", _quantity=3)
+        user = mommy.make("auth.User")
+        data = [
+            {
+                "name": f"Project {task.id}",
+                "target_content_type": self.task_type.id,
+                "target_id": task.id,
+            }
+            for task in tasks
+        ]
+        # a repeated target
+        data.append(
+            {
+                "name": "Project again",
+                "target_content_type": self.task_type.id,
+                "target_id": tasks[0].id,
+            }
+        )
+        data.append(
+            {
+                "name": "User project",
+                "target_content_type": self.user_type.id,
+                "target_id": user.id,
+            }
+        )
+        # a target that does not exist
+        data.append(
+            {
+                "name": "Missing project",
+                "target_content_type": self.task_type.id,
+                "target_id": 1337,
+            }
+        )
+
+        serializer_instance = ProjectSerializer(data=data, many=True)
+        with CaptureQueriesContext(connection) as context:
+            self.assertFalse(serializer_instance.is_valid())
+
+        target_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"tasking_task"' in query["sql"] or '"auth_user"' in query["sql"]
+        ]
+        self.assertEqual(2, len(target_queries))
+        self.assertEqual([{}, {}, {}, {}, {}], serializer_instance.errors[:5])
+        self.assertIn("target_id", serializer_instance.errors[5])
+        self.assertTrue(
+            serializer_instance.context[TARGET_CACHE_KEY][
+                (self.task_type.id, tasks[0].id)
+            ]
+        )
@@ -82,6 +82,7 @@ class TestSubmissionSerializer(TestBase):
             "id",
             "created",
             "modified",
+            "idempotency_key",
         }
 
         self.assertEqual(
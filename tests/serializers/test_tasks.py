@@ -282,6 +282,71 @@ class TestTaskSerializer(TestBase):
 
         self.assertEqual(1, TaskLocation.objects.filter(task=task).count())
 
+    def test_location_link_update_diff(self):
+        """
+        Test that updating the locations of a Task keeps the TaskLocation
+        objects that have not changed
+        """
+        location = mommy.make("tasking.Location")
+        location2 = mommy.make("tasking.Location")
+        location3 = mommy.make("tasking.Location")
+        mocked_target_object = mommy.make("tasking.Task")
+
+        unchanged = {
+            "location": location.id,
+            "timing_rule": "RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5",
+            "start": "09:00:00",
+            "end": "15:00:00",
+        }
+        data = {
+            "name": "Cow price",
+            "description": "Some description",
+            "start": timezone.now(),
+            "timing_rule": "RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5",
+            "target_content_type": self.task_type.id,
+            "target_id": mocked_target_object.id,
+            "locations_input": [
+                unchanged,
+                {
+                    "location": location2.id,
+                    "timing_rule": "RRULE:FREQ=DAILY;INTERVAL=10;COUNT=7",
+                    "start": "12:00:00",
+                    "end": "19:00:00",
+                },
+            ],
+        }
+        serializer_instance = TaskSerializer(data=data)
+        self.assertTrue(serializer_instance.is_valid())
+        task = serializer_instance.save()
+        kept = TaskLocation.objects.get(task=task, location=location)
+
+        data2 = data.copy()
+        data2["locations_input"] = [
+            unchanged,
+            {
+                "location": location3.id,
+                "timing_rule": "RRULE:FREQ=DAILY;INTERVAL=10;COUNT=7",
+                "start": "12:00:00",
+                "end": "19:00:00",
+            },
+        ]
+        serializer_instance2 = TaskSerializer(instance=task, data=data2)
+        self.assertTrue(serializer_instance2.is_valid())
+        serializer_instance2.save()
+
+        self.assertEqual(
+            set([location.id, location3.id]),
+            set(
+                TaskLocation.objects.filter(task=task).values_list(
+                    "location_id", flat=True
+                )
+            ),
+        )
+        # the unchanged TaskLocation was not re-created
+        self.assertEqual(
+            kept.id, TaskLocation.objects.get(task=task, location=location).id
+        )
+
     def test_task_parent_link(self):
         """
         Test the connection between a parent and child task
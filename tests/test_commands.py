@@ -0,0 +1,214 @@
+"""
+Tests for tasking management commands
+"""
+import os
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from model_mommy import mommy
+
+from tasking.jobs import TASK_OCCURRENCES_JOB, enqueue_job
+from tasking.models import Job, Location, Submission, Task, TaskOccurrence, Tombstone
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+class TestCommands(TestCase):
+    """
+    Test class for tasking management commands
+    """
+
+    def test_generate_occurrences(self):
+        """
+        Test the generate_occurrences command
+        """
+        task = mommy.make(
+            "tasking.Task", timing_rule="RRULE:FREQ=DAILY;INTERVAL=10;COUNT=7"
+        )
+        task2 = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=3")
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        out = StringIO()
+        call_command("generate_occurrences", "--task", str(task.id), stdout=out)
+
+        self.assertEqual(7, TaskOccurrence.objects.filter(task=task).count())
+        self.assertEqual(0, TaskOccurrence.objects.filter(task=task2).count())
+        self.assertIn("Generated 7 occurrences for 1 tasks", out.getvalue())
+        self.assertIn("tasks/s", out.getvalue())
+        self.assertIn("occurrences/s", out.getvalue())
+
+    @override_settings(TASKING_OCCURRENCE_HORIZON_DAYS=5)
+    def test_extend_occurrences(self):
+        """
+        Test the extend_occurrences command
+        """
+        task = mommy.make(
+            "tasking.Task", timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY"
+        )
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        out = StringIO()
+        call_command("extend_occurrences", "--keep-days", "30", stdout=out)
+
+        self.assertEqual(6, TaskOccurrence.objects.filter(task=task).count())
+        self.assertIn("Added 6 occurrences for 1 tasks", out.getvalue())
+        self.assertIn("Deleted 0 old occurrences", out.getvalue())
+
+    def test_extend_occurrences_no_horizon(self):
+        """
+        Test that extend_occurrences requires the rolling horizon to be set
+        """
+        with self.assertRaises(CommandError):
+            call_command("extend_occurrences", stdout=StringIO())
+
+    @override_settings(TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend")
+    def test_process_jobs(self):
+        """
+        Test the process_jobs command
+        """
+        task = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=3")
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+        job = enqueue_job(TASK_OCCURRENCES_JOB, task)
+
+        out = StringIO()
+        call_command("process_jobs", stdout=out)
+
+        job.refresh_from_db()
+        self.assertEqual(Job.SUCCEEDED, job.status)
+        self.assertEqual(3, TaskOccurrence.objects.filter(task=task).count())
+        self.assertIn("Ran 1 jobs, 0 failed", out.getvalue())
+
+    def test_prune_tombstones(self):
+        """
+        Test the prune_tombstones command
+        """
+        old_tombstone = mommy.make("tasking.Tombstone")
+        tombstone = mommy.make("tasking.Tombstone")
+        # pylint: disable=no-member
+        Tombstone.objects.filter(pk=old_tombstone.pk).update(
+            modified=timezone.now() - timedelta(days=8)
+        )
+
+        out = StringIO()
+        call_command("prune_tombstones", "--keep-days", "7", stdout=out)
+
+        self.assertEqual([tombstone], list(Tombstone.objects.all()))
+        self.assertIn("Deleted 1 old tombstones", out.getvalue())
+
+        with self.settings(TASKING_TOMBSTONE_RETENTION_DAYS=None):
+            with self.assertRaises(CommandError):
+                call_command("prune_tombstones")
+
+    def test_prune_jobs(self):
+        """
+        Test the prune_jobs command
+        """
+        mommy.make(
+            "tasking.Job",
+            status=Job.SUCCEEDED,
+            finished=timezone.now() - timedelta(days=8),
+        )
+        job = mommy.make("tasking.Job", status=Job.SUCCEEDED, finished=timezone.now())
+
+        out = StringIO()
+        call_command("prune_jobs", "--keep-days", "7", stdout=out)
+
+        # pylint: disable=no-member
+        self.assertEqual([job], list(Job.objects.all()))
+        self.assertIn("Deleted 1 old jobs", out.getvalue())
+
+    def test_reconcile_submission_counts(self):
+        """
+        Test the reconcile_submission_counts command
+        """
+        task = mommy.make("tasking.Task")
+        task2 = mommy.make("tasking.Task")
+        mommy.make("tasking.Submission", task=task, _quantity=3)
+        mommy.make("tasking.Submission", task=task2)
+
+        # bulk deletes do not update the counts
+        # pylint: disable=no-member
+        Submission.objects.filter(task=task).delete()
+        Task.objects.filter(pk=task2.pk).update(submission_count=7)
+
+        out = StringIO()
+        call_command("reconcile_submission_counts", stdout=out)
+
+        task.refresh_from_db()
+        task2.refresh_from_db()
+        self.assertEqual(0, task.submission_count)
+        self.assertEqual(1, task2.submission_count)
+        self.assertIn("Fixed the submission count of 2 tasks", out.getvalue())
+
+    def test_reconcile_occurrence_dates(self):
+        """
+        Test the reconcile_occurrence_dates command
+        """
+        rule = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=3"
+        task = mommy.make("tasking.Task", timing_rule=rule)
+        task2 = mommy.make("tasking.Task", timing_rule=rule)
+        mommy.make("tasking.Task")
+
+        # bulk changes do not update the dates
+        # pylint: disable=no-member
+        TaskOccurrence.objects.filter(task=task).delete()
+        Task.objects.filter(pk=task2.pk).update(
+            first_occurrence_date=None, last_occurrence_date=date(2018, 5, 2)
+        )
+
+        out = StringIO()
+        call_command("reconcile_occurrence_dates", stdout=out)
+
+        task.refresh_from_db()
+        task2.refresh_from_db()
+        self.assertIsNone(task.first_occurrence_date)
+        self.assertIsNone(task.last_occurrence_date)
+        self.assertEqual(date(2018, 5, 1), task2.first_occurrence_date)
+        self.assertEqual(date(2018, 5, 3), task2.last_occurrence_date)
+        self.assertIn("Fixed the occurrence dates of 2 tasks", out.getvalue())
+
+    def test_import_locations(self):
+        """
+        Test the import_locations command
+        """
+        samburu = mommy.make("tasking.Location", name="Samburu")
+        path = os.path.join(BASE_DIR, "tests", "fixtures", "SamburuCentralPolygon.zip")
+
+        out = StringIO()
+        call_command(
+            "import_locations",
+            path,
+            "--name-field",
+            "DIVISION",
+            "--parent-field",
+            "DISTRICT",
+            "--country",
+            "KE",
+            stdout=out,
+        )
+
+        # pylint: disable=no-member
+        location = Location.objects.get(name="Samburu Central")
+        self.assertEqual(samburu, location.parent)
+        self.assertEqual("KE", location.country.code)
+        self.assertEqual(1, len(location.shapefile))
+        self.assertIn("Imported 1 locations", out.getvalue())
+        self.assertIn("locations/s", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_locations", path, "--name-field", "DIVISION", "--parent", "0"
+            )
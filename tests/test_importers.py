@@ -0,0 +1,178 @@
+"""
+Tests for tasking importers
+"""
+import os
+
+from django.test import TestCase
+
+from model_mommy import mommy
+
+from tasking.common_tags import (
+    AMBIGUOUS_PARENT_KEY,
+    CIRCULAR_PARENT_KEY,
+    DUPLICATE_LOCATION_KEY,
+    UNKNOWN_PARENT_KEY,
+    UNKNOWN_SHAPEFILE_FIELD,
+)
+from tasking.exceptions import LocationImportError
+from tasking.importers import LocationFeature, bulk_create_locations, import_locations
+from tasking.models import Location, LocationType
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+def make_feature(name, key="", parent_key="", location_type=""):
+    """
+    Returns a LocationFeature without a geometry
+    """
+    return LocationFeature(
+        key=key,
+        parent_key=parent_key,
+        name=name,
+        country="KE",
+        location_type=location_type,
+        shapefile=None,
+    )
+
+
+class TestImporters(TestCase):
+    """
+    Test class for tasking importers
+    """
+
+    def assertTreeIsValid(self):  # pylint: disable=invalid-name
+        """
+        Assert that the tree fields of all locations are the ones that MPTT
+        would have given them
+        """
+        fields = ["id", "lft", "rght", "level", "tree_id", "parent_id"]
+        # pylint: disable=no-member
+        before = list(Location.objects.order_by("id").values_list(*fields))
+        Location.objects.rebuild()
+        after = list(Location.objects.order_by("id").values_list(*fields))
+        self.assertEqual(after, before)
+
+    def test_bulk_create_locations(self):
+        """
+        Test that bulk_create_locations creates a hierarchy of locations
+        under existing ones
+        """
+        kenya = mommy.make("tasking.Location", name="Kenya")
+        nairobi = mommy.make("tasking.Location", name="Nairobi", parent=kenya)
+        mommy.make("tasking.Location", name="Westlands", parent=nairobi)
+        mommy.make("tasking.Location", name="Uganda")
+
+        features = [
+            make_feature("Nyeri", key="nyeri", location_type="County"),
+            make_feature("Mathira", key="mathira", parent_key="nyeri"),
+            make_feature("Karen", parent_key="Nairobi", location_type="Ward"),
+            make_feature("Karatina", parent_key="mathira"),
+            make_feature("Othaya", parent_key="nyeri"),
+            make_feature("Kibera", parent_key="Nairobi", location_type="Ward"),
+        ]
+        locations = bulk_create_locations(features, parent=kenya)
+
+        self.assertEqual(
+            [feature.name for feature in features],
+            [location.name for location in locations],
+        )
+        self.assertEqual(10, Location.objects.count())  # pylint: disable=no-member
+        self.assertTreeIsValid()
+
+        nyeri = Location.objects.get(name="Nyeri")
+        self.assertEqual(kenya, nyeri.parent)
+        self.assertEqual(
+            ["Mathira", "Karatina", "Othaya"],
+            [item.name for item in nyeri.get_descendants()],
+        )
+        self.assertEqual(
+            ["Westlands", "Karen", "Kibera"],
+            [item.name for item in nairobi.get_children()],
+        )
+        self.assertEqual("County", nyeri.location_type.name)
+        # location types are created once
+        # pylint: disable=no-member
+        self.assertEqual(1, LocationType.objects.filter(name="Ward").count())
+
+    def test_bulk_create_locations_roots(self):
+        """
+        Test that features without a parent become root locations
+        """
+        mommy.make("tasking.Location", name="Kenya")
+
+        features = [
+            make_feature("Uganda", key="ug"),
+            make_feature("Kampala", parent_key="ug"),
+            make_feature("Tanzania"),
+        ]
+        bulk_create_locations(features, batch_size=1)
+
+        self.assertTreeIsValid()
+        # pylint: disable=no-member
+        self.assertEqual(3, Location.objects.filter(parent=None).count())
+        self.assertEqual("Uganda", Location.objects.get(name="Kampala").get_root().name)
+
+    def test_bulk_create_locations_errors(self):
+        """
+        Test that nothing is created from features whose parents cannot be
+        worked out
+        """
+        mommy.make("tasking.Location", name="Nairobi", _quantity=2)
+
+        bad_features = [
+            (
+                [make_feature("A", key="a"), make_feature("B", key="a")],
+                DUPLICATE_LOCATION_KEY.format(feature=2, key="a"),
+            ),
+            (
+                [make_feature("A", key="a", parent_key="Mombasa")],
+                UNKNOWN_PARENT_KEY.format(feature=1, key="Mombasa"),
+            ),
+            (
+                [make_feature("A", key="a", parent_key="Nairobi")],
+                AMBIGUOUS_PARENT_KEY.format(feature=1, key="Nairobi"),
+            ),
+            (
+                [
+                    make_feature("A", key="a", parent_key="b"),
+                    make_feature("B", key="b", parent_key="a"),
+                ],
+                CIRCULAR_PARENT_KEY.format(feature=1),
+            ),
+        ]
+        for features, message in bad_features:
+            with self.assertRaises(LocationImportError) as context:
+                bulk_create_locations(features)
+            self.assertEqual(message, context.exception.message)
+
+        self.assertEqual(2, Location.objects.count())  # pylint: disable=no-member
+
+    def test_import_locations(self):
+        """
+        Test that import_locations creates a location for each feature of a
+        shapefile
+        """
+        kenya = mommy.make("tasking.Location", name="Kenya", country="KE")
+        path = os.path.join(BASE_DIR, "tests", "fixtures", "kenya.zip")
+
+        with self.assertRaises(LocationImportError) as context:
+            import_locations(path, name_field="NAME")
+        self.assertEqual(
+            UNKNOWN_SHAPEFILE_FIELD.format(field="NAME"), context.exception.message
+        )
+
+        result = import_locations(
+            path,
+            name_field="DIVISION",
+            country="KE",
+            location_type="Division",
+            parent=kenya,
+        )
+
+        self.assertEqual(391, result["locations"])
+        self.assertEqual(391, kenya.get_children().count())
+        self.assertTreeIsValid()
+        location = Location.objects.get(name="Abogeta")
+        self.assertEqual("KE", location.country.code)
+        self.assertEqual("Division", location.location_type.name)
+        self.assertEqual(4326, location.shapefile.srid)
@@ -0,0 +1,231 @@
+"""
+Tests for tasking background jobs
+"""
+import os
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+
+from django.core.files import File
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from model_mommy import mommy
+
+from tasking.common_tags import NO_SHAPEFILE, STALE_JOB
+from tasking.jobs import (
+    JOB_HANDLERS,
+    LOCATION_SHAPEFILE_JOB,
+    TASK_OCCURRENCES_JOB,
+    claim_jobs,
+    enqueue_job,
+    process_jobs,
+    prune_jobs,
+    register_job,
+)
+from tasking.models import Job, Location, TaskOccurrence
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+class TestJobs(TestCase):
+    """
+    Test class for tasking background jobs
+    """
+
+    def setUp(self):
+        """
+        Setup the job tests
+        """
+        self.task = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=4")
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+    def test_sync_backend(self):
+        """
+        Test that the default backend runs jobs straight away, without saving
+        the ones that have no input file
+        """
+        job = enqueue_job(TASK_OCCURRENCES_JOB, self.task)
+
+        self.assertIsNone(job.pk)
+        # pylint: disable=no-member
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(Job.SUCCEEDED, job.status)
+        self.assertEqual(1, job.attempts)
+        self.assertEqual(self.task, job.target_content_object)
+        self.assertIsNotNone(job.started)
+        self.assertIsNotNone(job.finished)
+        self.assertEqual(4, TaskOccurrence.objects.filter(task=self.task).count())
+
+    def test_sync_backend_errors(self):
+        """
+        Test that the default backend records the errors of jobs and raises
+        them to the caller
+        """
+
+        jobs = []
+
+        @register_job("failing")
+        def failing_job(job):
+            jobs.append(job)
+            raise ValueError("Something went wrong")
+
+        try:
+            with self.assertRaises(ValueError):
+                enqueue_job("failing", self.task)
+        finally:
+            del JOB_HANDLERS["failing"]
+
+        self.assertEqual(Job.FAILED, jobs[0].status)
+        self.assertEqual("Something went wrong", jobs[0].error)
+        # pylint: disable=no-member
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend")
+    def test_database_backend(self):
+        """
+        Test that the database backend leaves jobs for process_jobs
+        """
+        job = enqueue_job(TASK_OCCURRENCES_JOB, self.task)
+        # the same pending work is not queued twice
+        self.assertEqual(job, enqueue_job(TASK_OCCURRENCES_JOB, self.task))
+        job.refresh_from_db()
+        self.assertEqual(Job.PENDING, job.status)
+        # pylint: disable=no-member
+        self.assertEqual(0, TaskOccurrence.objects.filter(task=self.task).count())
+
+        self.assertEqual([job], process_jobs())
+        job.refresh_from_db()
+        self.assertEqual(Job.SUCCEEDED, job.status)
+        self.assertEqual(4, TaskOccurrence.objects.filter(task=self.task).count())
+
+        # nothing is left to do
+        self.assertEqual([], process_jobs())
+
+    @override_settings(
+        TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend", TASKING_JOB_MAX_ATTEMPTS=2
+    )
+    def test_failing_job(self):
+        """
+        Test that failing jobs are retried until they run out of attempts
+        """
+
+        @register_job("failing")
+        def failing_job(job):  # pylint: disable=unused-argument
+            raise ValueError("Something went wrong")
+
+        try:
+            job = enqueue_job("failing", self.task)
+
+            before = timezone.now()
+            process_jobs(limit=1)
+            job.refresh_from_db()
+            self.assertEqual(Job.PENDING, job.status)
+            self.assertEqual(1, job.attempts)
+            self.assertEqual("Something went wrong", job.error)
+            self.assertTrue(job.run_after >= before + timedelta(seconds=60))
+
+            # the job is not run again until its retry delay is up
+            self.assertEqual([], process_jobs())
+            # pylint: disable=no-member
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+            process_jobs(limit=1)
+            job.refresh_from_db()
+            self.assertEqual(Job.FAILED, job.status)
+            self.assertEqual(2, job.attempts)
+
+            self.assertEqual([], process_jobs())
+        finally:
+            del JOB_HANDLERS["failing"]
+
+    @override_settings(
+        TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend",
+        TASKING_JOB_MAX_ATTEMPTS=2,
+        TASKING_JOB_TIMEOUT=60,
+    )
+    def test_stale_jobs(self):
+        """
+        Test that running jobs whose worker has gone away are run again, or
+        failed once they run out of attempts
+        """
+        task2 = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=2")
+        job = enqueue_job(TASK_OCCURRENCES_JOB, self.task)
+        job2 = enqueue_job(TASK_OCCURRENCES_JOB, task2)
+        self.assertEqual({job, job2}, set(claim_jobs(2)))
+        # pylint: disable=no-member
+        Job.objects.filter(pk=job2.pk).update(attempts=2)
+
+        # jobs that are still within the timeout are left alone
+        self.assertEqual([], process_jobs())
+
+        Job.objects.update(modified=timezone.now() - timedelta(seconds=61))
+        self.assertEqual([job], process_jobs())
+        job.refresh_from_db()
+        self.assertEqual(Job.SUCCEEDED, job.status)
+        self.assertEqual(2, job.attempts)
+        job2.refresh_from_db()
+        self.assertEqual(Job.FAILED, job2.status)
+        self.assertEqual(STALE_JOB, job2.error)
+
+    def test_prune_jobs(self):
+        """
+        Test that prune_jobs deletes the jobs that finished a while ago
+        """
+        job = mommy.make("tasking.Job", status=Job.SUCCEEDED, finished=timezone.now())
+        mommy.make("tasking.Job", status=Job.PENDING)
+        self.assertEqual(0, prune_jobs(keep_days=1))
+        # pylint: disable=no-member
+        Job.objects.filter(pk=job.pk).update(
+            finished=timezone.now() - timedelta(days=2)
+        )
+        self.assertEqual(1, prune_jobs(keep_days=1))
+        self.assertFalse(Job.objects.filter(pk=job.pk).exists())
+
+    @override_settings(
+        TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend",
+        TASKING_JOB_MAX_ATTEMPTS=1,
+        TASKING_SHAPEFILE_ALLOW_NESTED_MULTIPOLYGONS=True,
+    )
+    def test_location_shapefile_job(self):
+        """
+        Test that location shapefile jobs set the shapefile of their location
+        and report their progress
+        """
+        location = mommy.make("tasking.Location", name="Kenya")
+        fixtures = os.path.join(BASE_DIR, "tests", "fixtures")
+
+        with TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            with open(os.path.join(fixtures, "missing_shp.zip"), "rb") as zip_file:
+                job = enqueue_job(
+                    LOCATION_SHAPEFILE_JOB,
+                    location,
+                    input_file=File(zip_file, name="missing_shp.zip"),
+                )
+            process_jobs()
+            job.refresh_from_db()
+            self.assertEqual(Job.FAILED, job.status)
+            self.assertEqual(NO_SHAPEFILE, job.error)
+
+            with open(os.path.join(fixtures, "kenya.zip"), "rb") as zip_file:
+                job = enqueue_job(
+                    LOCATION_SHAPEFILE_JOB,
+                    location,
+                    input_file=File(zip_file, name="kenya.zip"),
+                )
+            path = job.input_file.path
+            self.assertTrue(os.path.exists(path))
+            self.assertIsNone(job.total)
+
+            self.assertEqual([job], process_jobs())
+            job.refresh_from_db()
+            self.assertEqual(Job.SUCCEEDED, job.status)
+            self.assertEqual(391, job.total)
+            self.assertEqual(391, job.progress)
+            # the input file is removed once it has been processed
+            self.assertEqual("", job.input_file.name)
+            self.assertFalse(os.path.exists(path))
+
+        location = Location.objects.get(pk=location.pk)
+        self.assertEqual(379, len(location.shapefile))
@@ -0,0 +1,110 @@
+"""
+Tests for tasking rrules
+"""
+from datetime import datetime
+from itertools import islice
+
+from django.test import TestCase
+
+import pytz
+from dateutil.rrule import rrulestr
+
+from tasking.rrules import (
+    clear_rrule_cache,
+    get_rrule,
+    get_rrule_last_occurrence,
+    iter_rrule_from,
+    rrule_cache_info,
+)
+from tasking.validators import validate_rrule
+
+
+class TestRrules(TestCase):
+    """
+    Test class for tasking rrules
+    """
+
+    def setUp(self):
+        clear_rrule_cache()
+
+    def test_get_rrule_cache(self):
+        """
+        Test that get_rrule caches parsed rules
+        """
+        rule = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=5"
+
+        first = get_rrule(rule)
+        self.assertEqual(5, first.count())
+        self.assertEqual(0, rrule_cache_info().hits)
+        self.assertEqual(1, rrule_cache_info().misses)
+
+        # the validators and later calls use the cached object
+        self.assertTrue(validate_rrule(rule))
+        self.assertIs(first, get_rrule(rule))
+        self.assertEqual(2, rrule_cache_info().hits)
+        self.assertEqual(1, rrule_cache_info().misses)
+        self.assertEqual(1, rrule_cache_info().currsize)
+
+    def test_get_rrule_no_dtstart(self):
+        """
+        Test that rules without DTSTART are not cached
+        """
+        rule = "RRULE:FREQ=DAILY;COUNT=5"
+        self.assertIsNot(get_rrule(rule), get_rrule(rule))
+        self.assertEqual(0, rrule_cache_info().currsize)
+
+    def test_get_rrule_invalid(self):
+        """
+        Test that get_rrule raises the same errors as rrulestr
+        """
+        with self.assertRaises(ValueError):
+            get_rrule("DTSTART:20180501T070000Z RRULE:FREQ=NEVER")
+        self.assertFalse(validate_rrule("DTSTART:20180501T070000Z RRULE:FREQ=NEVER"))
+        self.assertFalse(validate_rrule(1337))
+
+    def test_get_rrule_last_occurrence(self):
+        """
+        Test that get_rrule_last_occurrence matches expanding the rule
+        """
+        rules = [
+            "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=50",
+            "DTSTART:20180501T070000 RRULE:FREQ=DAILY;INTERVAL=3;COUNT=500",
+            "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;BYDAY=MO,FR;COUNT=77",
+            "DTSTART:20180501T070000Z RRULE:FREQ=WEEKLY;COUNT=10",
+            "DTSTART:20180501T070000Z RRULE:FREQ=WEEKLY;BYDAY=MO,SU;INTERVAL=2;COUNT=9",
+            "DTSTART:20180506T070000Z RRULE:FREQ=WEEKLY;BYDAY=MO,SA;WKST=SU;COUNT=8",
+            "DTSTART:20180131T070000Z RRULE:FREQ=MONTHLY;COUNT=13",
+            "DTSTART:20180115T070000Z RRULE:FREQ=MONTHLY;INTERVAL=5;COUNT=13",
+            "DTSTART:20160229T070000Z RRULE:FREQ=YEARLY;COUNT=3",
+            "DTSTART:20180501T070000Z RRULE:FREQ=YEARLY;INTERVAL=2;COUNT=30",
+            "DTSTART:20180501T070000Z RRULE:FREQ=MONTHLY;BYDAY=1MO;COUNT=30",
+            "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;BYHOUR=7,9;COUNT=30",
+        ]
+        for rule in rules:
+            rrule_obj = rrulestr(rule)
+            self.assertEqual(rrule_obj[-1], get_rrule_last_occurrence(rrule_obj))
+
+    def test_iter_rrule_from(self):
+        """
+        Test that iter_rrule_from gives the same datetimes as expanding the
+        rule from its DTSTART
+        """
+        the_datetime = datetime(2026, 3, 4, 5, 6, tzinfo=pytz.utc)
+        rules = [
+            "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;INTERVAL=3",
+            "DTSTART:20180502T070000Z RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR",
+            "DTSTART:20180501T073000Z RRULE:FREQ=HOURLY;INTERVAL=5;BYMINUTE=0,30",
+            "DTSTART:20180501T070000Z RRULE:FREQ=MINUTELY;UNTIL=20300101T000000Z",
+            "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=5000",
+            "DTSTART:20180131T070000Z RRULE:FREQ=MONTHLY",
+        ]
+        for rule in rules:
+            rrule_obj = get_rrule(rule)
+            self.assertEqual(
+                list(islice(rrule_obj.xafter(the_datetime, inc=True), 50)),
+                list(islice(iter_rrule_from(rrule_obj, the_datetime), 50)),
+                rule,
+            )
+        # the cached rule is left alone
+        # pylint: disable=protected-access
+        self.assertEqual(2018, get_rrule(rules[0])._dtstart.year)
@@ -1,13 +1,15 @@
 """
 Tests for tasking signals
 """
-from django.db.models.signals import post_save
+import datetime
+
+from django.db.models.signals import post_delete, post_save
 from django.test import TestCase
 
 from model_mommy import mommy
 
-from tasking.models import TaskOccurrence
-from tasking.signals import create_occurrences
+from tasking.models import TaskOccurrence, Tombstone
+from tasking.signals import create_occurrences, create_tombstone
 
 
 class TestSignals(TestCase):
@@ -37,3 +39,126 @@ class TestSignals(TestCase):
         )
         # pylint: disable=no-member
         self.assertEqual(57, TaskOccurrence.objects.filter(task=task).count())
+
+    def test_task_occurrences_unchanged(self):
+        """
+        Test that saving a Task without changing its timing fields leaves
+        the existing occurrences untouched
+        """
+        task = mommy.make(
+            "tasking.Task", timing_rule="RRULE:FREQ=DAILY;INTERVAL=10;COUNT=7"
+        )
+        # pylint: disable=no-member
+        ids = set(TaskOccurrence.objects.filter(task=task).values_list("id", flat=True))
+        self.assertEqual(7, len(ids))
+
+        task.name = "Changed name"
+        task.save()
+        self.assertEqual(
+            ids,
+            set(TaskOccurrence.objects.filter(task=task).values_list("id", flat=True)),
+        )
+
+    def test_task_occurrence_dates_kept(self):
+        """
+        Test that saving a task after its occurrences were generated keeps
+        the occurrence dates that were stored on it
+        """
+        task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=3",
+        )
+        # the dates were stored by a query, not on this instance
+        self.assertIsNone(task.first_occurrence_date)
+
+        task.name = "Changed name"
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(datetime.date(2018, 5, 1), task.first_occurrence_date)
+        self.assertEqual(datetime.date(2018, 5, 3), task.last_occurrence_date)
+        self.assertEqual("Changed name", task.name)
+
+    def test_task_occurrences_changed(self):
+        """
+        Test that changing the timing_rule only touches the occurrences that
+        differ
+        """
+        task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=5",
+        )
+        # pylint: disable=no-member
+        before = {
+            item.date: item.id for item in TaskOccurrence.objects.filter(task=task)
+        }
+        self.assertEqual(5, len(before))
+
+        task.timing_rule = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=3"
+        task.save()
+
+        after = {
+            item.date: item.id for item in TaskOccurrence.objects.filter(task=task)
+        }
+        self.assertEqual(3, len(after))
+        # the remaining occurrences kept their ids
+        for date, occurrence_id in after.items():
+            self.assertEqual(before[date], occurrence_id)
+
+    def test_create_tombstone(self):
+        """
+        Test that a Tombstone is created when a synced object is deleted
+        """
+        post_delete.connect(
+            create_tombstone, sender="tasking.Task", dispatch_uid="task_tombstone"
+        )
+        self.addCleanup(
+            post_delete.disconnect,
+            sender="tasking.Task",
+            dispatch_uid="task_tombstone",
+        )
+        task = mommy.make("tasking.Task")
+        task_id = task.id
+        task.delete()
+
+        # pylint: disable=no-member
+        tombstone = Tombstone.objects.get()
+        self.assertEqual("task", tombstone.target_content_type.model)
+        self.assertEqual(task_id, tombstone.target_object_id)
+
+    def test_bulk_delete_tombstones(self):
+        """
+        Test that occurrences deleted in bulk get one tombstone each, saved
+        in bulk instead of by create_tombstone
+        """
+        post_delete.connect(
+            create_tombstone,
+            sender="tasking.TaskOccurrence",
+            dispatch_uid="occurrence_tombstone",
+        )
+        self.addCleanup(
+            post_delete.disconnect,
+            sender="tasking.TaskOccurrence",
+            dispatch_uid="occurrence_tombstone",
+        )
+        task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=5",
+        )
+        # pylint: disable=no-member
+        ids = set(TaskOccurrence.objects.filter(task=task).values_list("id", flat=True))
+
+        task.timing_rule = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=3"
+        task.save()
+
+        deleted = ids - set(
+            TaskOccurrence.objects.filter(task=task).values_list("id", flat=True)
+        )
+        self.assertEqual(2, len(deleted))
+        self.assertEqual(
+            sorted(deleted),
+            sorted(Tombstone.objects.values_list("target_object_id", flat=True)),
+        )
+        self.assertEqual(
+            {"taskoccurrence"},
+            set(Tombstone.objects.values_list("target_content_type__model", flat=True)),
+        )
@@ -0,0 +1,59 @@
+"""
+Tests for tasking vector tiles
+"""
+from django.test import SimpleTestCase
+
+from tasking.tiles import (
+    WEB_MERCATOR_MAX,
+    get_tile_bounds,
+    get_tile_max_latitude,
+    get_tile_shapefile_field,
+)
+
+
+class TestTiles(SimpleTestCase):
+    """
+    Test class for tasking vector tiles
+    """
+
+    def test_get_tile_bounds(self):
+        """
+        Test get_tile_bounds
+        """
+        self.assertEqual(
+            (-WEB_MERCATOR_MAX, -WEB_MERCATOR_MAX, WEB_MERCATOR_MAX, WEB_MERCATOR_MAX),
+            get_tile_bounds(0, 0, 0),
+        )
+        # the top right quarter of the world
+        self.assertEqual(
+            (0, 0, WEB_MERCATOR_MAX, WEB_MERCATOR_MAX), get_tile_bounds(1, 1, 0)
+        )
+        # the bottom left quarter of the world
+        self.assertEqual(
+            (-WEB_MERCATOR_MAX, -WEB_MERCATOR_MAX, 0, 0), get_tile_bounds(1, 0, 1)
+        )
+
+    def test_get_tile_max_latitude(self):
+        """
+        Test get_tile_max_latitude
+        """
+        self.assertAlmostEqual(
+            85.0511, get_tile_max_latitude(get_tile_bounds(0, 0, 0)), 4
+        )
+        self.assertAlmostEqual(
+            85.0511, get_tile_max_latitude(get_tile_bounds(1, 0, 1)), 4
+        )
+        # the tile just below the equator
+        self.assertAlmostEqual(
+            0.0879, get_tile_max_latitude(get_tile_bounds(12, 0, 2048)), 4
+        )
+
+    def test_get_tile_shapefile_field(self):
+        """
+        Test that more detailed shapefiles are drawn at deeper zoom levels
+        """
+        self.assertEqual("shapefile_coarse", get_tile_shapefile_field(0))
+        self.assertEqual("shapefile_coarse", get_tile_shapefile_field(6))
+        self.assertEqual("shapefile_medium", get_tile_shapefile_field(7))
+        self.assertEqual("shapefile_fine", get_tile_shapefile_field(13))
+        self.assertEqual("shapefile", get_tile_shapefile_field(14))
@@ -3,11 +3,12 @@ Tests for tasking utils
 """
 import os
 import zipfile
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
+from io import BytesIO
 from tempfile import TemporaryDirectory
 
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.gis.gdal import DataSource, geometries
+from django.contrib.gis.gdal import DataSource, GDALException, geometries
 from django.contrib.gis.geos import Polygon
 from django.test import TestCase, override_settings
 from django.utils import timezone
@@ -26,8 +27,12 @@ from tasking.exceptions import (
 from tasking.models import Task, TaskOccurrence
 from tasking.utils import (
     MAX_OCCURRENCES,
+    bulk_generate_task_occurrences,
+    bulk_generate_tasklocation_occurrences,
+    extend_task_occurrences,
     generate_task_occurrences,
     generate_tasklocation_occurrences,
+    allowed_contenttypes,
     get_allowed_contenttypes,
     get_occurrence_end_time,
     get_occurrence_start_time,
@@ -35,7 +40,10 @@ from tasking.utils import (
     get_rrule_end,
     get_rrule_start,
     get_shapefile,
+    get_shapefile_geoms,
     get_target,
+    prune_task_occurrences,
+    sync_task_occurrences,
 )
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -170,6 +178,36 @@ class TestUtils(TestCase):
         self.assertIn(task_type, allowed)
         self.assertIn(rule_type, allowed)
 
+    def test_allowed_contenttypes(self):
+        """
+        Test the process-wide cache of allowed content types
+        """
+        task_type = ContentType.objects.get(app_label="tasking", model="task")
+        allowed_contenttypes.clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(task_type, allowed_contenttypes.get_for_id(task_type.pk))
+            self.assertEqual(
+                task_type, allowed_contenttypes.get_by_natural_key("tasking", "task")
+            )
+            self.assertEqual(Task, allowed_contenttypes.get_model_class(task_type.pk))
+            self.assertEqual(
+                get_allowed_contenttypes().count(), len(allowed_contenttypes.all())
+            )
+            # content types that are not allowed are not returned
+            self.assertIsNone(
+                allowed_contenttypes.get_by_natural_key("tasking", "taskoccurrence")
+            )
+            self.assertIsNone(allowed_contenttypes.get_for_id(0))
+
+        # the cache is cleared when content types change
+        content_type = ContentType.objects.create(app_label="tasking", model="nothing")
+        with self.assertNumQueries(1):
+            self.assertIsNone(allowed_contenttypes.get_for_id(content_type.pk))
+        content_type.delete()
+        with self.assertNumQueries(1):
+            allowed_contenttypes.all()
+
     def test_generate_task_occurrences(self):
         """
         Test generate_task_occurrences works correctly
@@ -347,6 +385,8 @@ class TestUtils(TestCase):
         for occurrence in occurrences:
             self.assertEqual("07:00:00", occurrence.start_time.isoformat())
             self.assertEqual("21:00:00", occurrence.end_time.isoformat())
+            # the occurrences are linked to the location
+            self.assertEqual(location, occurrence.location)
 
     def test_get_polygons(self):
         """
@@ -374,6 +414,27 @@ class TestUtils(TestCase):
             for item in polygons:
                 self.assertTrue(isinstance(item, Polygon))
 
+    def test_get_shapefile_geoms(self):
+        """
+        Test that get_shapefile_geoms reads shapefiles from zip files
+        without extracting them
+        """
+        path = os.path.join(BASE_DIR, "tests", "fixtures", "kenya.zip")
+        shapefile = get_shapefile(zipfile.ZipFile(path))
+
+        # from the path of the zip file
+        geoms = get_shapefile_geoms(path, shapefile)
+        self.assertEqual(391, len(geoms))
+
+        # from a file-like object, in memory
+        with open(path, "rb") as zip_file:
+            in_memory = BytesIO(zip_file.read())
+        memory_geoms = get_shapefile_geoms(in_memory, shapefile)
+        self.assertEqual([geom.wkt for geom in geoms], [x.wkt for x in memory_geoms])
+
+        with self.assertRaises(GDALException):
+            get_shapefile_geoms(BytesIO(b"not a zip file"), shapefile)
+
     @override_settings(TASKING_SHAPEFILE_ALLOW_NESTED_MULTIPOLYGONS=True)
     def test_get_polygons_nested(self):
         """
@@ -445,3 +506,267 @@ class TestUtils(TestCase):
 
             for item in polygons:
                 self.assertTrue(isinstance(item, Polygon))
+
+    def test_sync_task_occurrences(self):
+        """
+        Test sync_task_occurrences
+        """
+        rule1 = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=5"
+        task = mommy.make("tasking.Task", timing_rule=rule1)
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        occurrences = sync_task_occurrences(task=task, timing_rule=rule1)
+        self.assertEqual(5, occurrences.count())
+        ids = set(occurrences.values_list("id", flat=True))
+
+        # syncing again changes nothing
+        occurrences = sync_task_occurrences(task=task, timing_rule=rule1)
+        self.assertEqual(ids, set(occurrences.values_list("id", flat=True)))
+
+        # shorter rule with a different start time
+        rule2 = "DTSTART:20180502T090000Z RRULE:FREQ=DAILY;COUNT=2"
+        occurrences = sync_task_occurrences(task=task, timing_rule=rule2)
+        self.assertEqual(2, occurrences.count())
+        # existing occurrences were updated rather than recreated
+        self.assertTrue(set(occurrences.values_list("id", flat=True)) <= ids)
+        for item in occurrences:
+            self.assertEqual(time(9, 0, 0, 0), item.start_time)
+        # the occurrence dates of the task are kept up to date
+        task.refresh_from_db()
+        self.assertEqual(date(2018, 5, 2), task.first_occurrence_date)
+        self.assertEqual(date(2018, 5, 3), task.last_occurrence_date)
+
+        # occurrences linked to a location are left alone
+        location = mommy.make("tasking.Location")
+        mommy.make("tasking.TaskOccurrence", task=task, location=location)
+        occurrences = sync_task_occurrences(task=task, timing_rule=rule2)
+        self.assertEqual(3, occurrences.count())
+
+    def test_bulk_generate_task_occurrences(self):
+        """
+        Test bulk_generate_task_occurrences
+        """
+        task1 = mommy.make(
+            "tasking.Task", timing_rule="RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5"
+        )
+        task2 = mommy.make(
+            "tasking.Task", timing_rule="RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5000"
+        )
+        task3 = mommy.make("tasking.Task", timing_rule=None)
+
+        # an existing occurrence that does not match the timing_rule
+        stale = mommy.make("tasking.TaskOccurrence", task=task1, date=date(2000, 1, 1))
+
+        result = bulk_generate_task_occurrences(
+            Task.objects.filter(id__in=[task1.id, task2.id, task3.id]),
+            chunk_size=2,
+            batch_size=100,
+        )
+
+        self.assertEqual(2, result["tasks"])
+        self.assertEqual(5 + MAX_OCCURRENCES, result["occurrences"])
+        self.assertTrue(result["seconds"] >= 0)
+        # pylint: disable=no-member
+        self.assertEqual(5, TaskOccurrence.objects.filter(task=task1).count())
+        self.assertEqual(
+            MAX_OCCURRENCES, TaskOccurrence.objects.filter(task=task2).count()
+        )
+        self.assertEqual(0, TaskOccurrence.objects.filter(task=task3).count())
+        task1.refresh_from_db()
+        self.assertEqual(
+            timedelta(days=40),
+            task1.last_occurrence_date - task1.first_occurrence_date,
+        )
+        task3.refresh_from_db()
+        self.assertIsNone(task3.last_occurrence_date)
+
+        self.assertFalse(TaskOccurrence.objects.filter(id=stale.id).exists())
+
+        # it also works with a plain list of tasks, and occurrences that are
+        # already there keep their ids
+        occurrence_ids = set(
+            TaskOccurrence.objects.filter(task=task1).values_list("id", flat=True)
+        )
+        result = bulk_generate_task_occurrences([task1])
+        self.assertEqual(1, result["tasks"])
+        self.assertEqual(5, result["occurrences"])
+        self.assertEqual(
+            occurrence_ids,
+            set(TaskOccurrence.objects.filter(task=task1).values_list("id", flat=True)),
+        )
+
+    @override_settings(TASKING_OCCURRENCE_HORIZON_DAYS=10)
+    def test_rolling_horizon(self):
+        """
+        Test that only the rolling horizon is materialized and that
+        extend_task_occurrences and prune_task_occurrences work
+        """
+        rule = "DTSTART:20180501T070000Z RRULE:FREQ=DAILY"
+        task = mommy.make("tasking.Task", timing_rule=rule)
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        today = timezone.localdate()
+        occurrences = generate_task_occurrences(task=task, timing_rule=rule)
+        # today and the next 10 days
+        self.assertEqual(11, occurrences.count())
+        for item in occurrences:
+            self.assertTrue(today <= item.date <= today + timedelta(days=10))
+
+        # nothing to add when the horizon has not moved
+        result = extend_task_occurrences(Task.objects.filter(id=task.id))
+        self.assertEqual(0, result["occurrences"])
+
+        with self.settings(TASKING_OCCURRENCE_HORIZON_DAYS=20):
+            result = extend_task_occurrences(Task.objects.filter(id=task.id))
+        self.assertEqual(1, result["tasks"])
+        self.assertEqual(10, result["occurrences"])
+        self.assertEqual(21, TaskOccurrence.objects.filter(task=task).count())
+        self.assertEqual(
+            today + timedelta(days=20),
+            TaskOccurrence.objects.filter(task=task).order_by("-date").first().date,
+        )
+
+        # prune occurrences older than 5 days
+        mommy.make("tasking.TaskOccurrence", task=task, date=today - timedelta(6))
+        self.assertEqual(1, prune_task_occurrences(keep_days=5))
+        self.assertEqual(21, TaskOccurrence.objects.filter(task=task).count())
+
+    @override_settings(TASKING_OCCURRENCE_HORIZON_DAYS=10)
+    def test_rolling_horizon_tasklocations(self):
+        """
+        Test that extend_task_occurrences also extends the occurrences of
+        task locations when the rolling horizon moves forward
+        """
+        task = mommy.make("tasking.Task")
+        location1 = mommy.make("tasking.Location")
+        location2 = mommy.make("tasking.Location")
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task,
+            location=location1,
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY",
+            start="07:00:00",
+            end="21:00:00",
+        )
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task,
+            location=location2,
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY;INTERVAL=2",
+        )
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        today = timezone.localdate()
+        result = extend_task_occurrences(Task.objects.filter(id=task.id))
+        self.assertEqual(1, result["tasks"])
+        self.assertEqual(
+            11, TaskOccurrence.objects.filter(task=task, location=location1).count()
+        )
+        location2_count = TaskOccurrence.objects.filter(
+            task=task, location=location2
+        ).count()
+        self.assertIn(location2_count, [5, 6])
+        # the task itself has no timing_rule
+        self.assertEqual(
+            0, TaskOccurrence.objects.filter(task=task, location=None).count()
+        )
+
+        # nothing to add when the horizon has not moved
+        result = extend_task_occurrences(Task.objects.filter(id=task.id))
+        self.assertEqual(0, result["occurrences"])
+
+        with self.settings(TASKING_OCCURRENCE_HORIZON_DAYS=20):
+            result = extend_task_occurrences(Task.objects.filter(id=task.id))
+        self.assertEqual(
+            21, TaskOccurrence.objects.filter(task=task, location=location1).count()
+        )
+        self.assertEqual(
+            location2_count + 5,
+            TaskOccurrence.objects.filter(task=task, location=location2).count(),
+        )
+        self.assertEqual(15, result["occurrences"])
+        occurrence = (
+            TaskOccurrence.objects.filter(task=task, location=location1)
+            .order_by("-date")
+            .first()
+        )
+        self.assertEqual(today + timedelta(days=20), occurrence.date)
+        self.assertEqual("07:00:00", occurrence.start_time.isoformat())
+        self.assertEqual("21:00:00", occurrence.end_time.isoformat())
+
+    def test_bulk_generate_tasklocation_occurrences(self):
+        """
+        Test bulk_generate_tasklocation_occurrences
+        """
+        task1 = mommy.make("tasking.Task")
+        task2 = mommy.make("tasking.Task")
+        location1 = mommy.make("tasking.Location")
+        location2 = mommy.make("tasking.Location")
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task1,
+            location=location1,
+            timing_rule="RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5",
+            start="07:00:00",
+            end="21:00:00",
+        )
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task1,
+            location=location2,
+            timing_rule="RRULE:FREQ=DAILY;COUNT=3",
+            start="08:00:00",
+            end="09:00:00",
+        )
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task2,
+            location=location2,
+            timing_rule="RRULE:FREQ=DAILY;COUNT=2",
+            start="08:00:00",
+            end="09:00:00",
+        )
+
+        # remove any auto-generated occurrences
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+        # a task-level occurrence that should be left alone
+        mommy.make("tasking.TaskOccurrence", task=task1)
+        # a location occurrence that does not match the timing_rule
+        mommy.make(
+            "tasking.TaskOccurrence",
+            task=task1,
+            location=location1,
+            date=date(2000, 1, 1),
+        )
+
+        result = bulk_generate_tasklocation_occurrences(
+            Task.objects.filter(id__in=[task1.id, task2.id]), chunk_size=1
+        )
+        self.assertEqual(2, result["tasks"])
+        self.assertEqual(10, result["occurrences"])
+
+        self.assertEqual(
+            5,
+            TaskOccurrence.objects.filter(task=task1, location=location1).count(),
+        )
+        self.assertEqual(
+            3,
+            TaskOccurrence.objects.filter(task=task1, location=location2).count(),
+        )
+        self.assertEqual(
+            2,
+            TaskOccurrence.objects.filter(task=task2, location=location2).count(),
+        )
+        self.assertEqual(
+            1, TaskOccurrence.objects.filter(task=task1, location=None).count()
+        )
@@ -0,0 +1,77 @@
+"""
+Tests Job viewsets.
+"""
+from django.test import override_settings
+
+from model_mommy import mommy
+from rest_framework.test import APIRequestFactory, force_authenticate
+from tests.base import TestBase
+
+from tasking.jobs import TASK_OCCURRENCES_JOB, enqueue_job, process_jobs
+from tasking.models import Job
+from tasking.viewsets import JobViewSet
+
+
+class TestJobViewSet(TestBase):
+    """
+    Test JobViewSet class.
+    """
+
+    def setUp(self):
+        super(TestJobViewSet, self).setUp()
+        self.factory = APIRequestFactory()
+
+    @override_settings(TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend")
+    def test_list_jobs(self):
+        """
+        Test GET /jobs listing and filtering jobs
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=3")
+        task2 = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=3")
+        job = enqueue_job(TASK_OCCURRENCES_JOB, task)
+        enqueue_job(TASK_OCCURRENCES_JOB, task2)
+
+        view = JobViewSet.as_view({"get": "list"})
+        request = self.factory.get(
+            "/jobs",
+            {"target_content_type": self.task_type.id, "target_object_id": task.id},
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(1, len(response.data))
+        self.assertEqual(job.id, response.data[0]["id"])
+        self.assertEqual(task.id, response.data[0]["target_id"])
+        self.assertEqual(TASK_OCCURRENCES_JOB, response.data[0]["job_type"])
+        self.assertEqual(Job.PENDING, response.data[0]["status"])
+
+    @override_settings(TASKING_JOB_BACKEND="tasking.jobs.DatabaseBackend")
+    def test_retrieve_job(self):
+        """
+        Test GET /jobs/[pk] returning the status of a job
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task", timing_rule="RRULE:FREQ=DAILY;COUNT=3")
+        job = enqueue_job(TASK_OCCURRENCES_JOB, task)
+        process_jobs()
+
+        view = JobViewSet.as_view({"get": "retrieve"})
+        request = self.factory.get(f"/jobs/{job.id}")
+        force_authenticate(request, user=user)
+        response = view(request=request, pk=job.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Job.SUCCEEDED, response.data["status"])
+        self.assertEqual(1, response.data["attempts"])
+        self.assertEqual("", response.data["error"])
+
+    def test_authentication_required(self):
+        """
+        Test that authentication is required to view jobs
+        """
+        view = JobViewSet.as_view({"get": "list"})
+        request = self.factory.get("/jobs")
+        response = view(request=request)
+        self.assertEqual(response.status_code, 403)
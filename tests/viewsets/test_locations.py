@@ -1,8 +1,11 @@
 """
 Tests Location viewsets.
 """
+import json
 import os
+from tempfile import TemporaryDirectory
 
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon, Point, Polygon
 from django.test import override_settings
 
 import pytz
@@ -14,10 +17,13 @@ from tests.base import TestBase
 from tasking.common_tags import (
     GEODETAILS_ONLY,
     GEOPOINT_MISSING,
+    INVALID_GEOMETRY_OPTION,
     INVALID_SHAPEFILE,
+    NO_SHAPEFILE,
     RADIUS_MISSING,
+    UNKNOWN_PARENT_KEY,
 )
-from tasking.models import Location
+from tasking.models import Job, Location
 from tasking.viewsets import LocationViewSet
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -211,6 +217,110 @@ class TestLocationViewSet(TestBase):
             self.assertIn("shapefile", response2.data.keys())
             self.assertEqual(GEODETAILS_ONLY, str(response2.data["shapefile"][0]))
 
+    def test_import_locations(self):
+        """
+        Test POST /locations/import creates a location for each feature of a
+        shapefile
+        """
+        user = mommy.make("auth.User")
+        samburu = mommy.make("tasking.Location", name="Samburu")
+        path = os.path.join(BASE_DIR, "fixtures", "SamburuCentralPolygon.zip")
+        view = LocationViewSet.as_view({"post": "import_shapefile"})
+
+        with open(path, "r+b") as shapefile:
+            data = {
+                "shapefile": shapefile,
+                "name_field": "DIVISION",
+                "parent_field": "DISTRICT",
+                "parent": samburu.id,
+            }
+            request = self.factory.post("/locations/import", data)
+            force_authenticate(request, user=user)
+            response = view(request=request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            UNKNOWN_PARENT_KEY.format(feature=1, key="Samburu"),
+            str(response.data["shapefile"]),
+        )
+
+        with open(path, "r+b") as shapefile:
+            data = {
+                "shapefile": shapefile,
+                "name_field": "DIVISION",
+                "parent_field": "DISTRICT",
+                "country": "KE",
+                "location_type": "Division",
+            }
+            request = self.factory.post("/locations/import", data)
+            force_authenticate(request, user=user)
+            response = view(request=request)
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(1, response.data["locations"])
+        location = Location.objects.get(name="Samburu Central")
+        self.assertEqual(samburu, location.parent)
+        self.assertEqual("KE", location.country.code)
+        self.assertEqual("Division", location.location_type.name)
+
+        with open(path, "r+b") as shapefile:
+            data = {"shapefile": shapefile, "name_field": "NAME"}
+            request = self.factory.post("/locations/import", data)
+            response = view(request=request)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_upload_shapefile(self):
+        """
+        Test POST /locations/[pk]/shapefile sets the shapefile of a location
+        in a background job
+        """
+        user = mommy.make("auth.User")
+        location = mommy.make("tasking.Location", name="Samburu")
+        view = LocationViewSet.as_view({"post": "upload_shapefile"})
+        fixtures = os.path.join(BASE_DIR, "fixtures")
+
+        with TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            with open(os.path.join(fixtures, "missing_shp.zip"), "r+b") as shapefile:
+                request = self.factory.post(
+                    f"/locations/{location.id}/shapefile", {"shapefile": shapefile}
+                )
+                force_authenticate(request, user=user)
+                response = view(request=request, pk=location.id)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(NO_SHAPEFILE, str(response.data["shapefile"][0]))
+
+            path = os.path.join(fixtures, "SamburuCentralPolygon.zip")
+            with open(path, "r+b") as shapefile:
+                request = self.factory.post(
+                    f"/locations/{location.id}/shapefile", {"shapefile": shapefile}
+                )
+                force_authenticate(request, user=user)
+                response = view(request=request, pk=location.id)
+
+        # the default job backend runs the job straight away
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(Job.SUCCEEDED, response.data["status"])
+        self.assertEqual(location.id, response.data["target_id"])
+        self.assertEqual(1, response.data["progress"])
+        self.assertEqual(1, response.data["total"])
+        location.refresh_from_db()
+        self.assertEqual(1, len(location.shapefile))
+
+        point_location = mommy.make(
+            "tasking.Location", name="Nairobi", geopoint=Point(36.8, -1.3), radius=5
+        )
+        with open(path, "r+b") as shapefile:
+            request = self.factory.post(
+                f"/locations/{point_location.id}/shapefile", {"shapefile": shapefile}
+            )
+            force_authenticate(request, user=user)
+            response = view(request=request, pk=point_location.id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(GEODETAILS_ONLY, str(response.data["shapefile"]))
+
     def test_delete_location(self):
         """
         Test DELETE location.
@@ -261,6 +371,150 @@ class TestLocationViewSet(TestBase):
         resp = response.data.pop()
         self.assertDictEqual(resp, location_data)
 
+    def test_list_locations_geometry(self):
+        """
+        Test that the geometry query parameter chooses how the shapefiles of
+        locations are represented
+        """
+        user = mommy.make("auth.User")
+        square = Polygon(((36, -2), (37, -2), (37, -1), (36, -1), (36, -2)))
+        location = mommy.make(
+            "tasking.Location",
+            name="Nairobi",
+            shapefile=MultiPolygon(square, srid=4326),
+        )
+        view = LocationViewSet.as_view({"get": "list"})
+
+        def get_shapefile(query):
+            request = self.factory.get(f"/locations?{query}")
+            force_authenticate(request, user=user)
+            response = view(request=request)
+            self.assertEqual(response.status_code, 200, response.data)
+            return response.data[0].get("shapefile")
+
+        self.assertEqual("MultiPolygon", get_shapefile("")["type"])
+        self.assertEqual("MultiPolygon", get_shapefile("geometry=full")["type"])
+        medium = get_shapefile("geometry=medium")
+        self.assertEqual("MultiPolygon", medium["type"])
+        self.assertTrue(
+            location.shapefile_medium.equals(GEOSGeometry(json.dumps(medium)))
+        )
+        bbox = get_shapefile("geometry=bbox")
+        self.assertEqual("Polygon", bbox["type"])
+        self.assertEqual(
+            [[[36, -2], [36, -1], [37, -1], [37, -2], [36, -2]]], bbox["coordinates"]
+        )
+        self.assertIsNone(get_shapefile("geometry=none"))
+
+        request = self.factory.get("/locations?geometry=huge")
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            INVALID_GEOMETRY_OPTION.format(
+                options="full, fine, medium, coarse, bbox, none"
+            ),
+            str(response.data["geometry"]),
+        )
+
+    def test_location_tiles(self):
+        """
+        Test GET /locations/tiles/[z]/[x]/[y].mvt returns vector tiles of
+        locations
+        """
+        user = mommy.make("auth.User")
+        square = Polygon(((36, -2), (37, -2), (37, -1), (36, -1), (36, -2)))
+        location = mommy.make(
+            "tasking.Location",
+            name="Nairobi",
+            country="KE",
+            shapefile=MultiPolygon(square, srid=4326),
+        )
+        mommy.make(
+            "tasking.Location", name="Kampala", geopoint=Point(32.6, 0.3), radius=5000
+        )
+        view = LocationViewSet.as_view({"get": "tiles"})
+
+        def get_tile(z, x, y, query="", **headers):
+            request = self.factory.get(
+                f"/locations/tiles/{z}/{x}/{y}.mvt{query}", **headers
+            )
+            force_authenticate(request, user=user)
+            return view(request=request, z=str(z), x=str(x), y=str(y))
+
+        response = get_tile(0, 0, 0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("application/vnd.mapbox-vector-tile", response["Content-Type"])
+        tile = response.content
+        self.assertIn(b"locations", tile)
+        self.assertIn(b"Nairobi", tile)
+        self.assertIn(b"Kampala", tile)
+
+        # the tile that has Nairobi, at a zoom level with simplified shapefiles
+        response = get_tile(8, 153, 129)
+        self.assertIn(b"Nairobi", response.content)
+        self.assertNotIn(b"Kampala", response.content)
+
+        # filters
+        response = get_tile(0, 0, 0, "?country=UG")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b"Nairobi", response.content)
+
+        # a tile with no locations
+        response = get_tile(10, 0, 0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"", response.content)
+
+        # tiles that do not exist
+        self.assertEqual(404, get_tile(0, 1, 0).status_code)
+        self.assertEqual(404, get_tile(23, 0, 0).status_code)
+
+        # tiles are cached until locations change
+        etag = get_tile(0, 0, 0)["ETag"]
+        self.assertEqual(304, get_tile(0, 0, 0, HTTP_IF_NONE_MATCH=etag).status_code)
+        location.name = "Nairobi County"
+        location.save()
+        response = get_tile(0, 0, 0, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Nairobi County", response.content)
+
+        # geopoints are drawn in the tiles that their radius reaches into, even
+        # when the geopoint itself is in another tile
+        mommy.make(
+            "tasking.Location", name="Entebbe", geopoint=Point(32.5, 0.02), radius=5000
+        )
+        response = get_tile(1, 1, 1)
+        self.assertIn(b"Entebbe", response.content)
+        self.assertNotIn(b"Kampala", response.content)
+
+    def test_list_locations_conditional(self):
+        """
+        Test that GET /locations answers conditional requests with 304 Not
+        Modified until the locations change
+        """
+        user = mommy.make("auth.User")
+        location = mommy.make("tasking.Location", name="Nairobi")
+        view = LocationViewSet.as_view({"get": "list"})
+
+        request = self.factory.get("/locations")
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        request = self.factory.get("/locations", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 304)
+
+        location.name = "Mombasa"
+        location.save()
+        request = self.factory.get("/locations", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("Mombasa", response.data[0]["name"])
+
     def test_update_location(self):
         """
         Test UPDATE location
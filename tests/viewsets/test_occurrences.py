@@ -1,10 +1,16 @@
 """
 Tests TaskOccurrence viewsets.
 """
+from django.test import override_settings
+
 from model_mommy import mommy
 from rest_framework.test import APIRequestFactory, force_authenticate
 from tests.base import TestBase
 
+from tasking.common_tags import (
+    VIRTUAL_OCCURRENCES_TOO_MANY,
+    VIRTUAL_OCCURRENCES_WINDOW,
+)
 from tasking.models import TaskOccurrence
 from tasking.serializers import TaskOccurrenceSerializer
 from tasking.viewsets import TaskOccurrenceViewSet
@@ -284,3 +290,185 @@ class TestTaskOccurrenceViewSet(TestBase):
         self.assertEqual(len(response.data), TaskOccurrence.objects.count())
         self.assertEqual("16:00:00", response.data[0]["end_time"])
         self.assertEqual("11:00:00", response.data[-1]["end_time"])
+
+    def test_paginate_occurrences(self):
+        """
+        Test that occurrences can be listed a page at a time
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task")
+        location = mommy.make("tasking.Location")
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+        for i in range(1, 4):
+            mommy.make(
+                "tasking.TaskOccurrence",
+                task=task,
+                date=f"2018-05-0{i}",
+                start_time="07:00",
+                end_time="09:00",
+            )
+            mommy.make(
+                "tasking.TaskOccurrence",
+                task=task,
+                location=location,
+                date=f"2018-05-0{i}",
+                start_time="07:00",
+                end_time="09:00",
+            )
+        # occurrences with no location come after those that have one
+        expected = list(
+            TaskOccurrence.objects.filter(location=location)
+            .order_by("date", "id")
+            .values_list("id", flat=True)
+        ) + list(
+            TaskOccurrence.objects.filter(location__isnull=True)
+            .order_by("date", "id")
+            .values_list("id", flat=True)
+        )
+
+        view = TaskOccurrenceViewSet.as_view({"get": "list"})
+        ids = []
+        url = "/occurrences?page_size=2"
+        while url is not None:
+            request = self.factory.get(url)
+            force_authenticate(request, user=user)
+            response = view(request=request)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(ids, expected)
+
+    def test_virtual_occurrences(self):
+        """
+        Test that occurrences can be expanded on the fly from timing rules
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=DAILY;COUNT=30",
+        )
+        location = mommy.make("tasking.Location")
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task,
+            location=location,
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=WEEKLY",
+            start="08:00:00",
+            end="17:00:00",
+        )
+
+        # stored occurrences are not used
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        view = TaskOccurrenceViewSet.as_view({"get": "list"})
+        request = self.factory.get(
+            "/occurrences",
+            {"virtual": "true", "date__gte": "2018-05-10", "date__lte": "2018-05-16"},
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        # 7 daily occurrences from the task and 1 weekly one from the location
+        self.assertEqual(8, len(response.data))
+        self.assertEqual(0, TaskOccurrence.objects.count())
+
+        task_occurrences = [item for item in response.data if not item["location"]]
+        self.assertEqual(7, len(task_occurrences))
+        self.assertEqual("2018-05-10", task_occurrences[0]["date"])
+        self.assertEqual("2018-05-16", task_occurrences[-1]["date"])
+        self.assertIsNone(task_occurrences[0]["id"])
+
+        location_occurrences = [item for item in response.data if item["location"]]
+        self.assertEqual(1, len(location_occurrences))
+        self.assertEqual(location.id, location_occurrences[0]["location"])
+        self.assertEqual(task.id, location_occurrences[0]["task"])
+        self.assertEqual("2018-05-15", location_occurrences[0]["date"])
+        self.assertEqual("08:00:00", location_occurrences[0]["start_time"])
+        self.assertEqual("17:00:00", location_occurrences[0]["end_time"])
+
+        # filter by location
+        request = self.factory.get(
+            "/occurrences",
+            {
+                "virtual": "true",
+                "date__gte": "2018-05-10",
+                "date__lte": "2018-05-16",
+                "location": location.id,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(1, len(response.data))
+
+        # the date window is required
+        request = self.factory.get(
+            "/occurrences", {"virtual": "true", "date__gte": "2018-05-10"}
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(VIRTUAL_OCCURRENCES_WINDOW, str(response.data["date"]))
+
+        # dates that do not exist are rejected in the same way
+        request = self.factory.get(
+            "/occurrences",
+            {"virtual": "true", "date__gte": "2020-02-30", "date__lte": "2020-03-05"},
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(VIRTUAL_OCCURRENCES_WINDOW, str(response.data["date"]))
+
+    @override_settings(TASKING_VIRTUAL_OCCURRENCES_MAX_RESULTS=10)
+    def test_virtual_occurrences_limits(self):
+        """
+        Test that windows with too many occurrences are rejected and that
+        tasks whose occurrences start after the window are skipped
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180501T070000Z RRULE:FREQ=HOURLY;INTERVAL=6",
+        )
+        later_task = mommy.make(
+            "tasking.Task",
+            timing_rule="DTSTART:20180601T070000Z RRULE:FREQ=DAILY;COUNT=5",
+        )
+        view = TaskOccurrenceViewSet.as_view({"get": "list"})
+
+        def get_occurrences(from_date, until_date, task_id):
+            request = self.factory.get(
+                "/occurrences",
+                {
+                    "virtual": "true",
+                    "date__gte": from_date,
+                    "date__lte": until_date,
+                    "task": task_id,
+                },
+            )
+            force_authenticate(request, user=user)
+            return view(request=request)
+
+        # 4 occurrences a day
+        response = get_occurrences("2018-05-10", "2018-05-11", task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(8, len(response.data))
+
+        response = get_occurrences("2018-05-10", "2018-05-12", task.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            VIRTUAL_OCCURRENCES_TOO_MANY.format(limit=10), str(response.data["date"])
+        )
+
+        # the stored occurrences of later_task start after the window
+        later_task.refresh_from_db()
+        self.assertEqual("2018-06-01", later_task.first_occurrence_date.isoformat())
+        response = get_occurrences("2018-05-10", "2018-05-11", later_task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([], response.data)
+        response = get_occurrences("2018-06-01", "2018-06-02", later_task.id)
+        self.assertEqual(2, len(response.data))
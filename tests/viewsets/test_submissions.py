@@ -1,8 +1,13 @@
 """
 Tests Submission viewsets.
 """
+import csv
+import io
+import json
 from datetime import timedelta
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 import pytz
@@ -10,7 +15,12 @@ from model_mommy import mommy
 from rest_framework.test import APIRequestFactory, force_authenticate
 from tests.base import TestBase
 
-from tasking.common_tags import CANT_EDIT_TASK, TARGET_DOES_NOT_EXIST
+from tasking.common_tags import (
+    CANT_EDIT_TASK,
+    INVALID_CURSOR,
+    INVALID_EXPORT_FORMAT,
+    TARGET_DOES_NOT_EXIST,
+)
 from tasking.models import Submission
 from tasking.viewsets import SubmissionViewSet
 
@@ -545,6 +555,121 @@ class TestSubmissionViewSet(TestBase):
             .isoformat(),
         )
 
+    def test_paginate_submissions(self):
+        """
+        Test that submissions can be listed a page at a time
+        """
+        now = timezone.now()
+        user = mommy.make("auth.User")
+        for i in range(0, 4):
+            mommy.make("tasking.Submission", submission_time=now - timedelta(days=i))
+        # submissions with the same submission_time are ordered by id
+        mommy.make("tasking.Submission", submission_time=now, _quantity=2)
+        # pylint: disable=no-member
+        expected = list(
+            Submission.objects.order_by("submission_time", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+        view = SubmissionViewSet.as_view({"get": "list"})
+
+        # without a cursor or page_size we get a plain list
+        request = self.factory.get("/submissions")
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 6)
+
+        # follow the next links to the last page
+        ids = []
+        pages = []
+        url = "/submissions?page_size=4"
+        while url is not None:
+            request = self.factory.get(url)
+            force_authenticate(request, user=user)
+            response = view(request=request)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item["id"] for item in response.data["results"])
+            pages.append(response.data)
+            url = response.data["next"]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 2)
+        self.assertIsNone(pages[0]["previous"])
+
+        # and back to the first page
+        request = self.factory.get(pages[-1]["previous"])
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], expected[:4]
+        )
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNotNone(response.data["next"])
+
+        # bad cursors are rejected
+        request = self.factory.get("/submissions", {"cursor": "nonsense"})
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(str(response.data["detail"]), INVALID_CURSOR)
+
+    def test_export_submissions(self):
+        """
+        Test that submissions can be exported as NDJSON and CSV
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task")
+        submissions = mommy.make(
+            "tasking.Submission", task=task, comments="Hello, world", _quantity=3
+        )
+        mommy.make("tasking.Submission")
+        view = SubmissionViewSet.as_view({"get": "export"})
+
+        # NDJSON is the default and the filters of the list view apply
+        request = self.factory.get("/submissions/export", {"task": task.id})
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            sorted(submission.id for submission in submissions),
+        )
+        serialized = self.factory.get(f"/submissions/{rows[0]['id']}")
+        force_authenticate(serialized, user=user)
+        retrieved = SubmissionViewSet.as_view({"get": "retrieve"})(
+            request=serialized, pk=rows[0]["id"]
+        )
+        self.assertDictEqual(rows[0], json.loads(json.dumps(retrieved.data)))
+
+        # CSV has a header line
+        request = self.factory.get(
+            "/submissions/export", {"task": task.id, "export_format": "csv"}
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["comments"], "Hello, world")
+        self.assertEqual(rows[0]["task"], str(task.id))
+
+        # unknown formats are rejected
+        request = self.factory.get("/submissions/export", {"export_format": "xls"})
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            str(response.data["export_format"]),
+            INVALID_EXPORT_FORMAT.format(formats="csv, ndjson"),
+        )
+
     def test_valid_sorting(self):
         """
         Test that you can sort by valid
@@ -674,3 +799,171 @@ class TestSubmissionViewSet(TestBase):
             response.data[0]["id"], Submission.objects.order_by("-task__id").first().id
         )
         self.assertEqual(response.data[0]["task"], task2.id)
+
+    def _get_bulk_rows(self, quantity):
+        """
+        Helper to get the data of many submissions
+        """
+        task = mommy.make("tasking.Task", name="Cow Prices")
+        location = mommy.make("tasking.Location", name="Nairobi")
+        user = mommy.make("auth.User")
+        rows = []
+        for _ in range(quantity):
+            rows.append(
+                {
+                    "task": task.id,
+                    "location": location.id,
+                    "submission_time": timezone.now().isoformat(),
+                    "user": user.id,
+                    "valid": True,
+                    "target_content_type": self.user_type.id,
+                    "target_id": user.id,
+                }
+            )
+        return task, user, rows
+
+    def test_bulk_create_submissions(self):
+        """
+        Test POST /submissions/bulk with a JSON array
+        """
+        task, user, rows = self._get_bulk_rows(5)
+        bad_row = rows[0].copy()
+        bad_row["target_id"] = 1337
+        rows.insert(2, bad_row)
+
+        view = SubmissionViewSet.as_view({"post": "bulk"})
+        request = self.factory.post(
+            "/submissions/bulk", json.dumps(rows), content_type="application/json"
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(5, response.data["created"])
+        self.assertEqual(1, response.data["failed"])
+        results = response.data["results"]
+        self.assertEqual(list(range(6)), [result["index"] for result in results])
+        self.assertEqual(
+            TARGET_DOES_NOT_EXIST, str(results[2]["errors"]["target_id"][0])
+        )
+        ids = [result["id"] for result in results if "id" in result]
+        # pylint: disable=no-member
+        self.assertEqual(5, Submission.objects.filter(id__in=ids, task=task).count())
+        task.refresh_from_db()
+        self.assertEqual(5, task.submission_count)
+
+    def test_bulk_create_submissions_queries(self):
+        """
+        Test that POST /submissions/bulk takes the same number of queries
+        whatever the number of submissions
+        """
+        view = SubmissionViewSet.as_view({"post": "bulk"})
+
+        def count_bulk_queries(quantity):
+            _, user, rows = self._get_bulk_rows(quantity)
+            request = self.factory.post(
+                "/submissions/bulk", json.dumps(rows), content_type="application/json"
+            )
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as context:
+                response = view(request=request)
+            self.assertEqual(quantity, response.data["created"], response.data)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_bulk_queries(2), count_bulk_queries(20))
+
+    def test_bulk_create_submissions_ndjson(self):
+        """
+        Test POST /submissions/bulk with an NDJSON stream
+        """
+        task, user, rows = self._get_bulk_rows(3)
+        body = "\n".join(json.dumps(row) for row in rows) + "\n"
+
+        view = SubmissionViewSet.as_view({"post": "bulk"})
+        request = self.factory.post(
+            "/submissions/bulk", body, content_type="application/x-ndjson"
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(3, response.data["created"])
+        # pylint: disable=no-member
+        self.assertEqual(3, Submission.objects.filter(task=task).count())
+
+        # bad JSON
+        request = self.factory.post(
+            "/submissions/bulk", "{not json}\n", content_type="application/x-ndjson"
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+
+        # the body has to be a list
+        request = self.factory.post(
+            "/submissions/bulk", json.dumps(rows[0]), content_type="application/json"
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_submission_idempotency_key(self):
+        """
+        Test that POST /submissions with an idempotency key that has been
+        used returns the existing submission
+        """
+        task, user, rows = self._get_bulk_rows(1)
+        data = rows[0]
+        data["idempotency_key"] = "device-1-submission-1"
+
+        view = SubmissionViewSet.as_view({"post": "create"})
+        request = self.factory.post("/submissions", data)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 201, response.data)
+        submission_id = response.data["id"]
+
+        # retrying does not create another submission
+        request = self.factory.post("/submissions", data)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(submission_id, response.data["id"])
+        # pylint: disable=no-member
+        self.assertEqual(1, Submission.objects.filter(task=task).count())
+        task.refresh_from_db()
+        self.assertEqual(1, task.submission_count)
+
+    def test_bulk_create_submissions_idempotency_key(self):
+        """
+        Test that POST /submissions/bulk does not create submissions whose
+        idempotency key has been used
+        """
+        task, user, rows = self._get_bulk_rows(3)
+        existing = mommy.make(
+            "tasking.Submission", task=task, idempotency_key="submission-0"
+        )
+        for index, row in enumerate(rows):
+            row["idempotency_key"] = f"submission-{index}"
+        # the same submission sent twice
+        rows.append(rows[1].copy())
+
+        view = SubmissionViewSet.as_view({"post": "bulk"})
+        request = self.factory.post(
+            "/submissions/bulk", json.dumps(rows), content_type="application/json"
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(2, response.data["created"])
+        self.assertEqual(2, response.data["existing"])
+        results = response.data["results"]
+        self.assertEqual(existing.id, results[0]["id"])
+        self.assertTrue(results[0]["existing"])
+        self.assertEqual(results[1]["id"], results[3]["id"])
+        self.assertTrue(results[3]["existing"])
+        # pylint: disable=no-member
+        self.assertEqual(3, Submission.objects.filter(task=task).count())
+        task.refresh_from_db()
+        self.assertEqual(3, task.submission_count)
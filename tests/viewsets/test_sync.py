@@ -0,0 +1,171 @@
+"""
+Tests Sync viewsets.
+"""
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from model_mommy import mommy
+from rest_framework.test import APIRequestFactory, force_authenticate
+from tests.base import TestBase
+
+from tasking.common_tags import EXPIRED_WATERMARK, INVALID_CURSOR, INVALID_WATERMARK
+from tasking.models import Location, Task, TaskLocation, TaskOccurrence
+from tasking.signals import create_tombstone
+from tasking.viewsets import SyncViewSet
+
+
+class TestSyncViewSet(TestBase):
+    """
+    Test SyncViewSet class.
+    """
+
+    def setUp(self):
+        super(TestSyncViewSet, self).setUp()
+        self.factory = APIRequestFactory()
+        for model in [Location, Task, TaskLocation, TaskOccurrence]:
+            post_delete.connect(
+                create_tombstone, sender=model, dispatch_uid=f"{model}_tombstone"
+            )
+            self.addCleanup(
+                post_delete.disconnect,
+                sender=model,
+                dispatch_uid=f"{model}_tombstone",
+            )
+
+    def _sync(self, since=None, **params):
+        """
+        Helper to GET /sync
+        """
+        user = mommy.make("auth.User")
+        view = SyncViewSet.as_view({"get": "list"})
+        if since:
+            params["since"] = since
+        request = self.factory.get("/sync", params)
+        force_authenticate(request, user=user)
+        return view(request=request)
+
+    def test_sync(self):
+        """
+        Test GET /sync returns the changes since the watermark
+        """
+        old_task = mommy.make("tasking.Task", name="Old")
+        deleted_task = mommy.make("tasking.Task", name="Deleted")
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        # without a watermark everything is returned
+        response = self._sync()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {old_task.id, deleted_task.id},
+            {item["id"] for item in response.data["tasks"]["changed"]},
+        )
+        self.assertEqual([], response.data["tasks"]["deleted"])
+
+        since = timezone.now()
+        Task.objects.filter(pk=old_task.pk).update(
+            modified=since - timedelta(minutes=5)
+        )
+        new_task = mommy.make("tasking.Task", name="New")
+        location = mommy.make("tasking.Location", name="Nairobi")
+        task_location = mommy.make(
+            "tasking.TaskLocation",
+            task=new_task,
+            location=location,
+            timing_rule="RRULE:FREQ=DAILY;COUNT=1",
+        )
+        deleted_task_id = deleted_task.id
+        deleted_task.delete()
+
+        response = self._sync(since.isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [new_task.id], [item["id"] for item in response.data["tasks"]["changed"]]
+        )
+        self.assertEqual([deleted_task_id], response.data["tasks"]["deleted"])
+        self.assertEqual(
+            [location.id],
+            [item["id"] for item in response.data["locations"]["changed"]],
+        )
+        self.assertEqual(
+            [task_location.id],
+            [item["id"] for item in response.data["task_locations"]["changed"]],
+        )
+        self.assertEqual([], response.data["occurrences"]["changed"])
+        self.assertEqual([], response.data["projects"]["changed"])
+
+        # the watermark is a little before now so that nothing is missed
+        watermark = response.data["watermark"]
+        self.assertTrue(watermark.endswith("Z"))
+        response = self._sync(watermark)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            new_task.id, [item["id"] for item in response.data["tasks"]["changed"]]
+        )
+
+    def test_sync_bad_watermark(self):
+        """
+        Test that GET /sync rejects watermarks that are not datetimes
+        """
+        response = self._sync("yesterday")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(INVALID_WATERMARK, str(response.data["since"]))
+
+    def test_sync_pages(self):
+        """
+        Test that GET /sync pages each list by (modified, id)
+        """
+        since = timezone.now() - timedelta(minutes=1)
+        tasks = mommy.make("tasking.Task", _quantity=3)
+        deleted_task = mommy.make("tasking.Task")
+        deleted_task_id = deleted_task.id
+        deleted_task.delete()
+        # pylint: disable=no-member
+        TaskOccurrence.objects.all().delete()
+
+        response = self._sync(since.isoformat(), page_size=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [task.id for task in tasks[:2]],
+            [item["id"] for item in response.data["tasks"]["changed"]],
+        )
+        self.assertEqual([deleted_task_id], response.data["tasks"]["deleted"])
+        watermark = response.data["watermark"]
+        self.assertIsNotNone(response.data["next"])
+
+        # a task that is modified while paging is not missed
+        Task.objects.filter(pk=tasks[0].pk).update(modified=timezone.now())
+        cursor = parse_qs(urlparse(response.data["next"]).query)["cursor"][0]
+        response = self._sync(since.isoformat(), page_size=2, cursor=cursor)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [tasks[2].id, tasks[0].id],
+            [item["id"] for item in response.data["tasks"]["changed"]],
+        )
+        # lists that were read to the end are not read again
+        self.assertEqual([], response.data["tasks"]["deleted"])
+        self.assertEqual(watermark, response.data["watermark"])
+        self.assertIsNone(response.data["next"])
+
+        response = self._sync(since.isoformat(), cursor="nonsense")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(INVALID_CURSOR, str(response.data["detail"]))
+
+    def test_sync_expired_watermark(self):
+        """
+        Test that GET /sync asks clients to sync from scratch when their
+        watermark is older than the tombstones are kept for
+        """
+        with self.settings(TASKING_TOMBSTONE_RETENTION_DAYS=7):
+            since = timezone.now() - timedelta(days=8)
+            response = self._sync(since.isoformat())
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(
+                EXPIRED_WATERMARK.format(days=7), str(response.data["since"])
+            )
+
+            response = self._sync((since + timedelta(days=2)).isoformat())
+            self.assertEqual(response.status_code, 200)
@@ -4,6 +4,8 @@ Tests Task viewsets.
 import json
 from datetime import timedelta
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 import pytz
@@ -231,6 +233,150 @@ class TestTaskViewSet(TestBase):
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(response.data.pop(), task_data)
 
+    def test_list_tasks_queries(self):
+        """
+        Test that listing tasks takes the same number of queries whatever
+        the number of tasks
+        """
+        user = mommy.make("auth.User")
+        view = TaskViewSet.as_view({"get": "list"})
+
+        def count_list_queries():
+            request = self.factory.get("/tasks")
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as context:
+                response = view(request=request)
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        def make_task():
+            task = mommy.make("tasking.Task")
+            task.segment_rules.add(mommy.make("tasking.SegmentRule"))
+            mommy.make("tasking.TaskLocation", task=task, _quantity=2)
+
+        make_task()
+        queries = count_list_queries()
+
+        for _ in range(5):
+            make_task()
+        self.assertEqual(queries, count_list_queries())
+
+    def test_list_tasks_conditional(self):
+        """
+        Test that GET /tasks answers conditional requests with 304 Not
+        Modified until the tasks change
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task")
+        other_task = mommy.make("tasking.Task")
+        view = TaskViewSet.as_view({"get": "list"})
+
+        request = self.factory.get("/tasks")
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        request = self.factory.get("/tasks", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = view(request=request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(etag, response["ETag"])
+        self.assertEqual(1, len(context.captured_queries))
+
+        # other filters give other lists
+        request = self.factory.get(
+            "/tasks", {"status": Task.ACTIVE}, HTTP_IF_NONE_MATCH=etag
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+
+        # submission counts change without the task being saved
+        mommy.make("tasking.Submission", task=task)
+        request = self.factory.get("/tasks", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(etag, response["ETag"])
+        etag = response["ETag"]
+
+        # as do deletions
+        other_task.delete()
+        request = self.factory.get("/tasks", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task.id], [item["id"] for item in response.data])
+
+    def test_list_tasks_conditional_related(self):
+        """
+        Test that GET /tasks does not answer with 304 Not Modified when the
+        related objects in the response change
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task")
+        location = mommy.make("tasking.Location")
+        mommy.make(
+            "tasking.TaskLocation",
+            task=task,
+            location=location,
+            timing_rule="RRULE:FREQ=DAILY;COUNT=1",
+        )
+        rule = mommy.make("tasking.SegmentRule")
+        task.segment_rules.add(rule)
+        view = TaskViewSet.as_view({"get": "list"})
+
+        def get_tasks(etag=None):
+            headers = {} if etag is None else {"HTTP_IF_NONE_MATCH": etag}
+            request = self.factory.get("/tasks", **headers)
+            force_authenticate(request, user=user)
+            return view(request=request)
+
+        etag = get_tasks()["ETag"]
+        self.assertEqual(304, get_tasks(etag).status_code)
+
+        # deleting a segment rule removes it from the task
+        rule.delete()
+        response = get_tasks(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([], response.data[0]["segment_rules"])
+        etag = response["ETag"]
+
+        # deleting a location deletes the task locations
+        location.delete()
+        response = get_tasks(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([], response.data[0]["task_locations"])
+
+    def test_list_tasks_if_modified_since(self):
+        """
+        Test that GET /tasks does not answer If-Modified-Since with 304 Not
+        Modified, since deletions leave Last-Modified unchanged
+        """
+        user = mommy.make("auth.User")
+        # the task that is deleted is not the latest one to be modified
+        other_task = mommy.make("tasking.Task")
+        task = mommy.make("tasking.Task")
+        view = TaskViewSet.as_view({"get": "list"})
+
+        request = self.factory.get("/tasks")
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(2, len(response.data))
+        last_modified = response["Last-Modified"]
+
+        other_task.delete()
+        request = self.factory.get("/tasks", HTTP_IF_MODIFIED_SINCE=last_modified)
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(last_modified, response["Last-Modified"])
+        self.assertEqual([task.id], [item["id"] for item in response.data])
+
     def test_update_task(self):
         """
         Test UPDATE task
@@ -687,6 +833,39 @@ class TestTaskViewSet(TestBase):
         self.assertEqual(len(response2.data), 1)
         self.assertEqual(response2.data[0]["id"], task.id)
 
+    def test_date_range_filter(self):
+        """
+        Test that filtering by a date range only returns tasks that have an
+        occurrence within the range
+        """
+        user = mommy.make("auth.User")
+        task = mommy.make("tasking.Task")
+        task2 = mommy.make("tasking.Task")
+
+        # task has occurrences on either side of the range
+        mommy.make("tasking.TaskOccurrence", task=task, date="2018-07-01")
+        mommy.make("tasking.TaskOccurrence", task=task, date="2018-07-31")
+        # task2 has an occurrence within the range
+        mommy.make("tasking.TaskOccurrence", task=task2, date="2018-07-15")
+
+        view = TaskViewSet.as_view({"get": "list"})
+        request = self.factory.get(
+            "/tasks", {"date__gte": "2018-07-10", "date__lte": "2018-07-20"}
+        )
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["id"], task2.id)
+
+        # a single bound is answered from the task occurrence dates
+        request = self.factory.get("/tasks", {"date__lt": "2018-07-10"})
+        force_authenticate(request, user=user)
+        response = view(request=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["id"], task.id)
+
     def test_start_time_filter(self):
         """
         Test that you can filter by start_time